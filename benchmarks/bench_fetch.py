@@ -0,0 +1,40 @@
+"""
+Doorvoer van `VemcountClient` tegen de lokale stub: sequentieel (1 shop per request) vs gebundeld + parallel.
+
+Gebruik:  python -m benchmarks.bench_fetch [--shops 1000] [--latency 0.05]
+"""
+import argparse
+import time
+
+from benchmarks.stub_vemcount import serve
+from vemcount_client import VemcountClient
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--shops", type=int, default=1000)
+    parser.add_argument("--latency", type=float, default=0.05, help="gesimuleerde serverlatentie per request (s)")
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+    shop_ids = list(range(26000, 26000 + args.shops))
+
+    with serve(latency=args.latency, fail_rate=args.fail_rate) as (url, stats):
+        configs = [
+            ("sequentieel", VemcountClient(url, batch_size=1, max_concurrency=1, backoff_base=0.01)),
+            ("gebundeld+parallel", VemcountClient(url, batch_size=args.batch_size,
+                                                   max_concurrency=args.concurrency, backoff_base=0.01)),
+        ]
+        for name, client in configs:
+            before = dict(stats)
+            t0 = time.perf_counter()
+            with client:
+                df = client.get_kpi_data_for_stores(shop_ids)
+            elapsed = time.perf_counter() - t0
+            print(f"{name:>20}: {elapsed:6.2f}s  {args.shops / elapsed:8.0f} shops/s  {len(df):>9} rijen  "
+                  f"{stats['requests'] - before['requests']} requests ({stats['failed'] - before['failed']} retries)")
+
+
+if __name__ == "__main__":
+    main()
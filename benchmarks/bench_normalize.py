@@ -0,0 +1,65 @@
+"""
+Throughput van `normalize_vemcount_response` (rijen/sec) op 10, 1k en 10k shops.
+
+Gebruik:  python -m benchmarks.bench_normalize [--days 365] [--shops 10,1000,10000]
+"""
+import argparse
+import time
+
+import pandas as pd
+
+from benchmarks.synthetic import make_response
+from data_transformer import normalize_vemcount_response
+
+
+def normalize_rowwise(response_json: dict) -> pd.DataFrame:
+    """Oorspronkelijke rij-voor-rij implementatie, als referentie."""
+    rows = []
+    for shop_id, shop_content in response_json.items():
+        for day_info in shop_content.get("dates", {}).values():
+            data = day_info.get("data", {})
+            rows.append({
+                "shop_id": int(shop_id),
+                "date": data.get("dt"),
+                "turnover": float(data.get("turnover", 0)),
+                "count_in": float(data.get("count_in", 0)),
+                "conversion_rate": float(data.get("conversion_rate", 0)),
+                "sales_per_transaction": float(data.get("sales_per_transaction") or 0),
+            })
+    df = pd.DataFrame(rows)
+    if not df.empty:
+        df["date"] = pd.to_datetime(df["date"])
+    return df
+
+
+def best_of(fn, arg, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(arg)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--shops", default="10,1000,10000")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--skip-rowwise", action="store_true", help="alleen de kolomsgewijze versie meten")
+    args = parser.parse_args()
+
+    print(f"{'shops':>7} {'rows':>10} {'columnar rows/s':>16} {'rowwise rows/s':>15} {'speedup':>8}")
+    for n_shops in [int(s) for s in args.shops.split(",")]:
+        response = make_response(n_shops, days=args.days)
+        n_rows = n_shops * args.days
+        t_col = best_of(normalize_vemcount_response, response, args.repeat)
+        if args.skip_rowwise:
+            print(f"{n_shops:>7} {n_rows:>10} {n_rows / t_col:>16,.0f}")
+            continue
+        t_row = best_of(normalize_rowwise, response, args.repeat)
+        print(f"{n_shops:>7} {n_rows:>10} {n_rows / t_col:>16,.0f} {n_rows / t_row:>15,.0f} {t_row / t_col:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""
+Rerun-latency van de Streamlit-pagina (scripttijd, zonder browser), via Streamlit's AppTest.
+
+Gebruik:  python -m benchmarks.bench_rerun [--reruns 40]
+"""
+import argparse
+import os
+import statistics
+
+from streamlit.testing.v1 import AppTest
+
+PAGE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "pages", "event-roi-calc.py")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--reruns", type=int, default=40)
+    args = parser.parse_args()
+
+    at = AppTest.from_file(PAGE, default_timeout=60).run()
+    cold = at.session_state["_last_rerun_ms"]
+    timings = []
+    # Heen-en-weer schuiven: de tweede keer is elke invoer-tuple al bekend in de LRU
+    for i in range(args.reruns):
+        at.slider[0].set_value(20 + i % 2).run()
+        if at.exception:
+            raise RuntimeError(at.exception)
+        timings.append(at.session_state["_last_rerun_ms"])
+    timings.sort()
+    p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+    print(f"eerste run {cold:.1f} ms | rerun p50 {statistics.median(timings):.1f} ms | p95 {p95:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
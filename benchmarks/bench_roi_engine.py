@@ -0,0 +1,46 @@
+"""
+Doorvoer van `roi_engine.compute_roi` in combinaties (store × scenario) per seconde.
+
+Gebruik:  python -m benchmarks.bench_roi_engine [--stores 1000] [--scenarios 500]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from roi_engine import compute_roi
+
+
+def random_inputs(n_stores: int, n_scenarios: int, seed: int = 0) -> dict:
+    """Store-profielen als kolom (n_stores, 1), scenario-uplifts als rij (1, n_scenarios)."""
+    rng = np.random.default_rng(seed)
+    store = lambda lo, hi: rng.uniform(lo, hi, size=(n_stores, 1))
+    scenario = lambda lo, hi: rng.uniform(lo, hi, size=(1, n_scenarios))
+    return {
+        "visitors_day": store(50, 800), "conv_pct": store(0.1, 0.45), "atv_eur": store(15, 150),
+        "open_days": rng.integers(5, 8, size=(n_stores, 1)), "capex": 1200.0, "opex_month": 25.0,
+        "gross_margin": store(0.4, 0.65),
+        "uplift_conv": scenario(0, 0.10), "uplift_spv": scenario(0, 0.20),
+        "sat_share": store(0.12, 0.25), "sat_boost": scenario(0, 0.10),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--stores", type=int, default=1000)
+    parser.add_argument("--scenarios", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    inputs = random_inputs(args.stores, args.scenarios)
+    best = float("inf")
+    for _ in range(args.repeat):
+        t0 = time.perf_counter()
+        compute_roi(**inputs)
+        best = min(best, time.perf_counter() - t0)
+    n = args.stores * args.scenarios
+    print(f"{n:,} combinaties in {best * 1000:.1f} ms → {n / best:,.0f} combinaties/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Loadtest met N gelijktijdige sessies (kiosk-schermen op één server), via Streamlit's AppTest:
+elke sessie kiest af en toe een preset en schuift verder aan de what-if-sliders. Rapporteert
+p50/p95 van de rerun-latency (scripttijd en wachttijd incl. contentie) en het geheugen per sessie.
+
+AppTest zet per run globale staat (runtime, config) en is dus niet thread-safe: de sessies
+draaien in eigen threads, maar hun reruns om de beurt. Voor deze CPU-gebonden pagina is dat
+op één server ook ongeveer het geval (GIL); de wachttijd bevat die wachtrij.
+
+Gebruik:  python -m benchmarks.bench_sessions [--sessions 8] [--reruns 30] [--seed 0]
+"""
+import argparse
+import os
+import random
+import statistics
+import threading
+import time
+
+from streamlit.testing.v1 import AppTest
+
+from presets import PRESETS
+
+PAGE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "pages", "event-roi-calc.py")
+SLIDERS = {"Conversion uplift (%)": (0, 10), "ATV uplift via upsell/cross-sell (%)": (0, 20),
+           "Extra conversion on Saturdays (%)": (0, 10)}
+PRESET_SHARE = 0.2  # aandeel interacties dat een preset toepast i.p.v. een slider te verschuiven
+
+
+def rss_mb() -> float:
+    """Huidig resident geheugen van dit proces (Linux: /proc; elders de piek via `resource`)."""
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        import resource
+
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _percentile(values: list, q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+_run_lock = threading.Lock()
+
+
+def run_session(reruns: int, seed: int, sessions: list, timings: dict, errors: list, ready: threading.Barrier):
+    rng = random.Random(seed)
+    try:
+        with _run_lock:
+            at = AppTest.from_file(PAGE, default_timeout=120).run()
+        sessions.append(at)  # levend houden tot na de geheugenmeting
+        ready.wait()  # pas samen beginnen als alle sessies hun eerste render hebben gehad
+        for _ in range(reruns):
+            if rng.random() < PRESET_SHARE:
+                at.selectbox(key="preset_select").set_value(rng.choice(list(PRESETS)))
+                next(b for b in at.button if b.label == "Apply preset").click()
+            else:
+                label = rng.choice(list(SLIDERS))
+                next(s for s in at.slider if s.label == label).set_value(rng.randint(*SLIDERS[label]))
+            t0 = time.perf_counter()
+            with _run_lock:
+                t1 = time.perf_counter()
+                at.run()
+            t2 = time.perf_counter()
+            if at.exception:
+                raise RuntimeError(at.exception[0].message)
+            timings["script"].append(at.session_state["_last_rerun_ms"])
+            timings["run"].append((t2 - t1) * 1000.0)
+            timings["wait"].append((t2 - t0) * 1000.0)
+    except threading.BrokenBarrierError:
+        pass  # een andere sessie is al mislukt
+    except Exception as exc:
+        errors.append(f"{type(exc).__name__}: {exc}")
+        ready.abort()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=8)
+    parser.add_argument("--reruns", type=int, default=30, help="interacties per sessie")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    # Eén sessie vooraf: imports en procesbrede tabellen tellen niet mee als geheugen per sessie
+    AppTest.from_file(PAGE, default_timeout=120).run()
+    rss_before = rss_mb()
+
+    sessions, errors = [], []
+    timings = {"script": [], "run": [], "wait": []}
+    ready = threading.Barrier(args.sessions)
+    threads = [threading.Thread(target=run_session, args=(args.reruns, args.seed + i, sessions, timings, errors, ready))
+               for i in range(args.sessions)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t0
+    rss_after = rss_mb()
+
+    if errors:
+        raise RuntimeError(f"{len(errors)} sessie(s) met een exception, bijv.: {errors[0]}")
+    print(f"{args.sessions} sessies × {args.reruns} interacties in {elapsed:.1f} s "
+          f"({len(timings['run']) / elapsed:.1f} reruns/s)")
+    for name, label in [("script", "scripttijd"), ("run", "incl. AppTest"), ("wait", "incl. wachtrij")]:
+        values = timings[name]
+        print(f"  {label:<15} p50 {statistics.median(values):7.1f} ms | p95 {_percentile(values, 0.95):7.1f} ms")
+    print(f"  geheugen        {rss_after:.0f} MB totaal, ±{(rss_after - rss_before) / args.sessions:.1f} MB per sessie")
+
+if __name__ == "__main__":
+    main()
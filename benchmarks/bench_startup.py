@@ -0,0 +1,82 @@
+"""
+Cold-start rapport: tijd tot de eerste render van de pagina in een vers proces, plus welke
+zware modules daarvoor geladen moesten worden. Met `--ref` wordt een andere git-revisie
+(bijv. de baseline) in een tijdelijke worktree ernaast gemeten.
+
+Gebruik:  python -m benchmarks.bench_startup [--runs 5] [--ref <commit>]
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ["plotly", "pandas", "pyarrow", "requests"]
+IMPORT_COST_MODULES = ["numpy", "plotly.graph_objects", "pandas", "pyarrow.parquet", "requests"]
+
+_PROBE = """
+import json, sys, time
+from streamlit.testing.v1 import AppTest   # Streamlit zelf telt niet mee: die laadt de server altijd
+page = sys.argv[1]
+t0 = time.perf_counter()
+at = AppTest.from_file(page, default_timeout=120).run()
+first = time.perf_counter() - t0
+assert not at.exception, at.exception
+print(json.dumps({"first_render_s": first, "loaded": [m for m in %r if m in sys.modules]}))
+""" % (HEAVY_MODULES,)
+
+
+def _import_cost(module: str) -> float:
+    code = f"import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return float(out.stdout.strip())
+
+
+def measure(root: str, runs: int) -> dict:
+    page = os.path.join(root, "pages", "event-roi-calc.py")
+    results = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", _PROBE, page], capture_output=True, text=True, cwd=root)
+        if out.returncode != 0:
+            raise RuntimeError(out.stderr[-2000:])
+        results.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    return {
+        "first_render_s": statistics.median(r["first_render_s"] for r in results),
+        "loaded": results[0]["loaded"],
+    }
+
+
+def _report(label: str, result: dict):
+    loaded = ", ".join(result["loaded"]) or "—"
+    print(f"{label:>10}: eerste render {result['first_render_s'] * 1000:7.0f} ms | zware modules geladen: {loaded}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--ref", default=None, help="git-revisie om mee te vergelijken (voor/na)")
+    args = parser.parse_args()
+
+    print("Importkosten per module (vers proces):")
+    for module in IMPORT_COST_MODULES:
+        print(f"  {module:<22} {_import_cost(module) * 1000:6.0f} ms")
+
+    if args.ref:
+        tmp = tempfile.mkdtemp(prefix="pfm-startup-")
+        worktree = os.path.join(tmp, "tree")
+        subprocess.run(["git", "worktree", "add", "--detach", worktree, args.ref],
+                       cwd=ROOT, check=True, capture_output=True)
+        try:
+            _report(args.ref[:10], measure(worktree, args.runs))
+        finally:
+            subprocess.run(["git", "worktree", "remove", "--force", worktree], cwd=ROOT, capture_output=True)
+            shutil.rmtree(tmp, ignore_errors=True)
+    _report("huidig", measure(ROOT, args.runs))
+
+
+if __name__ == "__main__":
+    main()
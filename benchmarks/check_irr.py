@@ -0,0 +1,61 @@
+"""
+Controle van `roi_cashflow.irr` tegen een simpele bisectie (200 stappen, altijd convergent):
+een bekend probleemgeval plus willekeurige stores en alle presets × ramp-ups × churn.
+
+Gebruik:  python -m benchmarks.check_irr [--stores 10000]
+"""
+import argparse
+import itertools
+
+import numpy as np
+
+from benchmarks.bench_roi_engine import random_inputs
+from presets import PRESETS
+from roi_cashflow import IRR_BOUNDS, RAMP_SHAPES, _npv_and_slope, irr, project_cashflows
+
+
+def irr_bisect(cf: np.ndarray, iterations: int = 200) -> np.ndarray:
+    cf_t = np.ascontiguousarray(cf.T)
+    lo, hi = np.full(cf.shape[0], np.log(IRR_BOUNDS[0])), np.full(cf.shape[0], np.log(IRR_BOUNDS[1]))
+    f_lo, _ = _npv_and_slope(cf_t, lo)
+    for _ in range(iterations):
+        mid = 0.5 * (lo + hi)
+        f, _ = _npv_and_slope(cf_t, mid)
+        same = np.sign(f) == np.sign(f_lo)
+        lo, f_lo, hi = np.where(same, mid, lo), np.where(same, f, f_lo), np.where(same, hi, mid)
+    return np.expm1(12.0 * 0.5 * (lo + hi))
+
+
+def check(cf: np.ndarray, label: str):
+    got, want = irr(cf), irr_bisect(cf)
+    finite = np.isfinite(got)
+    wrong = finite & ~np.isclose(got, want, rtol=1e-6)
+    print(f"{label}: {len(got)} rijen, {int(wrong.sum())} afwijkend, {int((~finite).sum())} niet eindig")
+    assert not wrong.any(), f"{label}: irr wijkt af van bisectie in rij(en) {np.flatnonzero(wrong)[:10]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--stores", type=int, default=10_000)
+    args = parser.parse_args()
+
+    # Liep vroeger vast in kleine Newton-stappen: -45%/jaar bij NPV +€119k (juist: ±+8.700%)
+    case = {**PRESETS["Drugstore & Personal Care"], "uplift_conv": 0.03, "uplift_spv": 0.05}
+    chain = project_cashflows(case, ramp_months=12, ramp_shape="s-curve")
+    check(chain["chain_cashflow"][np.newaxis, :], "drugstore s-curve")
+
+    inputs = {k: np.ravel(v) for k, v in random_inputs(args.stores, 1).items()}
+    check(project_cashflows(inputs, ramp_months=12, ramp_shape="s-curve", churn_month=0.01)["cashflow"],
+          "willekeurige stores")
+
+    rows = []
+    for name, ramp_months, shape, churn in itertools.product(PRESETS, (0, 3, 12, 24), RAMP_SHAPES, (0.0, 0.01, 0.05)):
+        for uplift_conv, uplift_spv in ((0.001, 0.0), (0.01, 0.02), (0.03, 0.05), (0.10, 0.20)):
+            scenario = {**PRESETS[name], "uplift_conv": uplift_conv, "uplift_spv": uplift_spv}
+            rows.append(project_cashflows(scenario, ramp_months=ramp_months, ramp_shape=shape,
+                                          churn_month=churn)["chain_cashflow"])
+    check(np.array(rows), "presets × ramp-up × churn")
+
+
+if __name__ == "__main__":
+    main()
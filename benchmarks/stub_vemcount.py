@@ -0,0 +1,94 @@
+"""
+Lokale stub van de FastAPI `/get-report` endpoint, voor tests en benchmarks zonder Vemcount.
+
+Gebruik:  python -m benchmarks.stub_vemcount --port 8765 [--latency 0.05] [--fail-rate 0.1]
+"""
+import argparse
+import contextlib
+import datetime as dt
+import json
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from benchmarks.synthetic import _shop_dates, _shop_hours
+
+
+def _period(query: dict) -> tuple:
+    today = dt.date.today()
+    if query.get("period", ["last_year"])[0] == "date":
+        start = dt.date.fromisoformat(query["form_date_from"][0])
+        end = dt.date.fromisoformat(query.get("form_date_to", query["form_date_from"])[0])
+        return start, (end - start).days + 1
+    start = dt.date(today.year - 1, 1, 1)
+    return start, (dt.date(today.year, 1, 1) - start).days
+
+
+def make_handler(latency: float = 0.0, fail_rate: float = 0.0):
+    stats = {"requests": 0, "failed": 0}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, zodat connection pooling meetbaar is
+
+        def _respond(self):
+            url = urlparse(self.path)
+            query = parse_qs(url.query)
+            with lock:
+                stats["requests"] += 1
+                fail = random.random() < fail_rate
+                stats["failed"] += fail
+            if latency:
+                threading.Event().wait(latency)
+            if fail:
+                body, status = b'{"detail": "upstream unavailable"}', 503
+            else:
+                start, days = _period(query)
+                shops = query.get("data", [])
+                build = _shop_hours if query.get("step", ["day"])[0] == "hour" else _shop_dates
+                payload = {shop: {"dates": build(random.Random(int(shop)), start, days)} for shop in shops}
+                body, status = json.dumps(payload).encode(), 200
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        do_GET = _respond
+        do_POST = _respond
+
+        def log_message(self, *args):
+            pass
+
+    Handler.stats = stats
+    return Handler
+
+
+@contextlib.contextmanager
+def serve(port: int = 0, latency: float = 0.0, fail_rate: float = 0.0):
+    """Start de stub in een achtergrondthread; levert (url, stats)."""
+    handler = make_handler(latency, fail_rate)
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}/get-report", handler.stats
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), make_handler(args.latency, args.fail_rate))
+    print(f"Stub /get-report op http://127.0.0.1:{args.port}/get-report")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,310 @@
+"""
+Benchmark-suite met baseline: normalisatie, ROI-engine/portfolio, formatters en figuren
+(KPI-figuren en per-store grafieken), op synthetische data van 10 tot 100k shops en 1 tot
+5 jaar historie.
+
+Elke case meet de doorvoer (eenheden/s, mediaan over een paar rondes) en vergelijkt met
+`benchmarks/baseline.json`; een daling van meer dan `--threshold` geeft exit-code 1.
+
+Gebruik:  python -m benchmarks.suite [--profile quick|full] [--filter normalize] [-o results.json]
+          python -m benchmarks.suite --save-baseline      # huidige meting wordt de nieuwe baseline
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import make_response, make_store_table
+from formatting import fmt_eur, fmt_eur_array, fmt_pct, fmt_pct_array
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+DEFAULT_THRESHOLD = 0.30   # runner-ruis op gedeelde machines ligt rond 10–20%
+MIN_TIME = 0.5             # per case minstens zo lang herhalen (s)
+LONG_RUN = 5.0             # runs langer dan dit worden niet herhaald (s)
+IN_MEMORY_ROWS = 4_000_000  # daarboven normaliseren we gestreamd in chunks
+
+PROFILES = {
+    "quick": {"shops": [10, 1000], "years": [1], "stores": [10, 1000, 100_000], "values": [1000, 100_000]},
+    "full": {"shops": [10, 1000, 10_000, 100_000], "years": [1, 5], "stores": [10, 1000, 100_000],
+             "values": [1000, 100_000]},
+}
+
+
+# =========================
+# Cases: (naam, eenheid, aantal eenheden, setup() -> run-functie)
+# =========================
+def _normalize_case(n_shops: int, years: int):
+    from data_transformer import iter_normalize_vemcount_chunks, normalize_vemcount_response
+
+    days = 365 * years
+    n_rows = n_shops * days
+    chunked = n_rows > IN_MEMORY_ROWS
+    name = f"{'normalize_chunked' if chunked else 'normalize'}[{n_shops}x{years}y]"
+
+    def setup():
+        response = make_response(n_shops, days=days)
+        if chunked:
+            return lambda: sum(len(chunk) for chunk in iter_normalize_vemcount_chunks(response))
+        return lambda: normalize_vemcount_response(response)
+
+    return name, "rows", n_rows, setup
+
+
+def _roi_engine_case(n_stores: int):
+    def setup():
+        from benchmarks.bench_roi_engine import random_inputs
+        from roi_engine import compute_roi
+
+        inputs = random_inputs(n_stores, 1)
+        return lambda: compute_roi(**inputs)
+
+    return f"roi_engine[{n_stores}]", "stores", n_stores, setup
+
+
+def _portfolio_case(n_stores: int):
+    def setup():
+        from portfolio import evaluate_portfolio, portfolio_totals
+        from presets import DEFAULT_INPUTS
+
+        stores = make_store_table(n_stores)
+        return lambda: portfolio_totals(evaluate_portfolio(stores, DEFAULT_INPUTS))
+
+    return f"portfolio[{n_stores}]", "stores", n_stores, setup
+
+
+def _cashflow_case(n_stores: int, horizon_months: int = 60):
+    def setup():
+        from benchmarks.bench_roi_engine import random_inputs
+        from roi_cashflow import project_cashflows
+
+        inputs = {k: np.ravel(v) if np.ndim(v) else v for k, v in random_inputs(n_stores, 1).items()}
+        return lambda: project_cashflows(inputs, horizon_months=horizon_months, churn_month=0.01)
+
+    return f"cashflow[{n_stores}x{horizon_months}m]", "stores", n_stores, setup
+
+
+def _format_case(fn, n_values: int):
+    def setup():
+        values = np.random.default_rng(0).uniform(-1e6, 1e7, n_values).tolist()
+        return lambda: [fn(x) for x in values]
+
+    return f"{fn.__name__}[{n_values}]", "values", n_values, setup
+
+
+def _format_array_case(fn, n_values: int):
+    def setup():
+        values = np.random.default_rng(0).uniform(-1e6, 1e7, n_values)
+        return lambda: fn(values)
+
+    return f"{fn.__name__}[{n_values}]", "values", n_values, setup
+
+
+def _kpi_figures_case():
+    def setup():
+        from roi_figures import revenue_bar, uplift_donut
+
+        # Zonder de LRU (`__wrapped__`): we meten het bouwen + serialiseren, niet de cache
+        def run():
+            revenue_bar.__wrapped__(1.2e7, 1.3e7, "€12.000.000", "€13.000.000", 420, ("#F59E0B", "#762181")).to_dict()
+            uplift_donut.__wrapped__(0.6, 0.4, "€600.000", "€400.000", 380, ("#F04438", "#762181")).to_dict()
+        return run
+
+    return "kpi_figures", "figures", 2, setup
+
+
+def _heatmap_case():
+    def setup():
+        import plotly.graph_objects as go
+
+        from presets import DEFAULT_INPUTS
+        from roi_sensitivity import sweep_grid
+
+        def run():
+            grid = sweep_grid(DEFAULT_INPUTS, "uplift_conv", "uplift_spv", num_stores=100)
+            go.Figure(go.Heatmap(x=grid["x"], y=grid["y"], z=np.minimum(grid["payback_months"], 36))).to_dict()
+        return run
+
+    return "sensitivity_heatmap", "figures", 1, setup
+
+
+def _store_charts_case(n_stores: int):
+    def setup():
+        import plotly.io as pio
+
+        from portfolio import evaluate_portfolio
+        from presets import DEFAULT_INPUTS
+        from results_export import store_labels
+        from store_charts import binned_histogram, store_scatter, top_n_bar
+
+        results = evaluate_portfolio(make_store_table(n_stores), DEFAULT_INPUTS)
+        labels = store_labels(results)
+        base, new = results["turn_year_total"].to_numpy(), results["turn_year_new_total"].to_numpy()
+        payback = np.minimum(results["payback_months"].to_numpy(), 36)
+
+        # Bouwen + serialiseren zoals `st.plotly_chart`: de payload moet begrensd blijven
+        def run():
+            for fig in (top_n_bar(labels, base, new, 10), store_scatter(base, payback, labels)[0],
+                        binned_histogram(payback, 36, (0, 36), "#762181", "", 300, "")):
+                pio.to_json(fig, validate=False)
+        return run
+
+    return f"store_charts[{n_stores}]", "stores", n_stores, setup
+
+
+def build_cases(profile: dict) -> list:
+    cases = [_normalize_case(s, y) for y in profile["years"] for s in profile["shops"]]
+    cases += [_roi_engine_case(n) for n in profile["stores"]]
+    cases += [_portfolio_case(n) for n in profile["stores"]]
+    cases += [_cashflow_case(n) for n in (10, 1000, 10_000)]  # 10k × 60 maanden moet interactief blijven
+    cases += [_format_case(fn, n) for fn in (fmt_eur, fmt_pct) for n in profile["values"]]
+    cases += [_format_array_case(fn, n) for fn in (fmt_eur_array, fmt_pct_array) for n in profile["values"]]
+    cases += [_store_charts_case(n) for n in profile["stores"]]
+    cases += [_kpi_figures_case(), _heatmap_case()]
+    return cases
+
+
+# =========================
+# Meten & vergelijken
+# =========================
+def measure(run, repeat: int, min_time: float = MIN_TIME) -> float:
+    """
+    Beste tijd van minstens `repeat` runs, en zo veel meer als binnen `min_time` past.
+    De eerste run is opwarmen (imports, caches van Pandas/Plotly), behalve bij grote
+    schalen (> `LONG_RUN` s): daar valt dat weg in het geheel en telt één meting.
+    """
+    t0 = time.perf_counter()
+    run()
+    first = time.perf_counter() - t0
+    if first > LONG_RUN:
+        return first
+    best, spent, n = float("inf"), 0.0, 0
+    gc.collect()
+    gc.disable()  # zoals timeit: geen GC-pauzes midden in een meting
+    try:
+        while n < repeat or spent < min_time:
+            t0 = time.perf_counter()
+            run()
+            elapsed = time.perf_counter() - t0
+            best, spent, n = min(best, elapsed), spent + elapsed, n + 1
+    finally:
+        gc.enable()
+    return best
+
+
+def run_suite(cases: list, repeat: int, rounds: int = 5) -> dict:
+    """
+    Meet alle cases in `rounds` rondes om de beurt en neemt per case de mediaan van de
+    beste tijd per ronde: een tijdelijk drukke machine (of één meevaller) treft zo niet
+    één case volledig, en baseline en meting zijn op dezelfde manier ruis-gefilterd.
+    """
+    runs = {name: setup() for name, _, _, setup in cases}
+    times = {name: [] for name in runs}
+    for _ in range(rounds):
+        for name, run in runs.items():
+            if times[name] and times[name][0] > LONG_RUN:
+                continue
+            times[name].append(measure(run, repeat, MIN_TIME / rounds))
+    results = {}
+    for name, unit, units, _ in cases:
+        seconds = statistics.median(times[name])
+        results[name] = {"unit": unit, "units": units, "seconds": seconds, "per_s": units / seconds}
+        print(f"  {name:<32} {units / seconds:>16,.0f} {unit}/s  ({seconds * 1000:,.1f} ms)", flush=True)
+    return results
+
+
+def machine_info() -> dict:
+    import pandas as pd
+
+    return {"python": platform.python_version(), "numpy": np.__version__, "pandas": pd.__version__,
+            "machine": platform.machine(), "processor": platform.processor() or platform.platform(),
+            "cpus": os.cpu_count()}
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """Cases die meer dan `threshold` langzamer zijn dan de baseline: [(naam, verhouding), ...]."""
+    regressions = []
+    print(f"\n  {'case':<32} {'baseline/s':>14} {'nu/s':>14} {'verschil':>9}")
+    for name, res in results.items():
+        base = baseline.get("results", {}).get(name)
+        if base is None:
+            print(f"  {name:<32} {'—':>14} {res['per_s']:>14,.0f}   (nieuw)")
+            continue
+        ratio = res["per_s"] / base["per_s"]
+        flag = "  ← regressie" if ratio < 1 - threshold else ""
+        print(f"  {name:<32} {base['per_s']:>14,.0f} {res['per_s']:>14,.0f} {ratio - 1:>+8.0%}{flag}")
+        if flag:
+            regressions.append((name, ratio))
+    return regressions
+
+
+def _write_json(path: str, data: dict):
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(data, fh, indent=2, sort_keys=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--profile", choices=list(PROFILES), default="quick")
+    parser.add_argument("--filter", default=None, help="alleen cases waarvan de naam dit bevat")
+    parser.add_argument("--repeat", type=int, default=5, help="minimaal aantal runs per case per ronde")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="toegestane daling in doorvoer t.o.v. de baseline (0.30 = 30%%)")
+    parser.add_argument("--save-baseline", action="store_true", help="resultaten opslaan als nieuwe baseline")
+    parser.add_argument("-o", "--output", default=None, help="resultaten ook als JSON wegschrijven")
+    args = parser.parse_args(argv)
+
+    cases = build_cases(PROFILES[args.profile])
+    if args.filter:
+        cases = [c for c in cases if args.filter in c[0]]
+    print(f"{len(cases)} cases, profiel {args.profile}:")
+    report = {"meta": machine_info(), "results": run_suite(cases, args.repeat, args.rounds)}
+
+    if args.output and (args.save_baseline or not os.path.exists(args.baseline)):
+        _write_json(args.output, report)
+    if args.save_baseline:
+        baseline = {"meta": report["meta"], "results": {}}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, encoding="utf-8") as fh:
+                baseline["results"] = json.load(fh).get("results", {})
+        baseline["results"].update(report["results"])  # andere profielen/filters blijven staan
+        _write_json(args.baseline, baseline)
+        print(f"\nBaseline opgeslagen in {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"\nGeen baseline in {args.baseline}; maak er een met --save-baseline")
+        return 0
+
+    with open(args.baseline, encoding="utf-8") as fh:
+        baseline = json.load(fh)
+    if baseline.get("meta", {}).get("processor") != report["meta"]["processor"]:
+        print("\nLet op: baseline is op een andere machine gemeten; verschillen zeggen dan weinig.")
+    regressions = compare(report["results"], baseline, args.threshold)
+    if regressions:
+        # Eerst opnieuw meten: één uitschieter door een drukke machine is nog geen regressie
+        print("\nOpnieuw meten van de afwijkers:")
+        suspects = {name for name, _ in regressions}
+        retry = run_suite([c for c in cases if c[0] in suspects], args.repeat, args.rounds)
+        for name, res in retry.items():
+            if res["per_s"] > report["results"][name]["per_s"]:
+                report["results"][name] = res
+        regressions = compare({name: report["results"][name] for name in suspects}, baseline, args.threshold)
+    if args.output:
+        _write_json(args.output, report)
+    if regressions:
+        print(f"\n{len(regressions)} regressie(s) boven {args.threshold:.0%}: "
+              + ", ".join(name for name, _ in regressions))
+        return 1
+    print(f"\nGeen regressies boven {args.threshold:.0%}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+"""Synthetische Vemcount-responses voor benchmarks (zelfde vorm als /get-report)."""
+import datetime as dt
+import random
+
+# Aantal unieke dag-profielen; shops hergebruiken deze zodat 10k shops in het geheugen passen
+PROFILE_POOL = 64
+OPEN_HOURS = (9, 18)  # step=hour: uren met bezoekers
+
+
+def _shop_dates(rng: random.Random, start: dt.date, days: int) -> dict:
+    dates = {}
+    for i in range(days):
+        day = start + dt.timedelta(days=i)
+        count_in = rng.randint(50, 800)
+        conversion = round(rng.uniform(0.1, 0.45), 4)
+        spt = round(rng.uniform(15, 150), 2)
+        turnover = round(count_in * conversion * spt, 2)
+        label = day.strftime("%a. %b %d, %Y")
+        dates[label] = {
+            "data": {
+                "dt": day.isoformat(),
+                "turnover": turnover,
+                "count_in": count_in,
+                "conversion_rate": conversion,
+                # Dagen zonder transacties geven null terug
+                "sales_per_transaction": None if rng.random() < 0.02 else spt,
+            }
+        }
+    return dates
+
+
+def _shop_hours(rng: random.Random, start: dt.date, days: int) -> dict:
+    """Zelfde vorm als `_shop_dates`, maar één record per uur; open 9–18 uur met een zaterdagpiek."""
+    dates = {}
+    base = rng.uniform(20, 80)
+    for i in range(days):
+        day = start + dt.timedelta(days=i)
+        saturday = day.weekday() == 5
+        for hour in range(24):
+            stamp = dt.datetime.combine(day, dt.time(hour))
+            if OPEN_HOURS[0] <= hour < OPEN_HOURS[1]:
+                peak = 1.8 if saturday and 11 <= hour < 16 else 1.0
+                count_in = round(base * peak * rng.uniform(0.6, 1.4))
+                conversion = round(rng.uniform(0.1, 0.45) * (1.1 if saturday else 1.0), 4)
+                spt = round(rng.uniform(15, 150), 2)
+            else:
+                count_in, conversion, spt = 0, 0.0, None
+            dates[stamp.strftime("%a. %b %d, %Y %H:%M")] = {
+                "data": {
+                    "dt": stamp.isoformat(sep=" "),
+                    "turnover": round(count_in * conversion * (spt or 0), 2),
+                    "count_in": count_in,
+                    "conversion_rate": conversion,
+                    "sales_per_transaction": spt,
+                }
+            }
+    return dates
+
+
+def make_response(n_shops: int, days: int = 365, start: dt.date = dt.date(2024, 1, 1), seed: int = 0,
+                  step: str = "day") -> dict:
+    """Bouwt een response met `n_shops` shops × `days` dagen (step=day of step=hour)."""
+    rng = random.Random(seed)
+    build = _shop_hours if step == "hour" else _shop_dates
+    pool = [build(rng, start, days) for _ in range(min(PROFILE_POOL, n_shops))]
+    return {str(26000 + i): {"dates": pool[i % len(pool)]} for i in range(n_shops)}
+
+
+def make_store_table(n_stores: int, seed: int = 0):
+    """Store-tabel zoals `portfolio.iter_store_table` die inleest, met `n_stores` rijen."""
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "store_id": np.arange(26000, 26000 + n_stores),
+        "visitors_day": rng.uniform(50, 800, n_stores).round(),
+        "conv_pct": rng.uniform(0.1, 0.45, n_stores),
+        "atv_eur": rng.uniform(15, 150, n_stores),
+        "open_days": rng.integers(5, 8, n_stores),
+        "sat_share": rng.uniform(0.12, 0.25, n_stores),
+    })
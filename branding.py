@@ -0,0 +1,179 @@
+"""
+Huisstijl van de PFM-pagina's: kleuren, CSS en de slider-JS. Eén plek, één keer per proces
+opgebouwd; de pagina's importeren alleen de constanten.
+"""
+
+# Branding colors
+PFM_PURPLE = "#762181"
+PFM_RED    = "#F04438"
+PFM_AMBER  = "#F59E0B"
+PFM_GREEN  = "#16A34A"
+PFM_ORANGE = "#FEAC76"
+
+# Basis CSS (fonts, cards, buttons, sliders styling)
+BASE_CSS = f"""
+<style>
+@import url('https://fonts.googleapis.com/css2?family=Instrument+Sans:wght@400;500;600;700;800&display=swap');
+
+:root {{
+    --pfm-purple: {PFM_PURPLE};
+    --pfm-red:    {PFM_RED};
+    --pfm-amber:  {PFM_AMBER};
+    --pfm-green:  {PFM_GREEN};
+    --pfm-orange: {PFM_ORANGE};
+}}
+
+html, body, [class*="css"] {{
+    font-family: 'Instrument Sans', sans-serif !important;
+}}
+
+.card {{
+    border: 1px solid #eee;
+    border-radius: 16px;
+    padding: 14px 16px;
+    background: #FFF7F2;
+    box-shadow: 0 1px 2px rgba(0,0,0,0.05);
+}}
+
+.kpi {{
+    font-variant-numeric: tabular-nums;
+    font-weight: 800;
+    font-size: 1.2rem;
+    color: #000000;   /* let op: font-color → color corrigeren */
+}}
+
+.kpi-sub {{
+    color: #666;
+}}
+
+.payback-card {{
+    border: 1px solid var(--pfm-orange);
+    background: #FFF7F2;
+}}
+
+.payback-title {{
+    font-weight: 700;
+}}
+
+/* PFM red button */
+.stButton > button {{
+    background-color: var(--pfm-red) !important;
+    color: white !important;
+    border: none !important;
+    border-radius: 12px !important;
+    font-weight: 700 !important;
+    height: 44px;
+}}
+
+/* Slider track segmenten – omgedraaid */
+.stSlider [data-baseweb="slider"] > div > div:nth-child(1) {{
+    background-color: #FAFAFA !important; /* inactief deel */
+    height: 6px !important;
+    border-radius: 3px !important;
+}}
+
+.stSlider [data-baseweb="slider"] > div > div:nth-child(2) {{
+    background-color: var(--pfm-purple) !important; /* actief deel */
+    height: 6px !important;
+    border-radius: 3px !important;
+}}
+
+/* Thumb */
+.stSlider [data-baseweb="slider"] [role="slider"] {{
+    background-color: var(--pfm-purple) !important;
+    border: 2px solid white !important;
+    width: 22px !important;
+    height: 22px !important;
+    margin-top: -1px !important;
+    border-radius: 50% !important;
+    transition: background-color .15s ease, box-shadow .15s ease;
+}}
+
+.stSlider [data-baseweb="slider"] [role="slider"]:hover,
+.stSlider [data-baseweb="slider"] [role="slider"]:focus {{
+    background-color: #9350a3 !important;
+    box-shadow: 0 0 0 6px rgba(118,33,129,0.12) !important;
+}}
+</style>
+"""
+
+# Expo mode: grotere letters (altijd laden, want expo vast op True)
+EXPO_CSS = """
+<style>
+h1, h2, h3, .stMarkdown p {{
+    font-size: 1.12em !important;
+}}
+
+.card .kpi {{
+    font-size: 1.5rem !important;
+}}
+
+.card .kpi-sub {{
+    font-size: 1.05rem !important;
+}}
+</style>
+"""
+
+REDUCE_TOP_PADDING = """
+<style>
+    /* Hoofd content container - reduceer top padding */
+    .stAppViewBlockContainer,
+    section.main .block-container,
+    .block-container {
+        padding-top: 1rem !important;     /* was ~3-4rem → nu veel minder */
+        margin-top: 0 !important;
+    }
+
+    /* Extra agressief als nodig - forceer echt naar boven */
+    .stMainBlockContainer {
+        padding-top: 0.5rem !important;
+    }
+
+    /* Optioneel: header volledig weg of transparant maken als je dat nog niet hebt */
+    header {
+        visibility: hidden;
+        height: 0 !important;
+    }
+
+    /* Zorg dat de eerste content niet overlapt met eventuele vaste header */
+    .stApp {
+        padding-top: 0 !important;
+    }
+</style>
+"""
+
+# Alles samen, in deze volgorde op de pagina
+FULL_CSS = BASE_CSS + EXPO_CSS + REDUCE_TOP_PADDING
+
+# Slider gradient JS (blijft hetzelfde)
+SLIDER_JS = """
+<script>
+(function(){
+  function paint(slider){
+    const rail = slider.querySelector(':scope > div > div');
+    const thumb = slider.querySelector('[role="slider"]');
+    if (!rail || !thumb) return;
+    const now = parseFloat(thumb.getAttribute('aria-valuenow'));
+    const min = parseFloat(thumb.getAttribute('aria-valuemin')) || 0;
+    const max = parseFloat(thumb.getAttribute('aria-valuemax')) || 100;
+    const pct = Math.max(0, Math.min(100, ((now - min) / (max - min)) * 100));
+    rail.style.setProperty('background',
+      `linear-gradient(to right, var(--pfm-purple) 0%, var(--pfm-purple) ${pct}%, #FAFAFA ${pct}%, #FAFAFA 100%)`,
+      'important'
+    );
+  }
+  function attach(slider){
+    const thumb = slider.querySelector('[role="slider"]');
+    if (!thumb) return;
+    ['input','change','mousemove','keydown','pointermove','pointerup','pointerdown'].forEach(ev=>{
+      thumb.addEventListener(ev, ()=>paint(slider), {passive:true});
+    });
+    paint(slider);
+  }
+  function scan(){ document.querySelectorAll('.stSlider [data-baseweb="slider"]').forEach(attach); }
+  window.addEventListener('load', scan);
+  const mo = new MutationObserver(scan);
+  mo.observe(document.body, { childList:true, subtree:true });
+})();
+</script>
+"""
@@ -1,25 +1,221 @@
+import codecs
+import json
+import os
+
+import numpy as np
 import pandas as pd
 
-def normalize_vemcount_response(response_json: dict) -> pd.DataFrame:
-    rows = []
+from timing import timed
+
+# Output-schema van de genormaliseerde Vemcount-data (één rij per shop per dag)
+COLUMNS = ["shop_id", "date", "turnover", "count_in", "conversion_rate", "sales_per_transaction"]
+KPI_FIELDS = ["turnover", "count_in", "conversion_rate", "sales_per_transaction"]
+
+# Vemcount levert `dt` als ISO-datum; met een vast formaat slaat pandas de format-inference over
+DATE_FORMAT = "%Y-%m-%d"
+
 
+def _parse_dates(values) -> pd.DatetimeIndex:
+    # Alle shops delen dezelfde kalender: alleen de unieke labels parsen en terug-indexeren
+    codes, uniques = pd.factorize(np.asarray(values, dtype=object))
+    try:
+        parsed = pd.to_datetime(uniques, format=DATE_FORMAT)
+    except (ValueError, TypeError):
+        # Bijv. "2024-01-06 00:00:00" bij step=hour of afwijkende wrappers
+        parsed = pd.to_datetime(uniques, format="ISO8601")
+    return parsed.take(codes, allow_fill=True, fill_value=pd.NaT)
+
+
+def empty_frame() -> pd.DataFrame:
+    """Lege DataFrame met hetzelfde schema als `normalize_vemcount_response`."""
+    return pd.DataFrame({
+        "shop_id": np.empty(0, dtype=np.int64),
+        "date": pd.to_datetime(np.empty(0, dtype="datetime64[ns]")),
+        **{k: np.empty(0, dtype=np.float64) for k in KPI_FIELDS},
+    })
+
+
+def _collect(response_json: dict):
+    """Verzamelt shop_ids per dag en de `data`-dicts zonder tussenliggende rij-dicts."""
+    shop_ids = []
+    counts = []
+    records = []
     for shop_id, shop_content in response_json.items():
         dates = shop_content.get("dates", {})
-        for date_label, day_info in dates.items():
-            data = day_info.get("data", {})
-
-            row = {
-                "shop_id": int(shop_id),
-                "date": data.get("dt"),
-                "turnover": float(data.get("turnover", 0)),
-                "count_in": float(data.get("count_in", 0)),
-                "conversion_rate": float(data.get("conversion_rate", 0)),
-                "sales_per_transaction": float(data.get("sales_per_transaction") or 0),
-            }
-            rows.append(row)
-
-    df = pd.DataFrame(rows)
-    if not df.empty and "date" in df.columns:
-        df["date"] = pd.to_datetime(df["date"])
-
-    return df
+        records.extend(day_info.get("data", {}) for day_info in dates.values())
+        shop_ids.append(int(shop_id))
+        counts.append(len(dates))
+    return shop_ids, counts, records
+
+
+def _build_frame(shop_ids, counts, records) -> pd.DataFrame:
+    n = len(records)
+    if n == 0:
+        return empty_frame()
+
+    columns = {
+        "shop_id": np.repeat(np.asarray(shop_ids, dtype=np.int64), counts),
+        "date": _parse_dates([r.get("dt") for r in records]),
+    }
+    for field in ["turnover", "count_in", "conversion_rate"]:
+        columns[field] = np.fromiter((r.get(field, 0) for r in records), dtype=np.float64, count=n)
+    # sales_per_transaction kan null zijn (geen transacties) → 0
+    columns["sales_per_transaction"] = np.fromiter(
+        (r.get("sales_per_transaction") or 0 for r in records), dtype=np.float64, count=n
+    )
+    return pd.DataFrame(columns, columns=COLUMNS)
+
+
+@timed("normalize")
+def normalize_vemcount_response(response_json: dict) -> pd.DataFrame:
+    """
+    Zet de geneste Vemcount-response (shop > dates > data) om in een platte DataFrame.
+
+    Kolomsgewijs opgebouwd: de KPI's worden direct in getypeerde NumPy-arrays gevuld
+    en de datums in één keer met een vast formaat geparsed.
+    """
+    return _build_frame(*_collect(response_json))
+
+
+# =========================
+# Streaming (grote report-bodies)
+# =========================
+DEFAULT_CHUNK_ROWS = 100_000
+READ_SIZE = 1 << 16
+
+_decoder = json.JSONDecoder()
+
+
+def _iter_text(source):
+    """Levert tekstblokken uit een pad, file-object of iterator van bytes/str (bijv. `iter_content`)."""
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as fh:
+            yield from _iter_text(fh)
+        return
+    if hasattr(source, "read"):
+        blocks = iter(lambda: source.read(READ_SIZE), source.read(0))
+    else:
+        blocks = source
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    for block in blocks:
+        yield decoder.decode(block) if isinstance(block, bytes) else block
+    yield decoder.decode(b"", final=True)
+
+
+def _skip_ws(buf: str, pos: int) -> int:
+    while pos < len(buf) and buf[pos] in " \t\r\n":
+        pos += 1
+    return pos
+
+
+def iter_vemcount_shops(source):
+    """
+    Parseert de top-level response (`{shop_id: {...}, ...}`) shop voor shop.
+
+    Alleen de shop die op dat moment binnenkomt staat in het geheugen; de rest van
+    de body wordt nooit als geheel ingelezen.
+    """
+    if isinstance(source, dict):
+        yield from source.items()
+        return
+
+    blocks = _iter_text(source)
+    buf, pos, eof = "", 0, False
+    started = False
+
+    def more():
+        # Minstens verdubbelen, zodat een grote shop niet bij elk blok opnieuw geparsed wordt
+        nonlocal buf, pos, eof
+        pending = [buf[pos:]]
+        wanted = max(len(pending[0]), 1)
+        received = 0
+        while received < wanted:
+            block = next(blocks, None)
+            if block is None:
+                eof = True
+                break
+            pending.append(block)
+            received += len(block)
+        buf, pos = "".join(pending), 0
+
+    while True:
+        pos = _skip_ws(buf, pos)
+        if pos >= len(buf):
+            if eof:
+                raise ValueError("Onvolledige Vemcount-response: JSON eindigt voortijdig")
+            more()
+            continue
+
+        if not started:
+            if buf[pos] != "{":
+                raise ValueError("Vemcount-response moet een JSON-object zijn")
+            started, pos = True, pos + 1
+            continue
+        if buf[pos] == "}":
+            return
+        if buf[pos] == ",":
+            pos += 1
+            continue
+
+        # Eén "shop_id": {...} paar; bij een half binnengekomen paar meer lezen en opnieuw proberen
+        try:
+            shop_id, end = _decoder.raw_decode(buf, pos)
+            end = _skip_ws(buf, end)
+            if end >= len(buf) or buf[end] != ":":
+                raise json.JSONDecodeError("':' verwacht", buf, end)
+            shop_content, end = _decoder.raw_decode(buf, _skip_ws(buf, end + 1))
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            more()
+            continue
+        pos = end
+        yield shop_id, shop_content
+
+
+def iter_normalize_vemcount_chunks(source, chunk_rows: int = DEFAULT_CHUNK_ROWS):
+    """
+    Streaming-variant van `normalize_vemcount_response`.
+
+    Levert DataFrames van hoogstens `chunk_rows` rijen; `pd.concat` van alle chunks
+    geeft exact hetzelfde resultaat als de niet-streamende functie.
+    """
+    if chunk_rows <= 0:
+        raise ValueError("chunk_rows moet positief zijn")
+
+    shop_ids, counts, records = [], [], []
+    for shop_id, shop_content in iter_vemcount_shops(source):
+        days = [day_info.get("data", {}) for day_info in shop_content.get("dates", {}).values()]
+        while days:
+            take = days[:chunk_rows - len(records)]
+            days = days[len(take):]
+            records.extend(take)
+            shop_ids.append(int(shop_id))
+            counts.append(len(take))
+            if len(records) == chunk_rows:
+                yield _build_frame(shop_ids, counts, records)
+                shop_ids, counts, records = [], [], []
+    if records:
+        yield _build_frame(shop_ids, counts, records)
+
+
+def write_vemcount_parquet(source, path, chunk_rows: int = DEFAULT_CHUNK_ROWS) -> int:
+    """Schrijft de genormaliseerde chunks direct weg naar Parquet; geeft het aantal rijen terug."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer = None
+    n_rows = 0
+    try:
+        for chunk in iter_normalize_vemcount_chunks(source, chunk_rows):
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            writer.write_table(table.cast(writer.schema))
+            n_rows += len(chunk)
+        if writer is None:
+            empty_frame().to_parquet(path, index=False)
+    finally:
+        if writer is not None:
+            writer.close()
+    return n_rows
@@ -0,0 +1,141 @@
+"""
+EU-notatie voor de pagina's (duizendtallen met punt, decimalen met komma). Bewust zonder
+Pandas, zodat de eerste render er niet op hoeft te wachten.
+
+`fmt_eur`/`fmt_pct`/`fmt_months` formatteren één waarde; de `*_array`-varianten doen een
+hele kolom (NumPy-array of Pandas Series) in één gevectoriseerde pass en geven exact
+dezelfde strings terug.
+"""
+import numpy as np
+
+
+def fmt_pct(x, decimals=1):
+    return f"{x*100:.{decimals}f}%".replace(".", ",")
+
+
+def fmt_eur(x, decimals=0):
+    """
+    Formatteert een getal als euro met Nederlandse notatie:
+    - Duizendtal-scheiding: punt (.)
+    - Decimaal: komma (,)
+    - Altijd afronden op 'decimals' plaatsen
+    """
+    try:
+        # Eerst afronden op het gewenste aantal decimalen
+        x_rounded = round(float(x), decimals)
+
+        # Splits in integer + decimaal deel
+        if decimals == 0:
+            integer_str = f"{int(x_rounded):,}".replace(",", ".")
+            return f"€{integer_str}"
+        else:
+            formatted = f"{x_rounded:,.{decimals}f}"
+            # Vervang , door X (tijdelijke placeholder), . door , , X terug naar .
+            formatted = formatted.replace(",", "X").replace(".", ",").replace("X", ".")
+            return f"€{formatted}"
+    except (ValueError, TypeError, OverflowError):
+        return "€0"
+
+
+def fmt_months(x):
+    """Terugverdientijd als "7,3 mo"; `inf` (nooit terugverdiend) wordt "n/a"."""
+    return "n/a" if x == float("inf") else f"{x:.1f}".replace(".", ",") + " mo"
+
+
+# =========================
+# Gevectoriseerd (tabellen, exports)
+# =========================
+EXACT_LIMIT = 2.0 ** 52  # tot hier zijn gehele getallen in float64 exact
+
+
+def _fixed(x: np.ndarray, decimals: int, group: bool, negative_zero: bool = True, prefix: str = "",
+           suffix: str = ""):
+    """
+    `prefix + teken + f"{|x|:,.{decimals}f}" + suffix` met EU-scheidingstekens, voor een hele
+    array tegelijk: de tekens worden als code points in een (n, breedte)-matrix gezet en die
+    wordt als stringarray bekeken. Geeft ook een masker terug van waarden die niet exact
+    vectorieel kunnen (NaN/inf, te groot, bijna precies op een halve afronding): die gaan
+    via de scalaire formatter.
+    """
+    flat = x.ravel()
+    n = flat.size
+    if n == 0:
+        return np.zeros(x.shape, dtype="<U1"), np.zeros(x.shape, dtype=bool)
+    scaled = np.abs(flat) * 10.0 ** decimals
+    with np.errstate(invalid="ignore"):
+        fallback = ~np.isfinite(flat) | (scaled >= EXACT_LIMIT) | (
+            np.abs(scaled % 1.0 - 0.5) <= 1e-6 + scaled * 1e-15)
+    units = np.where(fallback, 0.0, np.round(scaled)).astype(np.int64)
+    int_part, frac_part = np.divmod(units, 10 ** decimals)
+    negative = np.signbit(flat) if negative_zero else np.signbit(flat) & (units > 0)
+
+    n_digits = np.ones(n, dtype=np.int64)
+    power, largest = 10, int(int_part.max())
+    while power <= largest:
+        n_digits += int_part >= power
+        power *= 10
+    tail = len(suffix) + (decimals + 1 if decimals else 0)
+    int_len = n_digits + ((n_digits - 1) // 3 if group else 0)
+    length = len(prefix) + negative + int_len + tail
+    width = int(length.max())
+
+    # Rechts uitgelijnd opbouwen: achtervoegsel, decimalen, komma, cijfers (+ punten), teken, voorvoegsel
+    codes = np.zeros((n, width), dtype=np.uint32)
+    right = width - 1
+    for i, ch in enumerate(reversed(suffix)):
+        codes[:, right - i] = ord(ch)
+    for k in range(decimals):
+        codes[:, right - len(suffix) - k] = 48 + (frac_part // 10 ** k) % 10
+    if decimals:
+        codes[:, right - len(suffix) - decimals] = ord(",")
+    for k in range(int(n_digits.max())):
+        used = k < n_digits
+        off = tail + k + (k // 3 if group else 0)
+        codes[:, right - off] = np.where(used, 48 + (int_part // 10 ** k) % 10, 0)
+        if group and k and k % 3 == 0:
+            codes[:, right - off + 1] = np.where(used, ord("."), 0)
+    rows = np.arange(n)
+    sign_col = right - tail - int_len
+    codes[rows[negative], sign_col[negative]] = ord("-")
+    start = width - length
+    for i, ch in enumerate(prefix):
+        codes[rows, start + i] = ord(ch)
+
+    # Links uitlijnen; afsluitende nullen vallen weg in de stringweergave
+    src = start[:, np.newaxis] + np.arange(width)
+    left = np.where(src < width, codes[rows[:, np.newaxis], np.minimum(src, right)], 0).astype(np.uint32)
+    return left.view(f"<U{width}").reshape(x.shape), fallback.reshape(x.shape)
+
+
+def _finish(values, strings, fallback, scalar):
+    out = strings.astype(object)
+    if fallback.any():
+        flat = np.asarray(values, dtype=np.float64)
+        out[fallback] = [scalar(v) for v in flat[fallback]]
+    if hasattr(values, "index") and hasattr(values, "to_numpy"):  # Pandas Series in → Series uit
+        import pandas as pd
+
+        return pd.Series(out, index=values.index, name=getattr(values, "name", None))
+    return out
+
+
+def fmt_eur_array(values, decimals=0):
+    """`fmt_eur` voor een hele kolom."""
+    x = np.asarray(values, dtype=np.float64)
+    # `int(round(x))` bij 0 decimalen laat geen "-0" staan, `f"{-0.0:,.2f}"` wel
+    strings, fallback = _fixed(x, decimals, group=True, negative_zero=decimals > 0, prefix="€")
+    return _finish(values, strings, fallback, lambda v: fmt_eur(v, decimals))
+
+
+def fmt_pct_array(values, decimals=1):
+    """`fmt_pct` voor een hele kolom."""
+    x = np.asarray(values, dtype=np.float64) * 100
+    strings, fallback = _fixed(x, decimals, group=False, suffix="%")
+    return _finish(values, strings, fallback, lambda v: fmt_pct(v, decimals))
+
+
+def fmt_months_array(values):
+    """`fmt_months` voor een hele kolom; `inf` wordt "n/a"."""
+    x = np.asarray(values, dtype=np.float64)
+    strings, fallback = _fixed(x, 1, group=False, suffix=" mo")
+    return _finish(values, strings, fallback, fmt_months)
@@ -0,0 +1,258 @@
+"""
+Uurdata (Vemcount `step=hour`) als dichte kubus shop × dag × uur per KPI, opgeslagen als
+`.npy`-bestanden die alleen-lezen ge-mmapt worden: sessies en processen op dezelfde server
+delen dan de pagina's uit de OS-cache in plaats van elk een kopie in het geheugen.
+
+Opgeslagen worden de optelbare KPI's (`count_in`, `turnover`, `transactions`); conversie en
+besteding per transactie zijn verhoudingen en worden bij het lezen uit de sommen afgeleid.
+Ontbrekende uren zijn NaN en tellen in sommen als 0.
+"""
+import functools
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+CUBE_KPIS = ("count_in", "turnover", "transactions")
+CUBE_DTYPE = np.float32  # halveert schijf en geheugen; sommen gaan in float64
+DEFAULT_CUBE_DIR = os.environ.get("PFM_CUBE_DIR", os.path.join(".cache", "cubes"))
+KEEP_CUBES = 8           # `prune_cubes`: zoveel recentste kubussen blijven op schijf staan
+META_FILE = "meta.json"
+ROW_BLOCK = 1024         # shops per blok bij het optellen
+SATURDAY = 5             # maandag = 0, zoals in saturday_analysis
+WEEKDAYS = (0, 1, 2, 3, 4)
+
+
+def cube_path(key: str, root: str = DEFAULT_CUBE_DIR) -> str:
+    """Vaste map per bron (bijv. hash van de upload of de API-parameters)."""
+    return os.path.join(root, hashlib.sha1(key.encode("utf-8")).hexdigest()[:16])
+
+
+def is_hourly(df) -> bool:
+    """True als het genormaliseerde frame uurwaarden bevat (meer dan één rij per shop per dag)."""
+    if df.empty:
+        return False
+    dates = df["date"]
+    return bool((dates != dates.dt.normalize()).any())
+
+
+def write_hourly_cube(chunks, path: str, shop_ids, start, end) -> "HourlyCube":
+    """
+    Vult de kubus voor `shop_ids` × [start, end] vanuit genormaliseerde uur-frames (één
+    DataFrame of een iterator van chunks, bijv. `iter_normalize_vemcount_chunks`). Er wordt
+    in een tijdelijke map geschreven en daarna in één keer hernoemd, zodat een lezer nooit
+    een halve kubus ziet; staat `path` er al (een ander proces was eerder), dan wint die.
+    """
+    import pandas as pd
+    from saturday_analysis import add_transactions
+
+    if isinstance(chunks, pd.DataFrame):
+        chunks = [chunks]
+    shops = np.unique(np.asarray(list(shop_ids), dtype=np.int64))
+    start, end = np.datetime64(start, "D"), np.datetime64(end, "D")
+    n_days = int((end - start).astype(np.int64)) + 1
+    if not len(shops) or n_days <= 0:
+        raise ValueError("Geen shops of leeg datumbereik voor de uurkubus")
+
+    parent = os.path.dirname(os.path.abspath(path))
+    os.makedirs(parent, exist_ok=True)
+    tmp = tempfile.mkdtemp(dir=parent, prefix=".tmp-")
+    try:
+        os.chmod(tmp, 0o755)  # mkdtemp maakt 0700; andere processen (workers) moeten kunnen lezen
+        arrays = {}
+        for kpi in CUBE_KPIS:
+            arrays[kpi] = np.lib.format.open_memmap(os.path.join(tmp, f"{kpi}.npy"), mode="w+",
+                                                    dtype=CUBE_DTYPE, shape=(len(shops), n_days, 24))
+            arrays[kpi][...] = np.nan
+        for chunk in chunks:
+            if chunk.empty:
+                continue
+            rows = np.searchsorted(shops, chunk["shop_id"].to_numpy(np.int64))
+            t = chunk["date"].to_numpy().astype("datetime64[h]")
+            day = t.astype("datetime64[D]")
+            offset = (day - start).astype(np.int64)
+            hour = (t - day).astype(np.int64)
+            ok = (rows < len(shops)) & (offset >= 0) & (offset < n_days)
+            ok[ok] &= shops[rows[ok]] == chunk["shop_id"].to_numpy(np.int64)[ok]
+            index = (rows[ok], offset[ok], hour[ok])
+            values = {"count_in": chunk["count_in"].to_numpy(np.float64),
+                      "turnover": chunk["turnover"].to_numpy(np.float64),
+                      "transactions": add_transactions(chunk).to_numpy()}
+            for kpi in CUBE_KPIS:
+                arrays[kpi][index] = values[kpi][ok]
+        for arr in arrays.values():
+            arr.flush()
+        del arrays
+        meta = {"shops": shops.tolist(), "start": str(start), "n_days": n_days, "kpis": list(CUBE_KPIS),
+                "dtype": np.dtype(CUBE_DTYPE).name}
+        with open(os.path.join(tmp, META_FILE), "w") as fh:
+            json.dump(meta, fh)
+        try:
+            os.rename(tmp, path)
+        except OSError:
+            if not os.path.exists(os.path.join(path, META_FILE)):
+                raise
+            shutil.rmtree(tmp, ignore_errors=True)
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    return open_hourly_cube(path)
+
+
+def build_hourly_cube(df, path: str) -> "HourlyCube":
+    """Kubus uit één genormaliseerd uur-frame; shops en datumbereik komen uit het frame zelf."""
+    days = df["date"].to_numpy().astype("datetime64[D]")
+    return write_hourly_cube(df, path, df["shop_id"].unique(), days.min(), days.max())
+
+
+@functools.lru_cache(maxsize=KEEP_CUBES)
+def open_hourly_cube(path: str) -> "HourlyCube":
+    """Eén geopende kubus per pad per proces; alle sessies lezen via dezelfde mmap."""
+    return HourlyCube(path)
+
+
+def prune_cubes(root: str = DEFAULT_CUBE_DIR, keep: int = KEEP_CUBES) -> list:
+    """Verwijdert alle behalve de `keep` recentste kubussen; geeft de verwijderde paden."""
+    try:
+        entries = [os.path.join(root, name) for name in os.listdir(root) if not name.startswith(".")]
+    except FileNotFoundError:
+        return []
+    entries.sort(key=os.path.getmtime, reverse=True)
+    removed = entries[keep:]
+    for path in removed:
+        shutil.rmtree(path, ignore_errors=True)
+    return removed
+
+
+class HourlyCube:
+    """
+    Alleen-lezen kubus per KPI, vorm (shops, dagen, 24). `select` snijdt er één deel uit,
+    bijv. alle zaterdagen 11:00–16:00 voor een paar shops:
+
+        cube.select("count_in", shops=[26304], weekdays=[5], hours=(11, 16))
+    """
+
+    def __init__(self, path: str):
+        with open(os.path.join(path, META_FILE)) as fh:
+            meta = json.load(fh)
+        self.path = path
+        self.shops = np.asarray(meta["shops"], dtype=np.int64)
+        self.start = np.datetime64(meta["start"], "D")
+        self.n_days = int(meta["n_days"])
+        self.data = {kpi: np.load(os.path.join(path, f"{kpi}.npy"), mmap_mode="r") for kpi in meta["kpis"]}
+        self.days = self.start + np.arange(self.n_days)
+        # Weekdag per dag (1970-01-01 was een donderdag = 3)
+        self.weekday = ((self.days.astype(np.int64) + 3) % 7).astype(np.int8)
+
+    @property
+    def end(self):
+        return self.start + np.timedelta64(self.n_days - 1, "D")
+
+    @property
+    def nbytes(self) -> int:
+        return sum(arr.nbytes for arr in self.data.values())
+
+    def _rows(self, shops) -> np.ndarray:
+        if shops is None:
+            return np.arange(len(self.shops))
+        shops = np.asarray(list(shops), dtype=np.int64)
+        pos = np.searchsorted(self.shops, shops)
+        ok = pos < len(self.shops)
+        ok[ok] &= self.shops[pos[ok]] == shops[ok]  # onbekende shops vallen weg
+        return pos[ok]
+
+    def _days(self, start=None, end=None, weekdays=None) -> np.ndarray:
+        lo = 0 if start is None else max(0, int((np.datetime64(start, "D") - self.start).astype(np.int64)))
+        hi = self.n_days if end is None else min(self.n_days,
+                                                int((np.datetime64(end, "D") - self.start).astype(np.int64)) + 1)
+        days = np.arange(lo, max(lo, hi))
+        if weekdays is not None:
+            days = days[np.isin(self.weekday[days], list(weekdays))]
+        return days
+
+    def select(self, kpi: str, shops=None, start=None, end=None, weekdays=None, hours=(0, 24)) -> np.ndarray:
+        """
+        Deelkubus (shops × dagen × uren) als kopie; `hours=(11, 16)` is 11:00 tot 16:00.
+        Alleen de geraakte pagina's van het bestand worden gelezen.
+        """
+        index = np.ix_(self._rows(shops), self._days(start, end, weekdays), np.arange(hours[0], hours[1]))
+        return self.data[kpi][index]
+
+    def hourly_totals(self, shops=None, start=None, end=None, weekdays=None) -> dict:
+        """Som per uur van de dag (24 waarden, float64) per opgeslagen KPI."""
+        rows, days = self._rows(shops), self._days(start, end, weekdays)
+        out = {}
+        for kpi, arr in self.data.items():
+            total = np.zeros(24)
+            for lo in range(0, len(rows), ROW_BLOCK):  # begrensd blok shops tegelijk in het geheugen
+                block = arr[np.ix_(rows[lo:lo + ROW_BLOCK], days, np.arange(24))]
+                total += np.nansum(block, axis=(0, 1), dtype=np.float64)
+            out[kpi] = total
+        return out
+
+    def hourly_profile(self, shops=None, start=None, end=None):
+        """
+        Gemeten uurprofiel per uur van de dag: aandeel van de zaterdagbezoekers, zaterdag-
+        conversie, doordeweekse conversie en het relatieve verschil (als `sat_boost`).
+        """
+        import pandas as pd
+
+        sat = self.hourly_totals(shops, start, end, (SATURDAY,))
+        week = self.hourly_totals(shops, start, end, WEEKDAYS)
+        sat_visitors = sat["count_in"]
+        total = sat_visitors.sum()
+        sat_conv = _ratio(sat["transactions"], sat_visitors)
+        weekday_conv = _ratio(week["transactions"], week["count_in"])
+        return pd.DataFrame({
+            "sat_visitors": sat_visitors,
+            "sat_visitor_share": sat_visitors / total if total > 0 else np.zeros(24),
+            "sat_conv": sat_conv,
+            "weekday_conv": weekday_conv,
+            "sat_boost": np.divide(sat_conv, weekday_conv, out=np.ones(24), where=weekday_conv > 0) - 1.0,
+        }, index=pd.RangeIndex(24, name="hour"))
+
+    def window_stats(self, hours: tuple, shops=None, start=None, end=None) -> dict:
+        """
+        Zaterdag in het venster `hours` vs dezelfde uren doordeweeks. `effective_boost` is de
+        boost voor de hele zaterdag als alleen dit venster verbetert: aandeel bezoekers × boost.
+        """
+        sat = self.hourly_totals(shops, start, end, (SATURDAY,))
+        week = self.hourly_totals(shops, start, end, WEEKDAYS)
+        window = slice(hours[0], hours[1])
+        sat_in, sat_trans = sat["count_in"][window].sum(), sat["transactions"][window].sum()
+        wd_in, wd_trans = week["count_in"][window].sum(), week["transactions"][window].sum()
+        sat_all = sat["count_in"].sum()
+        sat_conv = sat_trans / sat_in if sat_in > 0 else 0.0
+        weekday_conv = wd_trans / wd_in if wd_in > 0 else 0.0
+        boost = sat_conv / weekday_conv - 1.0 if weekday_conv > 0 else 0.0
+        share = sat_in / sat_all if sat_all > 0 else 0.0
+        turnover_all = sat["turnover"].sum()
+        return {"visitor_share": float(share),
+                "turnover_share": float(sat["turnover"][window].sum() / turnover_all) if turnover_all > 0 else 0.0,
+                "sat_conv": float(sat_conv), "weekday_conv": float(weekday_conv), "boost": float(boost),
+                "effective_boost": float(share * boost)}
+
+    def daily_frame(self):
+        """Dagtotalen in het schema van `normalize_vemcount_response` (bijv. voor `WeekdayIndex`)."""
+        import pandas as pd
+
+        sums = {kpi: np.nansum(arr, axis=2, dtype=np.float64) for kpi, arr in self.data.items()}
+        seen = ~np.all(np.isnan(self.data["count_in"]), axis=2)
+        rows, days = np.nonzero(seen)
+        count_in, turnover, trans = (sums[k][rows, days] for k in ("count_in", "turnover", "transactions"))
+        return pd.DataFrame({
+            "shop_id": self.shops[rows],
+            "date": pd.to_datetime(self.days[days]),
+            "turnover": turnover,
+            "count_in": count_in,
+            "conversion_rate": _ratio(trans, count_in),
+            "sales_per_transaction": _ratio(turnover, trans),
+        })
+
+
+def _ratio(num: np.ndarray, den: np.ndarray) -> np.ndarray:
+    return np.divide(num, den, out=np.zeros_like(num, dtype=np.float64), where=den > 0)
+
@@ -0,0 +1,79 @@
+"""
+Incrementeel herberekenen van afgeleide metrics: een graaf `naam → (invoer, functie)` (zoals
+`roi_engine.ROI_NODES`) met luie, gememoiseerde nodes. Een gewijzigde invoer maakt alleen de
+metrics stroomafwaarts ervan ongeldig; bij 100k stores scheelt dat bijv. bij `opex_month` de
+hele bezoekers- en omzetketen.
+"""
+import numpy as np
+
+
+class MetricGraph:
+    """
+    `set_inputs` vergelijkt met de vorige invoer en vergeet alleen wat ervan afhangt; `get`
+    rekent verouderde nodes op verzoek uit. `recomputed` noemt de nodes die sinds de laatste
+    `set_inputs` opnieuw berekend zijn (in volgorde van berekenen).
+    """
+
+    def __init__(self, nodes: dict, input_names, prepare=None):
+        self.nodes = nodes
+        self.input_names = tuple(input_names)
+        self._prepare = prepare or (lambda value: value)
+        self._values = {}
+        self.recomputed = []
+        self.changed = []
+        # Per invoer/node: alle nodes die er (indirect) van afhangen
+        children = {name: [] for name in (*self.input_names, *nodes)}
+        for name, (deps, _) in nodes.items():
+            for dep in deps:
+                if dep not in children:
+                    raise ValueError(f"Node {name!r} hangt af van onbekende invoer {dep!r}")
+                children[dep].append(name)
+        self._downstream = {}
+        for name in children:
+            seen, stack = set(), list(children[name])
+            while stack:
+                node = stack.pop()
+                if node not in seen:
+                    seen.add(node)
+                    stack.extend(children[node])
+            self._downstream[name] = seen
+
+    def set_inputs(self, **inputs) -> list:
+        """Nieuwe invoer (alle of een deel); geeft de namen van de invoer die echt veranderd is."""
+        unknown = set(inputs) - set(self.input_names)
+        if unknown:
+            raise ValueError(f"Onbekende invoer: {', '.join(sorted(unknown))}")
+        changed = []
+        for name, value in inputs.items():
+            value = self._prepare(value)
+            if name in self._values and _same(self._values[name], value):
+                continue
+            self._values[name] = value
+            changed.append(name)
+            for node in self._downstream[name]:
+                self._values.pop(node, None)
+        self.changed, self.recomputed = changed, []
+        return changed
+
+    def get(self, name: str):
+        try:
+            return self._values[name]
+        except KeyError:
+            pass
+        if name not in self.nodes:
+            raise KeyError(f"Invoer {name!r} is nog niet gezet" if name in self.input_names else name)
+        deps, fn = self.nodes[name]
+        value = fn(*[self.get(dep) for dep in deps])
+        self._values[name] = value
+        self.recomputed.append(name)
+        return value
+
+    def results(self, names) -> dict:
+        return {name: self.get(name) for name in names}
+
+
+def _same(old, new) -> bool:
+    if old is new:
+        return True
+    old, new = np.asarray(old), np.asarray(new)
+    return old.shape == new.shape and old.dtype == new.dtype and np.array_equal(old, new, equal_nan=True)
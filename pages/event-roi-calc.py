@@ -1,215 +1,53 @@
+import datetime
+import io
+import os
+import sys
+import time
+
+_rerun_started = time.perf_counter()
+
 import streamlit as st
 import numpy as np
-import plotly.graph_objects as go
+
+# Repo-root op het pad, ook bij `streamlit run pages/event-roi-calc.py`
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Alleen lichte modules bovenaan (NumPy + eigen code). Pandas, Plotly, pyarrow en requests
+# worden pas geïmporteerd in de sectie die ze nodig heeft, zodat de KPI-kaarten er eerder staan.
+from branding import FULL_CSS, PFM_AMBER, PFM_GREEN, PFM_ORANGE, PFM_PURPLE, PFM_RED, SLIDER_JS
+from formatting import fmt_eur, fmt_eur_array, fmt_months, fmt_pct
+from presets import DEFAULT_INPUTS, DEFAULT_NUM_STORES, PRESETS
+from roi_cashflow import CASHFLOW_DEFAULTS, RAMP_SHAPES, discount_factors, project_cashflows
+from roi_engine import INPUT_KEYS, input_key, roi_metric_graph
+from roi_goalseek import meets_target, solve_presets, solve_uplift
+from roi_montecarlo import distribution_key, simulate_summary_cached
+from roi_sensitivity import INPUT_LABELS, SWEEP_RANGES, sweep_grid_cached, tornado_cached
+from shared_results import shared_results
+from shop_mapping import SHOP_NAME_MAP
+import timing
+
+# =========================
+# Timing & profiling (debug-paneel met ?debug=1; zie timing.py voor de logbestanden)
+# =========================
+debug = st.query_params.get("debug") == "1"
+_timer = timing.start_rerun(debug or timing.sinks_configured(), started=_rerun_started, first_stage="imports")
+_profile_kind = st.session_state.pop("_profile_next", None)  # "Profile next rerun" in het debug-paneel
+_profiler = timing.RerunProfiler(_profile_kind) if _profile_kind else None
+if _profiler is not None:
+    _profiler.start()
+timing.stage("page_setup")
 
 # =========================
 # Page & styling
 # =========================
 st.set_page_config(page_title="PFM ROI Simulator — Expo Edition (EN)", page_icon="💡", layout="wide")
 
-# Branding colors
-PFM_PURPLE = "#762181"
-PFM_RED    = "#F04438"
-PFM_AMBER  = "#F59E0B"
-PFM_GREEN  = "#16A34A"
-PFM_ORANGE = "#FEAC76"
-
 #expo = st.toggle("Expo mode (bigger UI for trade show screens)", value=True)
 expo = True  # Vast aan voor deze Expo Edition app
 
-# kleuren bovenaan blijven zoals jij ze had
-PFM_PURPLE = "#762181"
-PFM_RED    = "#F04438"
-PFM_AMBER  = "#F59E0B"
-PFM_GREEN  = "#16A34A"
-PFM_ORANGE = "#FEAC76"
-
-# --- CSS: alleen maat/radius + thumb/hover (geen kleur op rail) --- origineel rij 36 FFF7F2
-# =========================
-# CSS & JS (één keer laden, geen duplicatie)
-# =========================
-
-# Branding colors (blijven zoals je ze had)
-PFM_PURPLE = "#762181"
-PFM_RED    = "#F04438"
-PFM_AMBER  = "#F59E0B"
-PFM_GREEN  = "#16A34A"
-PFM_ORANGE = "#FEAC76"
-
-# Basis CSS (fonts, cards, buttons, sliders styling)
-BASE_CSS = f"""
-<style>
-@import url('https://fonts.googleapis.com/css2?family=Instrument+Sans:wght@400;500;600;700;800&display=swap');
-
-:root {{
-    --pfm-purple: {PFM_PURPLE};
-    --pfm-red:    {PFM_RED};
-    --pfm-amber:  {PFM_AMBER};
-    --pfm-green:  {PFM_GREEN};
-    --pfm-orange: {PFM_ORANGE};
-}}
-
-html, body, [class*="css"] {{
-    font-family: 'Instrument Sans', sans-serif !important;
-}}
-
-.card {{
-    border: 1px solid #eee;
-    border-radius: 16px;
-    padding: 14px 16px;
-    background: #FFF7F2;
-    box-shadow: 0 1px 2px rgba(0,0,0,0.05);
-}}
-
-.kpi {{
-    font-variant-numeric: tabular-nums;
-    font-weight: 800;
-    font-size: 1.2rem;
-    color: #000000;   /* let op: font-color → color corrigeren */
-}}
-
-.kpi-sub {{
-    color: #666;
-}}
-
-.payback-card {{
-    border: 1px solid var(--pfm-orange);
-    background: #FFF7F2;
-}}
-
-.payback-title {{
-    font-weight: 700;
-}}
-
-/* PFM red button */
-.stButton > button {{
-    background-color: var(--pfm-red) !important;
-    color: white !important;
-    border: none !important;
-    border-radius: 12px !important;
-    font-weight: 700 !important;
-    height: 44px;
-}}
-
-/* Slider track segmenten – omgedraaid */
-.stSlider [data-baseweb="slider"] > div > div:nth-child(1) {{
-    background-color: #FAFAFA !important; /* inactief deel */
-    height: 6px !important;
-    border-radius: 3px !important;
-}}
-
-.stSlider [data-baseweb="slider"] > div > div:nth-child(2) {{
-    background-color: var(--pfm-purple) !important; /* actief deel */
-    height: 6px !important;
-    border-radius: 3px !important;
-}}
-
-/* Thumb */
-.stSlider [data-baseweb="slider"] [role="slider"] {{
-    background-color: var(--pfm-purple) !important;
-    border: 2px solid white !important;
-    width: 22px !important;
-    height: 22px !important;
-    margin-top: -1px !important;
-    border-radius: 50% !important;
-    transition: background-color .15s ease, box-shadow .15s ease;
-}}
-
-.stSlider [data-baseweb="slider"] [role="slider"]:hover,
-.stSlider [data-baseweb="slider"] [role="slider"]:focus {{
-    background-color: #9350a3 !important;
-    box-shadow: 0 0 0 6px rgba(118,33,129,0.12) !important;
-}}
-</style>
-"""
-
-# Expo mode: grotere letters (altijd laden, want expo vast op True)
-EXPO_CSS = """
-<style>
-h1, h2, h3, .stMarkdown p {{
-    font-size: 1.12em !important;
-}}
-
-.card .kpi {{
-    font-size: 1.5rem !important;
-}}
-
-.card .kpi-sub {{
-    font-size: 1.05rem !important;
-}}
-</style>
-"""
-
-# Combineer beide CSS blocks (BASE eerst, dan EXPO → EXPO overschrijft waar nodig)
-FULL_CSS = BASE_CSS + EXPO_CSS
-
-REDUCE_TOP_PADDING = """
-<style>
-    /* Hoofd content container - reduceer top padding */
-    .stAppViewBlockContainer,
-    section.main .block-container,
-    .block-container {
-        padding-top: 1rem !important;     /* was ~3-4rem → nu veel minder */
-        margin-top: 0 !important;
-    }
-
-    /* Extra agressief als nodig - forceer echt naar boven */
-    .stMainBlockContainer {
-        padding-top: 0.5rem !important;
-    }
-
-    /* Optioneel: header volledig weg of transparant maken als je dat nog niet hebt */
-    header {
-        visibility: hidden;
-        height: 0 !important;
-    }
-
-    /* Zorg dat de eerste content niet overlapt met eventuele vaste header */
-    .stApp {
-        padding-top: 0 !important;
-    }
-</style>
-"""
-
-# Voeg toe aan je FULL_CSS
-FULL_CSS = BASE_CSS + EXPO_CSS + REDUCE_TOP_PADDING
-
-# Slider gradient JS (blijft hetzelfde)
-SLIDER_JS = """
-<script>
-(function(){
-  function paint(slider){
-    const rail = slider.querySelector(':scope > div > div');
-    const thumb = slider.querySelector('[role="slider"]');
-    if (!rail || !thumb) return;
-    const now = parseFloat(thumb.getAttribute('aria-valuenow'));
-    const min = parseFloat(thumb.getAttribute('aria-valuemin')) || 0;
-    const max = parseFloat(thumb.getAttribute('aria-valuemax')) || 100;
-    const pct = Math.max(0, Math.min(100, ((now - min) / (max - min)) * 100));
-    rail.style.setProperty('background',
-      `linear-gradient(to right, var(--pfm-purple) 0%, var(--pfm-purple) ${pct}%, #FAFAFA ${pct}%, #FAFAFA 100%)`,
-      'important'
-    );
-  }
-  function attach(slider){
-    const thumb = slider.querySelector('[role="slider"]');
-    if (!thumb) return;
-    ['input','change','mousemove','keydown','pointermove','pointerup','pointerdown'].forEach(ev=>{
-      thumb.addEventListener(ev, ()=>paint(slider), {passive:true});
-    });
-    paint(slider);
-  }
-  function scan(){ document.querySelectorAll('.stSlider [data-baseweb="slider"]').forEach(attach); }
-  window.addEventListener('load', scan);
-  const mo = new MutationObserver(scan);
-  mo.observe(document.body, { childList:true, subtree:true });
-})();
-</script>
-"""
-
-# Laad alles maar één keer
-st.markdown(FULL_CSS, unsafe_allow_html=True)
-st.markdown(SLIDER_JS, unsafe_allow_html=True)
+# Kleuren, CSS en slider-JS staan in branding.py (één keer per proces opgebouwd)
+# Laad alles maar één keer (één element per rerun i.p.v. twee)
+st.markdown(FULL_CSS + SLIDER_JS, unsafe_allow_html=True)
 
 # Dan verder met de rest van je app
 st.title("PFM ROI Simulator — Expo Edition")
@@ -217,77 +55,12 @@ st.caption("Show ROI in 60 seconds. Fully interactive, preset-driven.")
 
 
 # =========================
-# Helpers
+# Presets (zie presets.py)
 # =========================
-#def fmt_eur(x, decimals=0):
-    #try:
-        #s = f"€{x:,.{decimals}f}"
-        #return s.replace(",", "X").replace(".", ",").replace("X", ".")
-    #except Exception:
-        #return "€0"
-
-def fmt_pct(x, decimals=1):
-    return f"{x*100:.{decimals}f}%".replace(".", ",")
-
-def fmt_eur(x, decimals=0):
-    """
-    Formatteert een getal als euro met Nederlandse notatie:
-    - Duizendtal-scheiding: punt (.)
-    - Decimaal: komma (,)
-    - Altijd afronden op 'decimals' plaatsen
-    """
-    try:
-        # Eerst afronden op het gewenste aantal decimalen
-        x_rounded = round(float(x), decimals)
-        
-        # Splits in integer + decimaal deel
-        if decimals == 0:
-            integer_str = f"{int(x_rounded):,}".replace(",", ".")
-            return f"€{integer_str}"
-        else:
-            formatted = f"{x_rounded:,.{decimals}f}"
-            # Vervang , door X (tijdelijke placeholder), . door , , X terug naar .
-            formatted = formatted.replace(",", "X").replace(".", ",").replace("X", ".")
-            return f"€{formatted}"
-    except (ValueError, TypeError):
-        return "€0"
-
-# =========================
-# Presets
-# =========================
-PRESETS = {
-    "Fashion Retail": {
-        "visitors_day": 350, "conv_pct": 0.20, "atv_eur": 45.0, "open_days": 7,
-        "capex": 1200.0, "opex_month": 25.0, "gross_margin": 0.60,
-        "uplift_conv": 0.01, "uplift_spv": 0.05, "sat_share": 0.18, "sat_boost": 0.10,
-        "desc": "Fashion: steady weekday traffic, weekend peaks; upsell and fitting-room conversion drive ROI."
-    },
-    "Optics & Eyewear": {
-        "visitors_day": 150, "conv_pct": 0.35, "atv_eur": 140.0, "open_days": 6,
-        "capex": 1200.0, "opex_month": 25.0, "gross_margin": 0.65,
-        "uplift_conv": 0.05, "uplift_spv": 0.07, "sat_share": 0.20, "sat_boost": 0.08,
-        "desc": "Optics: higher ATV with appointment-like footfall; staffing around Saturday boosts conversion."
-    },
-    "Sports & Outdoor": {
-        "visitors_day": 400, "conv_pct": 0.22, "atv_eur": 60.0, "open_days": 7,
-        "capex": 1200.0, "opex_month": 25.0, "gross_margin": 0.58,
-        "uplift_conv": 0.02, "uplift_spv": 0.05, "sat_share": 0.22, "sat_boost": 0.12,
-        "desc": "Sports: seasonal peaks; demo zones and weekend traffic make ATV and conversion pop."
-    },
-    "Drugstore & Personal Care": {
-        "visitors_day": 400, "conv_pct": 0.28, "atv_eur": 22.0, "open_days": 7,
-        "capex": 1200.0, "opex_month": 25.0, "gross_margin": 0.40,
-        "uplift_conv": 0.02, "uplift_spv": 0.04, "sat_share": 0.16, "sat_boost": 0.06,
-        "desc": "Drugstore: high frequency, lower ATV; queue reduction and cross-sell lift weekend ROI."
-    },
-}
-
 # A. Defaults
 for k, v in [
-    ("visitors_day", 350), ("conv_pct", 0.20), ("atv_eur", 45.0), ("open_days", 7),
-    ("capex", 1200.0), ("opex_month", 25.0), ("gross_margin", 0.60),
-    ("uplift_conv", 0.05), ("uplift_spv", 0.05), ("sat_share", 0.18), ("sat_boost", 0.10),
-    ("num_stores", 100),  # ← default 50
+    *DEFAULT_INPUTS.items(),
+    ("num_stores", DEFAULT_NUM_STORES),
     ("preset_desc", ""),
 ]:
     st.session_state.setdefault(k, v)
@@ -319,9 +92,7 @@ with c2:
 with c3:
     if st.button("Apply preset", use_container_width=True):
         p = PRESETS[preset_name]
-        for key in ["visitors_day","conv_pct","atv_eur","open_days",
-                    "capex","opex_month","gross_margin","uplift_conv",
-                    "uplift_spv","sat_share","sat_boost"]:
+        for key in INPUT_KEYS:
             st.session_state[key] = p[key]
         # Preserve current number of stores
         st.session_state["preset_desc"] = p.get("desc","")
@@ -330,9 +101,159 @@ with c3:
 if st.session_state.get("preset_desc"):
     st.info(st.session_state["preset_desc"])
 
+# =========================
+# Measured Saturday profile (Vemcount history)
+# =========================
+timing.stage("saturday_panel")
+SAT_SHARE_MAX, SAT_BOOST_MAX = 0.50, 0.10  # bereik van de sliders hieronder
+
+def _api_url():
+    try:
+        return st.secrets.get("API_URL", "")
+    except Exception:  # geen secrets.toml (lokaal / expo zonder API)
+        return ""
+
+with st.expander("📡 Measured Saturday profile (Vemcount history)", expanded=False):
+    st.caption("Derive Saturday share and Saturday conversion boost from real daily data "
+               "instead of preset guesses.")
+    backfill_path = os.environ.get("PFM_BACKFILL_PATH", "")  # Parquet-dataset van vemcount_backfill.py
+    sources = ((["Vemcount API"] if _api_url() else []) + ["Upload file"]
+               + (["Backfill dataset"] if backfill_path and os.path.isdir(backfill_path) else []))
+    sat_source = st.radio("Data source", sources, horizontal=True, key="sat_source")
+    sat_index = sat_cube = None
+
+    if sat_source == "Upload file":
+        upload = st.file_uploader("Normalized data (CSV/Parquet) or raw Vemcount JSON",
+                                  type=["csv", "parquet", "json"], key="sat_upload")
+        if upload is not None:
+            @st.cache_resource(max_entries=4, show_spinner="Indexing history…")
+            def load_history_upload(name, data):
+                import hashlib
+
+                import pandas as pd
+                from data_transformer import iter_normalize_vemcount_chunks
+                from hourly_cube import build_hourly_cube, cube_path, is_hourly, open_hourly_cube, prune_cubes
+                from saturday_analysis import WeekdayIndex
+
+                if name.endswith(".parquet"):
+                    df = pd.read_parquet(io.BytesIO(data))
+                elif name.endswith(".json"):
+                    df = pd.concat(list(iter_normalize_vemcount_chunks(io.BytesIO(data))), ignore_index=True)
+                else:
+                    df = pd.read_csv(io.BytesIO(data), parse_dates=["date"])
+                if not is_hourly(df):
+                    return WeekdayIndex(df), None
+                # step=hour: kubus op schijf (gedeeld via mmap), dagtotalen daaruit voor de index
+                path = cube_path("upload:" + hashlib.sha1(data).hexdigest())
+                cube = open_hourly_cube(path) if os.path.isdir(path) else build_hourly_cube(df, path)
+                prune_cubes()
+                return WeekdayIndex(cube.daily_frame()), cube
+            sat_index, sat_cube = load_history_upload(upload.name, upload.getvalue())
+    elif sat_source == "Backfill dataset":
+        @st.cache_resource(max_entries=4, show_spinner="Reading backfill dataset…")
+        def load_weekday_index_backfill(path, years):
+            from saturday_analysis import WeekdayIndex
+            from vemcount_backfill import read_backfill
+
+            # Alleen de partities van de gekozen jaren worden gelezen
+            df = read_backfill(path, start=datetime.date(years[0], 1, 1), end=datetime.date(years[1], 12, 31))
+            return None if df.empty else WeekdayIndex(df)
+        from vemcount_backfill import backfill_years
+
+        bf_years = backfill_years(backfill_path)
+        if not bf_years:
+            st.caption("The backfill dataset has no partitions yet; run `python vemcount_backfill.py`.")
+        else:
+            bf_range = (st.select_slider("Years", bf_years, value=(bf_years[-1], bf_years[-1]), key="sat_backfill_years")
+                        if len(bf_years) > 1 else (bf_years[0], bf_years[0]))
+            sat_index = load_weekday_index_backfill(backfill_path, tuple(bf_range))
+    elif st.toggle("Load last 365 days for all shops", value=False, key="sat_load_api"):
+        @st.cache_resource(max_entries=4, show_spinner="Loading Vemcount history…")
+        def load_weekday_index_api(api_url, shop_ids, start, end):
+            from report_cache import ReportCache, get_kpi_data_cached
+            from saturday_analysis import WeekdayIndex
+            from vemcount_client import VemcountClient
+
+            with VemcountClient(api_url) as client:  # één set verbindingen voor alle ontbrekende periodes
+                df = get_kpi_data_cached(shop_ids, start, end, client.fetch_range, ReportCache())
+            return WeekdayIndex(df)
+        yesterday = datetime.date.today() - datetime.timedelta(days=1)
+        sat_index = load_weekday_index_api(_api_url(), tuple(SHOP_NAME_MAP), yesterday - datetime.timedelta(days=364),
+                                           yesterday)
+
+        @st.cache_resource(max_entries=2, show_spinner="Loading hourly Vemcount data…")
+        def load_hourly_cube_api(api_url, shop_ids, start, end):
+            from hourly_cube import cube_path, open_hourly_cube, prune_cubes, write_hourly_cube
+            from vemcount_client import VemcountClient
+
+            path = cube_path(f"api:{api_url}:{shop_ids}:{start}:{end}")
+            if os.path.isdir(path):
+                return open_hourly_cube(path)
+            with VemcountClient(api_url) as client:
+                batches = client.iter_batches(shop_ids, period="date", date_from=start, date_to=end, step="hour")
+                cube = write_hourly_cube(batches, path, shop_ids, start, end)
+            prune_cubes()
+            return cube
+        if st.toggle("Hourly detail (step=hour, 24× the data)", value=False, key="sat_load_hourly"):
+            sat_cube = load_hourly_cube_api(_api_url(), tuple(SHOP_NAME_MAP),
+                                            yesterday - datetime.timedelta(days=364), yesterday)
+
+    if sat_index is not None:
+        idx_start = sat_index.start.astype(datetime.date)
+        idx_end = sat_index.end.astype(datetime.date)
+        d1, d2 = st.columns([2, 1])
+        with d1:
+            sat_shops = st.multiselect("Shops", list(sat_index.shops), default=list(sat_index.shops),
+                                       format_func=lambda s: SHOP_NAME_MAP.get(int(s), str(s)), key="sat_shops")
+        with d2:
+            sat_range = st.date_input("Date range", (idx_start, idx_end), min_value=idx_start,
+                                      max_value=idx_end, key="sat_range")
+        if sat_shops and isinstance(sat_range, tuple) and len(sat_range) == 2:
+            measured = sat_index.chain_stats(sat_range[0], sat_range[1], sat_shops)
+            m1, m2, m3 = st.columns(3)
+            m1.metric("Saturday share of turnover", fmt_pct(measured["sat_share"]))
+            m2.metric("Saturday conversion", fmt_pct(measured["sat_conv"]),
+                      delta=f"weekday {fmt_pct(measured['weekday_conv'])}", delta_color="off")
+            m3.metric("Saturday conversion boost", fmt_pct(measured["sat_boost"]))
+            if st.button("Use measured values", key="sat_apply"):
+                # Afronden op hele procenten en binnen het slider-bereik houden
+                st.session_state["sat_share"] = min(SAT_SHARE_MAX, max(0.0, round(measured["sat_share"], 2)))
+                st.session_state["sat_boost"] = min(SAT_BOOST_MAX, max(0.0, round(measured["sat_boost"], 2)))
+                st.rerun()
+            if measured["sat_boost"] < 0:
+                st.caption("Saturday converts worse than weekdays here; the boost slider starts at 0%.")
+            with st.popover("Per shop"):
+                per_shop = sat_index.saturday_stats(sat_range[0], sat_range[1], sat_shops)
+                per_shop.index = [SHOP_NAME_MAP.get(int(s), str(s)) for s in per_shop.index]
+                st.dataframe(per_shop.style.format("{:.1%}"))
+
+            if sat_cube is not None:
+                st.markdown("**Hourly Saturday profile**")
+                sat_window = st.slider("Peak window (hours)", 0, 24, (11, 16), 1, key="sat_window")
+                with timing.span("hourly_profile"):
+                    hourly = sat_cube.hourly_profile(sat_shops, sat_range[0], sat_range[1])
+                    window = sat_cube.window_stats(sat_window, sat_shops, sat_range[0], sat_range[1])
+                from store_charts import hourly_profile_chart
+                st.plotly_chart(hourly_profile_chart(hourly, sat_window, (PFM_PURPLE, PFM_AMBER, "#9CA3AF")),
+                                use_container_width=True)
+                w1, w2, w3 = st.columns(3)
+                w1.metric("Window share of Saturday visitors", fmt_pct(window["visitor_share"]))
+                w2.metric("Window conversion boost", fmt_pct(window["boost"]),
+                          delta=f"Sat {fmt_pct(window['sat_conv'])} vs weekday {fmt_pct(window['weekday_conv'])}",
+                          delta_color="off")
+                w3.metric("Effective Saturday boost", fmt_pct(window["effective_boost"]))
+                st.caption("Effective boost = window share × window boost: the whole-Saturday uplift if only "
+                           "the peak window improves.")
+                if st.button("Use peak-window boost", key="sat_apply_window"):
+                    # Zaterdag-aandeel uit de dagtotalen; de boost alleen voor het venster
+                    st.session_state["sat_share"] = min(SAT_SHARE_MAX, max(0.0, round(measured["sat_share"], 2)))
+                    st.session_state["sat_boost"] = min(SAT_BOOST_MAX, max(0.0, round(window["effective_boost"], 2)))
+                    st.rerun()
+
 # =========================
 # Inputs
 # =========================
+timing.stage("inputs")
 left, right = st.columns([1,1])
 with left:
     st.subheader("Inputs (per store)")
@@ -362,64 +283,30 @@ with right:
 # =========================
 # Calculations (chain totals = per-store × number of stores)
 # =========================
+timing.stage("roi_math")
 V = st.session_state
 n_stores    = int(V["num_stores"])
-vis_day     = V["visitors_day"]
-conv_pct    = V["conv_pct"]
-atv_eur     = V["atv_eur"]
-open_days   = V["open_days"]
-capex       = V["capex"]
-opex_month  = V["opex_month"]
-gross_margin= V["gross_margin"]
 uplift_conv = V["uplift_conv"]
 uplift_spv  = V["uplift_spv"]
 sat_share   = V["sat_share"]
 sat_boost   = V["sat_boost"]
+gross_margin= V["gross_margin"]
 
-# Per store baseline
-visitors_week_store  = vis_day * open_days
-visitors_year_store  = visitors_week_store * 52
-trans_year_store     = visitors_year_store * conv_pct
-turn_year_store      = trans_year_store * atv_eur
-
-conv_new   = conv_pct * (1.0 + uplift_conv)
-atv_new    = atv_eur * (1.0 + uplift_spv)
-
-# Chain totals (baseline)
-visitors_year_total = visitors_year_store * n_stores
-trans_year_total    = trans_year_store * n_stores
-turn_year_total     = turn_year_store * n_stores
-
-# Scenario totals with Saturday boost on conversion
-visitors_year_sat_total      = visitors_year_total * sat_share
-trans_year_sat_new_total     = visitors_year_sat_total * conv_new * (1.0 + sat_boost)
-trans_year_non_sat_new_total = (visitors_year_total * (1 - sat_share)) * conv_new
-turn_year_new_total          = (trans_year_sat_new_total + trans_year_non_sat_new_total) * atv_new
-
-uplift_year_abs_total  = max(0.0, turn_year_new_total - turn_year_total)
-uplift_month_abs_total = uplift_year_abs_total / 12.0
-
-# Costs & profit (chain-level)
-capex_total      = capex * n_stores
-opex_month_total = opex_month * n_stores
-extra_profit_month_total = uplift_month_abs_total * gross_margin - opex_month_total
-payback_months = float("inf") if extra_profit_month_total <= 0 else capex_total / extra_profit_month_total
-roi_year_pct   = (uplift_year_abs_total * gross_margin - opex_month_total * 12 - capex_total) / max(1.0, (capex_total + opex_month_total * 12))
-roi_year_pct   = max(-1.0, roi_year_pct)
-
-# --- Split for donut (conversion vs SPV), chain-level ---
-# Conv-only uplift: conversion changes (incl. Saturday extra), ATV baseline
-conv_only_turn_total   = (((visitors_year_total * sat_share) * (conv_pct * (1 + sat_boost)) +
-                           (visitors_year_total * (1 - sat_share)) * conv_pct) * atv_eur)
-conv_only_uplift_total = max(0.0, conv_only_turn_total - turn_year_total)
-
-# SPV-only uplift: ATV increases, conversions baseline
-spv_only_turn_total    = trans_year_total * (atv_eur * (1 + uplift_spv))
-spv_only_uplift_total  = max(0.0, spv_only_turn_total - turn_year_total)
-
-split_total = max(1e-9, conv_only_uplift_total + spv_only_uplift_total)
-share_conv  = conv_only_uplift_total / split_total
-share_spv   = spv_only_uplift_total / split_total
+# Alle rekenwerk zit in roi_engine (NumPy, ook bruikbaar voor arrays van stores × scenario's).
+# Presets × gangbare slider-standen komen uit een procesbrede tabel die alle sessies delen;
+# overige invoer uit een begrensde LRU per genormaliseerde invoer-tuple
+R = shared_results(n_stores).get(input_key(V))
+turn_year_total          = R["turn_year_total"]
+turn_year_new_total      = R["turn_year_new_total"]
+uplift_year_abs_total    = R["uplift_year_abs_total"]
+uplift_month_abs_total   = R["uplift_month_abs_total"]
+extra_profit_month_total = R["extra_profit_month_total"]
+payback_months           = R["payback_months"]
+roi_year_pct             = R["roi_year_pct"]
+conv_only_uplift_total   = R["conv_only_uplift_total"]
+spv_only_uplift_total    = R["spv_only_uplift_total"]
+share_conv               = R["share_conv"]
+share_spv                = R["share_spv"]
 
 # Pre-format for EU hover tooltips
 baseline_eur   = fmt_eur(turn_year_total, decimals=0)
@@ -430,6 +317,7 @@ spv_uplift_eur = fmt_eur(spv_only_uplift_total, decimals=0)
 # =========================
 # KPI Cards (chain totals)
 # =========================
+timing.stage("kpi_cards")
 k1, k2, k3, k4 = st.columns(4)
 with k1:
     st.markdown(f'<div class="card"><div><b>🧮 Revenue/yr</b></div><div class="kpi">{baseline_eur}</div><div class="kpi-sub">× {n_stores} stores</div></div>', unsafe_allow_html=True)
@@ -438,63 +326,384 @@ with k2:
 with k3:
     st.markdown(f'<div class="card"><div><b>💵 Extra profit/mnth</b></div><div class="kpi">{fmt_eur(extra_profit_month_total)}</div><div class="kpi-sub">Margin {fmt_pct(gross_margin)}</div></div>', unsafe_allow_html=True)
 with k4:
-    card_cls = "card payback-card" if (payback_months != float("inf") and payback_months < 12) else "card"
-    payback_text = "n/a" if payback_months == float("inf") else f"{payback_months:.1f}".replace(".", ",") + " mo"
+    card_cls = "card payback-card" if (payback_months != float("inf") and payback_months <= 12) else "card"
+    payback_text = fmt_months(payback_months)
     st.markdown(f'<div class="{card_cls}"><div class="payback-title">⏱️ Payback time</div><div class="kpi">{payback_text}</div><div class="kpi-sub">ROI-year {fmt_pct(roi_year_pct,1)}</div></div>', unsafe_allow_html=True)
 
+# Goal seek: minimaal benodigde uplift per hefboom voor het doel (gesloten vorm, de andere hefboom blijft staan)
+GOAL_TARGETS = {"Payback within (months)": "payback_months", "ROI-year at least (%)": "roi_year_pct"}
+GOAL_LEVERS = [("uplift_conv", "Conversion uplift", 0.10), ("uplift_spv", "ATV uplift", 0.20)]  # max = slider
+g1, g2, g3 = st.columns([2, 2, 1])
+with g3:
+    with st.popover("🎯 Target", use_container_width=True):
+        gs_label = st.radio("Goal", list(GOAL_TARGETS), key="gs_target")
+        gs_target = GOAL_TARGETS[gs_label]
+        if gs_target == "payback_months":
+            gs_value = float(st.number_input(gs_label, 1, 60, 12, 1, key="gs_payback"))
+            gs_text = f"payback ≤ {gs_value:.0f} mo"
+        else:
+            gs_value = st.number_input(gs_label, -100, 1000, 50, 5, key="gs_roi") / 100.0
+            gs_text = f"ROI-year ≥ {fmt_pct(gs_value, 0)}"
+        # Pas rekenen als erom gevraagd wordt; markdown i.p.v. st.dataframe (laadt anders pandas/pyarrow bij koude start)
+        if st.toggle("Per preset (own inputs, same number of stores)", value=False, key="gs_presets"):
+            gs_presets = [solve_presets(lever, gs_target, gs_value, n_stores) for lever, _, _ in GOAL_LEVERS]
+            table = "| Preset | " + " | ".join(label for _, label, _ in GOAL_LEVERS) + " |\n|---|---:|---:|\n"
+            for name in PRESETS:
+                table += f"| {name} | " + " | ".join(
+                    "n/a" if by_preset[name] == float("inf") else f"+{fmt_pct(by_preset[name])}"
+                    for by_preset in gs_presets) + " |\n"
+            st.markdown(table)
+# Zelfde toets als de payback-kaart (≤), op de huidige KPI's: beide kaarten zijn het altijd eens
+met = bool(meets_target({"payback_months": payback_months, "roi_year_pct": roi_year_pct}, gs_target, gs_value))
+for col, (lever, label, lever_max), (other, other_label, _) in zip((g1, g2), GOAL_LEVERS, GOAL_LEVERS[::-1]):
+    needed = float(solve_uplift(V, lever, gs_target, gs_value, n_stores))
+    if needed == float("inf"):
+        value_text, sub = "n/a", "not reachable with this margin and costs"
+    else:
+        value_text = f"+{fmt_pct(needed)}"
+        sub = (f"now +{fmt_pct(V[lever], 0)} · at {other_label} +{fmt_pct(V[other], 0)}"
+               + ("" if needed <= lever_max else f" · beyond slider (max {fmt_pct(lever_max, 0)})"))
+    with col:
+        st.markdown(f'<div class="card{" payback-card" if met else ""}"><div><b>🎯 {label} needed for {gs_text}</b></div>'
+                    f'<div class="kpi">{value_text}</div><div class="kpi-sub">{sub}</div></div>', unsafe_allow_html=True)
+
 # =========================
 # Visuals (EU hover tooltips) — chain totals
 # =========================
+timing.stage("visuals")
 st.markdown("### 📊 Visuals")
 h = 420 if expo else 360
 
-# Bar with EU labels + EU hover
-fig_bar = go.Figure()
-fig_bar.add_trace(go.Bar(
-    name="Baseline",
-    x=["Revenue/year (chain)"], y=[turn_year_total], marker_color=PFM_AMBER,
-    text=[baseline_eur], textposition="outside", cliponaxis=False,
-    customdata=[[baseline_eur]],
-    hovertemplate="Baseline: %{customdata[0]}<extra></extra>"
-))
-fig_bar.add_trace(go.Bar(
-    name="New (scenario)",
-    x=["Revenue/year (chain)"], y=[turn_year_new_total], marker_color=PFM_PURPLE,
-    text=[scenario_eur], textposition="outside", cliponaxis=False,
-    customdata=[[scenario_eur]],
-    hovertemplate="New (scenario): %{customdata[0]}<extra></extra>"
-))
-fig_bar.update_layout(
-    barmode="group",
-    height=h,
-    margin=dict(l=20, r=20, t=10, b=10),
-    legend=dict(orientation="h"),
-    bargap=0.2,  # iets ruimte tussen de staven
-    bargroupgap=0.20     # ruimte tussen de twee bars in dezelfde groep
-)
-
-fig_bar.update_traces(
-    marker_line_width=0.5,
-    marker_line_color="rgba(0,0,0,0.8)"
-)
-st.plotly_chart(fig_bar, use_container_width=True)
+from roi_figures import FrozenFigure, revenue_bar, uplift_donut  # laadt Plotly; pas na de KPI-kaarten
+from store_charts import figure_bytes
+
+
+def show_chart(fig, name):
+    """
+    `st.plotly_chart` als span; met timing aan ook de verstuurde bytes, in een eigen span.
+    Alle figuren zijn `FrozenFigure`s: één meting per figuur-object, ook over reruns heen.
+    """
+    with timing.span("plotly_chart"):
+        st.plotly_chart(fig, use_container_width=True)
+    if timing.current() is not None:
+        with timing.span("figure_bytes"):
+            timing.note_bytes(name, figure_bytes(fig))
+
+
+# Figuren komen uit een begrensde LRU (roi_figures): zelfde invoer → zelfde figuur-object, niet opnieuw bouwen
+fig_bar = revenue_bar(turn_year_total, turn_year_new_total, baseline_eur, scenario_eur, h, (PFM_AMBER, PFM_PURPLE))
+show_chart(fig_bar, "revenue_bar")
 
 # Donut: Conversion (red) vs ATV (purple) with EU hover
-fig_pie = go.Figure(data=[go.Pie(
-    labels=["Conversion", "ATV"],
-    values=[share_conv, share_spv],
-    hole=.55,
-    marker=dict(colors=[PFM_RED, PFM_PURPLE]),
-    textinfo="percent+label",
-    customdata=[[conv_uplift_eur],[spv_uplift_eur]],
-    hovertemplate="%{label}: %{percent} — uplift %{customdata[0]}<extra></extra>"
-)])
-fig_pie.update_layout(height=h-40, margin=dict(l=20,r=20,t=10,b=10), showlegend=True)
-st.plotly_chart(fig_pie, use_container_width=True)
+fig_pie = uplift_donut(share_conv, share_spv, conv_uplift_eur, spv_uplift_eur, h - 40, (PFM_RED, PFM_PURPLE))
+show_chart(fig_pie, "uplift_donut")
+
+# =========================
+# Sensitivity (heatmaps & tornado)
+# =========================
+PAYBACK_CAP = 36  # maanden; alles daarboven (of nooit) krijgt de maximale kleur
+
+def _axis_scale(key):
+    # Percentages als % tonen, overige invoer (bezoekers, euro's, dagen) ongewijzigd
+    return 100.0 if SWEEP_RANGES[key][1] <= 1.0 else 1.0
+
+timing.stage("sensitivity")
+with st.expander("🧭 Sensitivity (heatmaps & tornado)", expanded=False):
+    sweep_keys = list(SWEEP_RANGES)
+    s1, s2 = st.columns(2)
+    with s1:
+        x_key = st.selectbox("X-axis", sweep_keys, index=sweep_keys.index("uplift_conv"),
+                             format_func=INPUT_LABELS.get, key="sens_x")
+    with s2:
+        y_options = [k for k in sweep_keys if k != x_key]
+        y_key = st.selectbox("Y-axis", y_options, index=y_options.index("uplift_spv") if "uplift_spv" in y_options else 0,
+                             format_func=INPUT_LABELS.get, key="sens_y")
+
+    if st.toggle("Show sensitivity", value=False, key="sens_run"):
+        import plotly.graph_objects as go
+
+        fixed = tuple(sorted((k, V[k]) for k in INPUT_KEYS if k not in (x_key, y_key)))
+        with timing.span("sensitivity_sweep"):
+            grid = sweep_grid_cached(fixed, x_key, y_key, n_stores)
+        xs, ys = grid["x"] * _axis_scale(x_key), grid["y"] * _axis_scale(y_key)
+        cur_x, cur_y = V[x_key] * _axis_scale(x_key), V[y_key] * _axis_scale(y_key)
+
+        g1, g2 = st.columns(2)
+        for col, key, title, scale in [
+            (g1, "payback_months", f"Payback (months, capped at {PAYBACK_CAP})", [[0, PFM_GREEN], [0.33, PFM_AMBER], [1, PFM_RED]]),
+            (g2, "roi_year_pct", "ROI-year (%)", [[0, PFM_RED], [0.5, PFM_ORANGE], [1, PFM_PURPLE]]),
+        ]:
+            z = np.minimum(grid[key], PAYBACK_CAP) if key == "payback_months" else grid[key] * 100.0
+            fig_heat = FrozenFigure(go.Heatmap(
+                x=xs, y=ys, z=z, colorscale=scale,
+                hovertemplate=f"{INPUT_LABELS[x_key]}: %{{x:.1f}}<br>{INPUT_LABELS[y_key]}: %{{y:.1f}}<br>%{{z:.1f}}<extra></extra>",
+            ))
+            fig_heat.add_trace(go.Scatter(
+                x=[cur_x], y=[cur_y], mode="markers", showlegend=False, hoverinfo="skip",
+                marker=dict(symbol="x", size=12, color="black"),
+            ))
+            fig_heat.update_layout(height=h - 60, margin=dict(l=20, r=20, t=30, b=10), title=title,
+                                   xaxis_title=INPUT_LABELS[x_key], yaxis_title=INPUT_LABELS[y_key])
+            with col:
+                show_chart(fig_heat, f"heatmap_{key}")
+
+        bars = tornado_cached(input_key(V), "extra_profit_month_total", n_stores)
+        bars = bars[::-1]  # grootste uitslag bovenaan
+        base_profit = extra_profit_month_total
+        labels = [INPUT_LABELS[b[0]] for b in bars]
+        fig_tornado = FrozenFigure()
+        for name, idx, color in [("−20%", 3, PFM_AMBER), ("+20%", 4, PFM_PURPLE)]:
+            fig_tornado.add_trace(go.Bar(
+                name=name, y=labels, x=[b[idx] - base_profit for b in bars], base=base_profit,
+                orientation="h", marker_color=color,
+                customdata=[[fmt_eur(b[idx])] for b in bars],
+                hovertemplate="%{y}: %{customdata[0]}<extra>" + name + "</extra>",
+            ))
+        fig_tornado.update_layout(barmode="overlay", height=h, margin=dict(l=20, r=20, t=30, b=10),
+                                  title="Extra profit/mnth — one input at a time (±20%)",
+                                  legend=dict(orientation="h"))
+        show_chart(fig_tornado, "tornado")
+
+# =========================
+# Portfolio mode (heterogeneous stores)
+# =========================
+timing.stage("portfolio")
+pf_stores = None  # gezet als er een store-tabel geladen is (ook gebruikt door de cash-flow-projectie)
+
+with st.expander("🏬 Portfolio mode (per-store table)", expanded=False):
+    st.caption("Upload a store table (columns `store_id`, `visitors_day`, `conv_pct`, `atv_eur`, `open_days`; "
+               "optional `name` and any other input such as `capex`, `sat_share` or `uplift_conv`) or a normalized "
+               "Vemcount export. Input columns override the inputs above per store; missing columns and "
+               "empty cells use the inputs above.")
+    pf_upload = st.file_uploader("Store table (CSV/Parquet)", type=["csv", "parquet"], key="pf_upload")
+    if pf_upload is not None:
+        import pandas as pd
+        from portfolio import evaluate_stores, iter_store_table, portfolio_totals, stores_from_vemcount, top_bottom
+        from results_export import format_results_table, store_labels, to_csv_bytes, to_excel_bytes
+        from store_charts import binned_histogram, store_scatter, top_n_bar
+
+        @st.cache_resource(max_entries=2, show_spinner="Reading store table…")
+        def load_store_table(name, data):
+            fmt = "parquet" if name.endswith(".parquet") else "csv"
+            stores = pd.concat(list(iter_store_table(io.BytesIO(data), fmt=fmt)), ignore_index=True)
+            if {"date", "count_in"} <= set(stores.columns):
+                # Genormaliseerde Vemcount-export: eerst per store samenvatten
+                stores["date"] = pd.to_datetime(stores["date"])
+                stores = stores_from_vemcount(stores)
+            return stores
+
+        pf_stores = load_store_table(pf_upload.name, pf_upload.getvalue())
+        # Metric-graaf per sessie: na één gewijzigde slider alleen de metrics die ervan afhangen herberekenen
+        if "_pf_graph" not in st.session_state:
+            st.session_state["_pf_graph"] = roi_metric_graph()
+        with timing.span("portfolio_evaluate"):
+            pf_results = evaluate_stores(pf_stores, {k: V[k] for k in INPUT_KEYS}, st.session_state["_pf_graph"])
+        pf = portfolio_totals(pf_results)
+
+        p1, p2, p3, p4 = st.columns(4)
+        p1.metric("Revenue/yr (chain)", fmt_eur(pf["turn_year_total"]), delta=f"{pf['n_stores']} stores", delta_color="off")
+        p2.metric("Uplift/yr", fmt_eur(pf["uplift_year_abs_total"]))
+        p3.metric("Extra profit/mnth", fmt_eur(pf["extra_profit_month_total"]))
+        p4.metric("Payback (chain)", fmt_months(pf["payback_months"]),
+                  delta=f"{pf['stores_payback_12m']} stores < 12 mo", delta_color="off")
+
+        # Goal seek per store (gesloten vorm, alle stores in één aanroep) en voor de keten als geheel (bisectie)
+        from roi_goalseek import solve_portfolio_uplift, solve_stores
+
+        with timing.span("portfolio_goalseek"):
+            pf_needed = solve_stores(pf_stores, {k: V[k] for k in INPUT_KEYS}, "uplift_conv", gs_target, gs_value)
+            pf_chain_needed = solve_portfolio_uplift(pf_stores, {k: V[k] for k in INPUT_KEYS}, "uplift_conv",
+                                                     gs_target, gs_value)
+        q1, q2, q3 = st.columns(3)
+        q1.metric(f"Conversion uplift needed (chain, {gs_text})",
+                  "n/a" if pf_chain_needed == float("inf") else f"+{fmt_pct(pf_chain_needed)}")
+        q2.metric("Median store needs", "n/a" if np.isinf(np.median(pf_needed)) else f"+{fmt_pct(np.median(pf_needed))}")
+        q3.metric("Stores meeting the goal now", f"{int((pf_needed <= V['uplift_conv']).sum()):,}".replace(",", "."),
+                  delta=f"{int(np.isinf(pf_needed).sum())} unreachable", delta_color="off")
+
+        # Grafieken per store: aggregatie en uitdunning op de server, zodat 100k stores geen MB's JSON worden
+        fig_pf = binned_histogram(pf_results["payback_months"].to_numpy(), PAYBACK_CAP, (0, PAYBACK_CAP), PFM_PURPLE,
+                                  f"Payback per store (months, last bin = {PAYBACK_CAP}+ or never)", h - 120,
+                                  "%{x:.0f} mo: %{y} stores<extra></extra>", bargap=0.05)
+        show_chart(fig_pf, "portfolio_payback_hist")
+
+        pf_n = st.slider("Top/bottom N stores", 3, 25, 10, 1, key="pf_top_n")
+        top, bottom = top_bottom(pf_results, pf_n)
+        t1, t2 = st.columns(2)
+        for col, title, frame in [(t1, "🏆 Top stores (extra profit/mnth)", top), (t2, "🐢 Bottom stores", bottom)]:
+            table = format_results_table(frame)[["Store", "Revenue/yr", "Extra profit/mnth", "Payback"]]
+            with col:
+                st.markdown(f"**{title}**")
+                st.dataframe(table, hide_index=True, use_container_width=True)
+
+        pf_labels = store_labels(pf_results)
+        v1, v2 = st.columns(2)
+        with v1:
+            fig_top = top_n_bar(pf_labels, pf_results["turn_year_total"], pf_results["turn_year_new_total"], pf_n,
+                                (PFM_AMBER, PFM_PURPLE), h, title=f"Revenue/yr — top {pf_n} stores by uplift")
+            show_chart(fig_top, "portfolio_top_n")
+        with v2:
+            fig_sc, _, _ = store_scatter(pf_results["turn_year_total"],
+                                         np.minimum(pf_results["payback_months"].to_numpy(), PAYBACK_CAP), pf_labels,
+                                         color=PFM_PURPLE, height=h, title="Revenue vs payback",
+                                         x_title="Revenue/yr (€)", y_title=f"Payback (months, capped at {PAYBACK_CAP})")
+            show_chart(fig_sc, "portfolio_scatter")
+
+        # Export van alle stores; pas opbouwen als erom gevraagd wordt, en per resultaat cachen
+        @st.cache_data(max_entries=4, show_spinner="Building export…")
+        def build_export(results, fmt):
+            table = format_results_table(results)
+            return to_csv_bytes(table) if fmt == "CSV" else to_excel_bytes(table)
+
+        e1, e2 = st.columns([1, 2])
+        with e1:
+            export_fmt = st.radio("Export format", ["CSV", "Excel"], horizontal=True, key="pf_export_fmt")
+        with e2:
+            if st.toggle("Prepare export", value=False, key="pf_export"):
+                try:
+                    data = build_export(pf_results, export_fmt)
+                except ImportError:
+                    st.caption("Excel export needs `openpyxl` or `xlsxwriter`; CSV works without.")
+                else:
+                    ext, mime = (("csv", "text/csv") if export_fmt == "CSV" else
+                                 ("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"))
+                    st.download_button(f"⬇️ Download {export_fmt} ({len(pf_results):,} stores)".replace(",", "."),
+                                       data, file_name=f"portfolio_roi.{ext}", mime=mime)
+
+# =========================
+# Multi-year cash flow (NPV, IRR, break-even)
+# =========================
+timing.stage("cashflow")
+with st.expander("📅 Multi-year cash flow (NPV, IRR, break-even)", expanded=False):
+    st.caption("Month-by-month projection with a ramp-up of the uplift, subscription churn and discounting. "
+               "Break-even is the exact month in which the cumulative cash flow turns positive.")
+    f1, f2, f3, f4, f5 = st.columns(5)
+    with f1:
+        cf_horizon = st.slider("Horizon (months)", 12, 120, CASHFLOW_DEFAULTS["horizon_months"], 6, key="cf_horizon")
+    with f2:
+        cf_discount = st.slider("Discount rate (%/yr)", 0, 20, round(CASHFLOW_DEFAULTS["discount_rate"] * 100), 1,
+                                key="cf_discount") / 100.0
+    with f3:
+        cf_ramp = st.slider("Ramp-up (months)", 0, 12, CASHFLOW_DEFAULTS["ramp_months"], 1, key="cf_ramp")
+    with f4:
+        cf_shape = st.selectbox("Ramp-up shape", RAMP_SHAPES, index=RAMP_SHAPES.index(CASHFLOW_DEFAULTS["ramp_shape"]),
+                                format_func=str.capitalize, key="cf_shape")
+    with f5:
+        cf_churn = st.slider("Churn (%/month)", 0.0, 5.0, CASHFLOW_DEFAULTS["churn_month"] * 100, 0.1,
+                             key="cf_churn") / 100.0
+    cf_scopes = ["Current inputs"] + (["Portfolio table"] if pf_stores is not None else [])
+    cf_scope = st.radio("Stores", cf_scopes, horizontal=True, key="cf_scope")
+
+    if st.toggle("Show projection", value=False, key="cf_run"):
+        import plotly.graph_objects as go
+
+        cf_params = dict(horizon_months=cf_horizon, discount_rate=cf_discount, ramp_months=cf_ramp,
+                         ramp_shape=cf_shape, churn_month=cf_churn)
+        with timing.span("cashflow_project"):
+            if cf_scope == "Portfolio table":
+                from portfolio import store_inputs
+
+                proj = project_cashflows(store_inputs(pf_stores, V), 1, **cf_params)
+            else:
+                proj = project_cashflows({k: V[k] for k in INPUT_KEYS}, n_stores, **cf_params)
+
+        def _irr_text(x):
+            if x != x:  # NaN: kasstroom wisselt niet van teken of IRR niet gevonden
+                return "n/a"
+            return "> 1.000%" if x > 10 else fmt_pct(x, 1)
+
+        q1, q2, q3, q4 = st.columns(4)
+        q1.metric(f"NPV ({cf_horizon} mo, chain)", fmt_eur(proj["chain_npv"]))
+        q2.metric("IRR (per year)", _irr_text(proj["chain_irr"]))
+        q3.metric("Break-even", fmt_months(proj["chain_break_even_month"]))
+        q4.metric("Discounted break-even", fmt_months(proj["chain_discounted_break_even_month"]))
+        if cf_scope == "Portfolio table":
+            be = proj["break_even_month"]
+            st.caption(f"{int(np.isfinite(be).sum()):,} of {len(be):,} stores break even within {cf_horizon} months; "
+                       f"median store NPV {fmt_eur(np.median(proj['npv']))}.".replace(",", "."))
+
+        months = np.arange(cf_horizon + 1)
+        chain = proj["chain_cashflow"]
+        fig_cf = FrozenFigure()
+        for name, values, color in [
+            ("Cumulative cash flow", np.cumsum(chain), PFM_PURPLE),
+            ("Discounted", np.cumsum(chain * discount_factors(cf_horizon, cf_discount)), PFM_AMBER),
+        ]:
+            fig_cf.add_trace(go.Scatter(x=months, y=values, name=name, mode="lines", line=dict(color=color, width=3),
+                                        customdata=fmt_eur_array(values),
+                                        hovertemplate="Month %{x}: %{customdata}<extra>" + name + "</extra>"))
+        if np.isfinite(proj["chain_break_even_month"]):
+            fig_cf.add_vline(x=proj["chain_break_even_month"], line_dash="dot", line_color=PFM_GREEN)
+        fig_cf.add_hline(y=0, line_color="#999", line_width=1)
+        fig_cf.update_layout(height=h - 60, margin=dict(l=20, r=20, t=30, b=10), legend=dict(orientation="h"),
+                             xaxis_title="Month", title="Chain cash flow over the horizon")
+        show_chart(fig_cf, "cashflow")
+
+# =========================
+# Uncertainty (Monte Carlo)
+# =========================
+timing.stage("montecarlo")
+MC_INPUTS = [
+    ("uplift_conv", "Conversion uplift (%)", 10),
+    ("uplift_spv", "ATV uplift (%)", 20),
+    ("sat_boost", "Extra conversion on Saturdays (%)", 10),
+]
+
+with st.expander("🎲 Uncertainty (Monte Carlo)", expanded=False):
+    st.caption("Replace point estimates by a range per uplift: the slider value is the most likely value, "
+               "the band below sets the minimum and maximum.")
+    mc_dist = st.radio("Distribution", ["Triangular", "Normal"], horizontal=True, key="mc_dist")
+    distributions = {}
+    mc_cols = st.columns(len(MC_INPUTS))
+    for col, (key, label, max_pct) in zip(mc_cols, MC_INPUTS):
+        with col:
+            mode_pct = round(V[key] * 100)
+            lo_pct, hi_pct = st.slider(label, 0, max_pct, (max(0, mode_pct - 2), min(max_pct, mode_pct + 2)), 1,
+                                       key=f"mc_range_{key}")
+            lo, hi, mode = lo_pct / 100.0, hi_pct / 100.0, min(max(V[key], lo_pct / 100.0), hi_pct / 100.0)
+            if mc_dist == "Triangular":
+                distributions[key] = {"dist": "triangular", "low": lo, "mode": mode, "high": hi}
+            else:
+                # band ≈ ±2σ rond de slider-waarde, niet onder 0
+                distributions[key] = {"dist": "normal", "mean": mode, "sd": max(hi - lo, 1e-9) / 4.0, "min": 0.0}
+    m1, m2 = st.columns(2)
+    with m1:
+        n_samples = st.select_slider("Samples", options=[100_000, 250_000, 1_000_000, 2_000_000], value=1_000_000,
+                                     format_func=lambda n: f"{n:,}".replace(",", "."), key="mc_samples")
+    with m2:
+        mc_seed = int(st.number_input("Seed (reproducible)", min_value=0, value=42, step=1, key="mc_seed"))
+
+    if st.toggle("Run simulation", value=False, key="mc_run"):
+        from store_charts import histogram_bar
+
+        with timing.span("montecarlo_simulate"):
+            summary, hists = simulate_summary_cached(input_key(V), distribution_key(distributions),
+                                                     n_samples, mc_seed, n_stores)
+        rows = [
+            ("⏱️ Payback time", fmt_months),
+            ("📈 ROI-year", lambda x: fmt_pct(x, 1)),
+            ("💵 Extra profit/mnth", fmt_eur),
+        ]
+        table = "| | P5 | P50 | P95 |\n|---|---|---|---|\n"
+        for (label, fmt), key in zip(rows, ["payback_months", "roi_year_pct", "extra_profit_month_total"]):
+            s = summary[key]
+            table += f"| {label} | {fmt(s['p5'])} | {fmt(s['p50'])} | {fmt(s['p95'])} |\n"
+        st.markdown(table)
+        n_samples_txt = f"{n_samples:,}".replace(",", ".")
+        st.caption(f"No payback in {fmt_pct(summary['no_payback_share'], 1)} of {n_samples_txt} samples.")
+
+        h1, h2 = st.columns(2)
+        for col, key, title, color in [(h1, "payback_months", "Payback (months)", PFM_PURPLE),
+                                       (h2, "roi_year_pct", "ROI-year", PFM_RED)]:
+            counts, edges = hists[key]
+            fig_hist = histogram_bar(counts, edges, color, title, h - 120, "%{x:.2f}: %{y} samples<extra></extra>")
+            with col:
+                show_chart(fig_hist, f"montecarlo_{key}")
 
 # =========================
 # Recommendations
 # =========================
+timing.stage("recommendations")
 st.markdown("### 🤖 Recommendations")
 bullets = []
 if uplift_year_abs_total <= 0:
@@ -514,3 +723,43 @@ if not bullets:
     bullets.append("Stable performance. Try micro-experiments: 2 weeks with 1 upsell script + staff roster tuned to peaks.")
 for b in bullets:
     st.write(f"- {b}")
+
+# Rerun-duur (script zelf, zonder netwerk/browser) voor latency-metingen
+st.session_state["_last_rerun_ms"] = (time.perf_counter() - _rerun_started) * 1000.0
+timing.finish_rerun()
+if _profiler is not None:
+    st.session_state["_profile_report"] = (_profiler.kind, _profiler.stop())
+
+# =========================
+# Debug panel (?debug=1): timing van deze rerun + profiler
+# =========================
+if debug:
+    with st.sidebar:
+        st.markdown("### ⏱️ Rerun timing")
+        st.caption(f"Total {st.session_state['_last_rerun_ms']:,.1f} ms (script only, excl. network/browser)")
+        table = "| Stage | ms |\n|---|---:|\n"
+        for name, _, duration, depth in sorted(_timer.spans, key=lambda span: (span[1], span[3])):
+            table += f"| {'&nbsp;' * 4 * depth}{name} | {duration * 1000:,.1f} |\n"
+        st.markdown(table)
+        if _timer.payload:
+            table = "| Figure | kB |\n|---|---:|\n"
+            for name, nbytes in _timer.payload.items():
+                table += f"| {name} | {nbytes / 1000:,.1f} |\n"
+            st.markdown(table)
+        if pf_stores is not None:
+            pf_graph = st.session_state["_pf_graph"]
+            st.caption(f"Portfolio metrics recomputed: {len(pf_graph.recomputed)}/{len(pf_graph.nodes)}"
+                       + (f" — changed: {', '.join(pf_graph.changed)}" if pf_graph.changed else ""))
+            if pf_graph.recomputed:
+                st.caption(", ".join(pf_graph.recomputed))
+
+        st.markdown("### 🔬 Profiler")
+        profiler_kind = st.radio("Profiler", timing.available_profilers(), horizontal=True, key="dbg_profiler")
+        if st.button("Profile next rerun", key="dbg_profile"):
+            st.session_state["_profile_next"] = profiler_kind
+            st.rerun()
+        if "_profile_report" in st.session_state:
+            kind, report = st.session_state["_profile_report"]
+            st.download_button(f"⬇️ {kind} report", report, file_name=f"rerun_{kind.lower()}.txt", mime="text/plain")
+            with st.expander("Report", expanded=False):
+                st.code(report, language=None)
@@ -0,0 +1,121 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from roi_engine import INPUT_KEYS, compute_roi
+from saturday_analysis import add_transactions, saturday_profile
+
+RESULT_KEYS = [
+    "turn_year_total", "turn_year_new_total", "uplift_year_abs_total",
+    "extra_profit_month_total", "capex_total", "opex_month_total",
+    "payback_months", "roi_year_pct",
+]
+DEFAULT_CHUNK_ROWS = 100_000
+
+
+def iter_store_table(source, chunk_rows: int = DEFAULT_CHUNK_ROWS, fmt: str | None = None):
+    """
+    Leest een store-tabel (CSV of Parquet) in chunks van hoogstens `chunk_rows` rijen.
+    `fmt` ("csv"/"parquet") wordt anders afgeleid uit de bestandsnaam.
+    """
+    if fmt is None:
+        fmt = "parquet" if os.path.splitext(str(source))[1].lower() == ".parquet" else "csv"
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(source).iter_batches(batch_size=chunk_rows):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(source, chunksize=chunk_rows)
+
+
+def stores_from_vemcount(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Store-tabel uit het genormaliseerde Vemcount-frame: gemiddelde bezoekers per open
+    dag, conversie, ATV, open dagen per week en het gemeten zaterdagprofiel.
+    """
+    open_day = df["count_in"] > 0
+    data = df.loc[open_day, ["shop_id", "date", "turnover", "count_in"]].assign(
+        transactions=add_transactions(df.loc[open_day])
+    )
+    g = data.groupby("shop_id")
+    sums = g[["turnover", "count_in", "transactions"]].sum()
+    n_open = g.size()
+    span_days = (g["date"].max() - g["date"].min()).dt.days + 1
+    stores = pd.DataFrame({
+        "store_id": sums.index,
+        "visitors_day": (sums["count_in"] / n_open).to_numpy(),
+        "conv_pct": np.divide(sums["transactions"], sums["count_in"]).to_numpy(),
+        "atv_eur": np.divide(sums["turnover"], sums["transactions"].where(sums["transactions"] > 0)).fillna(0).to_numpy(),
+        "open_days": np.clip(np.round(n_open / (span_days / 7.0)), 1, 7).to_numpy(),
+    })
+    sat = saturday_profile(df)[["sat_share", "sat_boost"]].clip(lower=0.0)
+    return stores.merge(sat, left_on="store_id", right_index=True, how="left")
+
+
+def store_inputs(stores: pd.DataFrame, scenario: dict) -> dict:
+    """Invoer per store: kolommen uit `stores` overschrijven het scenario (lege cellen niet)."""
+    inputs = {}
+    for key in INPUT_KEYS:
+        if key in stores.columns:
+            col = stores[key].to_numpy(dtype=np.float64)
+            inputs[key] = np.where(np.isnan(col), float(scenario[key]), col)
+        else:
+            inputs[key] = float(scenario[key])
+    return inputs
+
+
+def evaluate_stores(stores: pd.DataFrame, scenario: dict, graph=None) -> pd.DataFrame:
+    """
+    ROI per store in één gevectoriseerde aanroep; kolommen uit `stores` overschrijven het scenario.
+    Met `graph` (`roi_engine.roi_metric_graph()`, één per sessie) worden alleen de metrics
+    herberekend die afhangen van invoer die sinds de vorige aanroep veranderd is.
+    """
+    if graph is None:
+        result = compute_roi(**store_inputs(stores, scenario), num_stores=1)
+    else:
+        graph.set_inputs(**store_inputs(stores, scenario), num_stores=1)
+        result = graph.results(RESULT_KEYS)
+    out = pd.DataFrame({k: np.broadcast_to(result[k], (len(stores),)) for k in RESULT_KEYS})
+    out.insert(0, "store_id", stores["store_id"].to_numpy() if "store_id" in stores else np.arange(len(stores)))
+    if "name" in stores.columns:
+        out.insert(1, "name", stores["name"].to_numpy())
+    return out
+
+
+def evaluate_portfolio(chunks, scenario: dict) -> pd.DataFrame:
+    """Evalueert een (gestreamde) store-tabel chunk voor chunk; `chunks` is een DataFrame of iterator."""
+    if isinstance(chunks, pd.DataFrame):
+        chunks = [chunks]
+    frames = [evaluate_stores(chunk, scenario) for chunk in chunks]
+    if not frames:
+        return pd.DataFrame(columns=["store_id", *RESULT_KEYS])
+    return pd.concat(frames, ignore_index=True)
+
+
+def portfolio_totals(results: pd.DataFrame) -> dict:
+    """Ketentotalen als som over de stores; payback en ROI op keten-niveau uit die sommen."""
+    sums = results[["turn_year_total", "turn_year_new_total", "uplift_year_abs_total",
+                    "extra_profit_month_total", "capex_total", "opex_month_total"]].sum()
+    totals = {k: float(v) for k, v in sums.items()}
+    profit = totals["extra_profit_month_total"]
+    totals["payback_months"] = float("inf") if profit <= 0 else totals["capex_total"] / profit
+    cost_year = totals["capex_total"] + totals["opex_month_total"] * 12
+    margin_uplift = (profit + totals["opex_month_total"]) * 12  # uplift × marge per jaar
+    totals["roi_year_pct"] = max(-1.0, (margin_uplift - cost_year) / max(1.0, cost_year))
+    totals["n_stores"] = len(results)
+    totals["stores_payback_12m"] = int((results["payback_months"] < 12).sum())
+    return totals
+
+
+def top_bottom(results: pd.DataFrame, n: int = 10, by: str = "extra_profit_month_total"):
+    """Beste en slechtste `n` stores op `by` (zonder de hele tabel te sorteren)."""
+    values = results[by].to_numpy()
+    n = min(n, len(results))
+    if n == 0:
+        return results.iloc[:0], results.iloc[:0]
+    top = np.argpartition(-values, n - 1)[:n]
+    bottom = np.argpartition(values, n - 1)[:n]
+    return (results.iloc[top].sort_values(by, ascending=False),
+            results.iloc[bottom].sort_values(by, ascending=True))
@@ -0,0 +1,35 @@
+# Branche-presets voor de simulator (per store); `desc` wordt op de pagina als toelichting getoond
+PRESETS = {
+    "Fashion Retail": {
+        "visitors_day": 350, "conv_pct": 0.20, "atv_eur": 45.0, "open_days": 7,
+        "capex": 1200.0, "opex_month": 25.0, "gross_margin": 0.60,
+        "uplift_conv": 0.01, "uplift_spv": 0.05, "sat_share": 0.18, "sat_boost": 0.10,
+        "desc": "Fashion: steady weekday traffic, weekend peaks; upsell and fitting-room conversion drive ROI."
+    },
+    "Optics & Eyewear": {
+        "visitors_day": 150, "conv_pct": 0.35, "atv_eur": 140.0, "open_days": 6,
+        "capex": 1200.0, "opex_month": 25.0, "gross_margin": 0.65,
+        "uplift_conv": 0.05, "uplift_spv": 0.07, "sat_share": 0.20, "sat_boost": 0.08,
+        "desc": "Optics: higher ATV with appointment-like footfall; staffing around Saturday boosts conversion."
+    },
+    "Sports & Outdoor": {
+        "visitors_day": 400, "conv_pct": 0.22, "atv_eur": 60.0, "open_days": 7,
+        "capex": 1200.0, "opex_month": 25.0, "gross_margin": 0.58,
+        "uplift_conv": 0.02, "uplift_spv": 0.05, "sat_share": 0.22, "sat_boost": 0.12,
+        "desc": "Sports: seasonal peaks; demo zones and weekend traffic make ATV and conversion pop."
+    },
+    "Drugstore & Personal Care": {
+        "visitors_day": 400, "conv_pct": 0.28, "atv_eur": 22.0, "open_days": 7,
+        "capex": 1200.0, "opex_month": 25.0, "gross_margin": 0.40,
+        "uplift_conv": 0.02, "uplift_spv": 0.04, "sat_share": 0.16, "sat_boost": 0.06,
+        "desc": "Drugstore: high frequency, lower ATV; queue reduction and cross-sell lift weekend ROI."
+    },
+}
+
+# Startwaarden van de sliders als er (nog) geen preset is toegepast
+DEFAULT_INPUTS = {
+    "visitors_day": 350, "conv_pct": 0.20, "atv_eur": 45.0, "open_days": 7,
+    "capex": 1200.0, "opex_month": 25.0, "gross_margin": 0.60,
+    "uplift_conv": 0.05, "uplift_spv": 0.05, "sat_share": 0.18, "sat_boost": 0.10,
+}
+DEFAULT_NUM_STORES = 100
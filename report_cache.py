@@ -0,0 +1,198 @@
+import contextlib
+import datetime as dt
+import os
+import sqlite3
+import time
+
+import numpy as np
+import pandas as pd
+
+from data_transformer import COLUMNS, KPI_FIELDS, empty_frame, normalize_vemcount_response
+from timing import timed
+
+DEFAULT_CACHE_PATH = os.environ.get("PFM_CACHE_PATH", os.path.join(".cache", "vemcount.sqlite"))
+
+# Afgeronde dagen veranderen niet meer; de laatste dagen kunnen nog nagecorrigeerd worden
+DEFAULT_TTL = 30 * 24 * 3600
+RECENT_TTL = 3600
+RECENT_DAYS = 2
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS kpi_cache (
+    shop_id     INTEGER NOT NULL,
+    data_output TEXT    NOT NULL,
+    date        TEXT    NOT NULL,
+    value       REAL,
+    fetched_at  REAL    NOT NULL,
+    expires_at  REAL    NOT NULL,
+    PRIMARY KEY (shop_id, data_output, date)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS kpi_cache_expires ON kpi_cache (expires_at);
+"""
+
+
+def _day_range(start: dt.date, end: dt.date) -> list:
+    return [start + dt.timedelta(days=i) for i in range((end - start).days + 1)]
+
+
+def _to_ranges(days: list) -> list:
+    """Comprimeert gesorteerde dagen tot aaneengesloten (van, tot) reeksen."""
+    ranges = []
+    for day in days:
+        if ranges and day == ranges[-1][1] + dt.timedelta(days=1):
+            ranges[-1] = (ranges[-1][0], day)
+        else:
+            ranges.append((day, day))
+    return ranges
+
+
+class ReportCache:
+    """
+    Lokale SQLite-cache van Vemcount-dagwaarden, gesleuteld op (shop_id, data_output, date).
+
+    Dagen die wel zijn opgevraagd maar waarvoor Vemcount niets teruggaf worden als
+    NULL bewaard, zodat ze niet bij elk bezoek opnieuw worden opgehaald.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttl: float = DEFAULT_TTL,
+                 recent_ttl: float = RECENT_TTL, max_rows: int | None = None):
+        self.path = path
+        self.ttl = ttl
+        self.recent_ttl = recent_ttl
+        self.max_rows = max_rows
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # ":memory:" bestaat alleen binnen één connectie; die houden we dan vast
+        self._memory_con = sqlite3.connect(path, check_same_thread=False) if path == ":memory:" else None
+        with self._connect() as con:
+            con.executescript(_SCHEMA)
+
+    @contextlib.contextmanager
+    def _connect(self):
+        """Transactie op een korte connectie (Streamlit-sessies draaien in eigen threads)."""
+        if self._memory_con is not None:
+            with self._memory_con as con:
+                yield con
+            return
+        con = sqlite3.connect(self.path, timeout=30)
+        try:
+            con.execute("PRAGMA journal_mode=WAL")
+            with con:
+                yield con
+        finally:
+            con.close()
+
+    # ---------- lezen ----------
+    def cached_days(self, shop_ids, data_outputs, start: dt.date, end: dt.date, now: float | None = None) -> dict:
+        """Per shop de set dagen waarvoor álle gevraagde data_outputs geldig in de cache staan."""
+        now = time.time() if now is None else now
+        shop_ids = [int(s) for s in shop_ids]
+        data_outputs = list(data_outputs)
+        query = f"""
+            SELECT shop_id, date FROM kpi_cache
+            WHERE shop_id IN ({",".join("?" * len(shop_ids))})
+              AND data_output IN ({",".join("?" * len(data_outputs))})
+              AND date BETWEEN ? AND ? AND expires_at > ?
+            GROUP BY shop_id, date HAVING COUNT(*) = ?
+        """
+        args = [*shop_ids, *data_outputs, start.isoformat(), end.isoformat(), now, len(data_outputs)]
+        found = {shop_id: set() for shop_id in shop_ids}
+        with self._connect() as con:
+            for shop_id, date in con.execute(query, args):
+                found[shop_id].add(dt.date.fromisoformat(date))
+        return found
+
+    def missing_ranges(self, shop_ids, data_outputs, start: dt.date, end: dt.date, now: float | None = None) -> dict:
+        """Groepeert shops op hun ontbrekende datumreeks: {(van, tot): [shop_id, ...]}."""
+        wanted = _day_range(start, end)
+        plan = {}
+        for shop_id, days in self.cached_days(shop_ids, data_outputs, start, end, now).items():
+            for rng in _to_ranges([d for d in wanted if d not in days]):
+                plan.setdefault(rng, []).append(shop_id)
+        return plan
+
+    def load(self, shop_ids, start: dt.date, end: dt.date) -> pd.DataFrame:
+        """Leest het genormaliseerde frame (zelfde schema als `normalize_vemcount_response`)."""
+        shop_ids = [int(s) for s in shop_ids]
+        query = f"""
+            SELECT shop_id, date, data_output, value FROM kpi_cache
+            WHERE shop_id IN ({",".join("?" * len(shop_ids))}) AND date BETWEEN ? AND ?
+              AND value IS NOT NULL
+        """
+        with self._connect() as con:
+            long = pd.read_sql_query(query, con, params=[*shop_ids, start.isoformat(), end.isoformat()])
+        if long.empty:
+            return empty_frame()
+        wide = long.pivot_table(index=["shop_id", "date"], columns="data_output", values="value", aggfunc="first")
+        wide = wide.reindex(columns=KPI_FIELDS).fillna(0.0).reset_index()
+        wide["shop_id"] = wide["shop_id"].astype(np.int64)
+        wide["date"] = pd.to_datetime(wide["date"], format="%Y-%m-%d")
+        wide.columns.name = None
+        return wide[COLUMNS].sort_values(["shop_id", "date"], ignore_index=True)
+
+    # ---------- schrijven ----------
+    def store(self, df: pd.DataFrame, shop_ids, data_outputs, start: dt.date, end: dt.date, now: float | None = None):
+        """
+        Slaat een genormaliseerd frame op voor het opgevraagde bereik.
+
+        Opgevraagde (shop, dag)-combinaties zonder rij in `df` worden als NULL vastgelegd.
+        """
+        now = time.time() if now is None else now
+        recent_from = dt.date.fromtimestamp(now) - dt.timedelta(days=RECENT_DAYS)
+        days = pd.Index(pd.to_datetime(_day_range(start, end)).strftime("%Y-%m-%d"), name="date")
+        shop_index = pd.Index([int(s) for s in shop_ids], name="shop_id")
+
+        values = df.assign(date=df["date"].dt.strftime("%Y-%m-%d")).set_index(["shop_id", "date"])
+        full = pd.MultiIndex.from_product([shop_index, days])
+        values = values[~values.index.duplicated(keep="last")].reindex(full)
+        expires = np.where(
+            days.to_numpy() >= recent_from.isoformat(), now + self.recent_ttl, now + self.ttl
+        )
+        expires = np.tile(expires, len(shop_index))
+
+        rows = []
+        for field in data_outputs:
+            col = values[field].to_numpy(dtype=np.float64) if field in values else np.full(len(full), np.nan)
+            rows.extend(zip(
+                full.get_level_values(0).tolist(), [field] * len(full), full.get_level_values(1).tolist(),
+                [None if np.isnan(v) else float(v) for v in col], [now] * len(full), expires.tolist(),
+            ))
+        with self._connect() as con:
+            con.executemany("INSERT OR REPLACE INTO kpi_cache VALUES (?, ?, ?, ?, ?, ?)", rows)
+        if self.max_rows is not None:
+            self.evict(now)
+
+    def evict(self, now: float | None = None) -> int:
+        """Verwijdert verlopen rijen en, bij `max_rows`, de oudst opgehaalde rijen daarboven."""
+        now = time.time() if now is None else now
+        with self._connect() as con:
+            removed = con.execute("DELETE FROM kpi_cache WHERE expires_at <= ?", (now,)).rowcount
+            if self.max_rows is not None:
+                (count,) = con.execute("SELECT COUNT(*) FROM kpi_cache").fetchone()
+                if count > self.max_rows:
+                    removed += con.execute(
+                        """DELETE FROM kpi_cache WHERE (shop_id, data_output, date) IN (
+                               SELECT shop_id, data_output, date FROM kpi_cache ORDER BY fetched_at LIMIT ?)""",
+                        (count - self.max_rows,),
+                    ).rowcount
+        return removed
+
+    def clear(self):
+        with self._connect() as con:
+            con.execute("DELETE FROM kpi_cache")
+
+
+@timed("report_cache")
+def get_kpi_data_cached(shop_ids, start: dt.date, end: dt.date, fetch, cache: ReportCache,
+                        data_outputs=tuple(KPI_FIELDS)) -> pd.DataFrame:
+    """
+    Haalt alleen de ontbrekende dagen per shop op en geeft het samengevoegde genormaliseerde frame terug.
+
+    `fetch(shop_ids, date_from, date_to)` levert de ruwe Vemcount-response (dict) of al
+    een genormaliseerde DataFrame.
+    """
+    for (date_from, date_to), shops in cache.missing_ranges(shop_ids, data_outputs, start, end).items():
+        result = fetch(shops, date_from, date_to)
+        df = result if isinstance(result, pd.DataFrame) else normalize_vemcount_response(result)
+        cache.store(df, shops, data_outputs, date_from, date_to)
+    return cache.load(shop_ids, start, end)
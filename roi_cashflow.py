@@ -0,0 +1,160 @@
+import numpy as np
+
+from roi_engine import INPUT_KEYS, compute_roi
+
+# Standaardwaarden van de meerjarenprojectie (ook de beginstand van de sliders)
+CASHFLOW_DEFAULTS = {
+    "horizon_months": 60,
+    "discount_rate": 0.08,   # per jaar
+    "ramp_months": 3,        # maanden tot de volledige uplift
+    "ramp_shape": "linear",
+    "churn_month": 0.0,      # kans per maand dat een store het abonnement opzegt
+}
+RAMP_SHAPES = ("instant", "linear", "s-curve")
+IRR_MAX_ITER = 100
+IRR_BOUNDS = (0.01, 1000.0)  # (1 + maandrente): -99% … +99.900% per maand
+
+
+def ramp_curve(horizon_months: int, ramp_months: float, shape: str = "linear") -> np.ndarray:
+    """Aandeel van de volledige uplift in maand 1..H; na `ramp_months` altijd 1."""
+    if shape not in RAMP_SHAPES:
+        raise ValueError(f"Onbekende ramp-up: {shape!r} (kies uit {', '.join(RAMP_SHAPES)})")
+    months = np.arange(1, horizon_months + 1, dtype=np.float64)
+    if shape == "instant" or ramp_months <= 0:
+        return np.ones(horizon_months)
+    t = np.minimum(1.0, months / ramp_months)
+    if shape == "s-curve":
+        t = t * t * (3.0 - 2.0 * t)  # smoothstep: traag begin, traag einde
+    return t
+
+
+def survival_curve(horizon_months: int, churn_month: float = 0.0) -> np.ndarray:
+    """Kans dat een store in maand 1..H nog klant is (opzeggen aan het eind van een maand)."""
+    return (1.0 - churn_month) ** np.arange(horizon_months, dtype=np.float64)
+
+
+def cashflow_matrix(uplift_month, gross_margin, capex, opex_month, horizon_months=60, ramp_months=3,
+                    ramp_shape="linear", churn_month=0.0) -> np.ndarray:
+    """
+    Kasstromen (stores × maanden): kolom 0 is de investering (−capex), kolom m de
+    verwachte extra marge minus het abonnement in maand m. Invoer per store (arrays) of scalar.
+    """
+    uplift_month, gross_margin, capex, opex_month = np.broadcast_arrays(
+        *(np.atleast_1d(np.asarray(x, dtype=np.float64)) for x in (uplift_month, gross_margin, capex, opex_month)))
+    ramp = ramp_curve(horizon_months, ramp_months, ramp_shape)
+    alive = survival_curve(horizon_months, churn_month)
+    cf = np.empty((uplift_month.size, horizon_months + 1))
+    cf[:, 0] = -capex.ravel()
+    margin = (uplift_month * gross_margin).ravel()[:, np.newaxis]
+    cf[:, 1:] = alive * (margin * ramp - opex_month.ravel()[:, np.newaxis])
+    return cf
+
+
+def discount_factors(horizon_months: int, discount_rate: float) -> np.ndarray:
+    """Contante-waardefactor per maand 0..H bij een jaarlijkse disconteringsvoet."""
+    return (1.0 + discount_rate) ** (-np.arange(horizon_months + 1) / 12.0)
+
+
+def break_even_month(cf: np.ndarray) -> np.ndarray:
+    """
+    Exacte (fractionele) maand waarin de cumulatieve kasstroom per rij 0 bereikt, lineair
+    geïnterpoleerd binnen de maand; `inf` als dat binnen de horizon niet gebeurt.
+    """
+    cum = np.cumsum(cf, axis=1)
+    reached = cum >= 0
+    first = np.argmax(reached, axis=1)
+    rows = np.arange(cf.shape[0])
+    prev = np.maximum(first - 1, 0)
+    step = cf[rows, first]
+    frac = np.divide(-cum[rows, prev], step, out=np.zeros(len(rows)), where=step > 0)
+    month = np.where(first == 0, 0.0, prev + frac)
+    return np.where(reached.any(axis=1), month, np.inf)
+
+
+def _npv_and_slope(cf_t: np.ndarray, x: np.ndarray):
+    """
+    NPV per store en de afgeleide naar `x` = log(1 + maandrente), in één Horner-pass over
+    de maanden. `cf_t` is de getransponeerde matrix (maanden × stores), zodat elke stap
+    een aaneengesloten rij leest.
+    """
+    v = np.exp(-x)
+    value, slope = cf_t[-1].copy(), np.zeros(cf_t.shape[1])
+    for m in range(cf_t.shape[0] - 2, -1, -1):
+        slope *= v
+        slope += value
+        value *= v
+        value += cf_t[m]
+    return value, -slope * v
+
+
+def irr(cf: np.ndarray, max_iter: int = IRR_MAX_ITER, tol: float = 1e-10) -> np.ndarray:
+    """
+    Jaarlijkse IRR per rij, voor alle rijen tegelijk: Newton op log(1 + maandrente) binnen
+    een bewaakte bracket; een Newton-stap telt alleen als hij in de bracket valt en minstens
+    half zo klein is als de vorige stap, anders bisectie. NaN als de NPV binnen de grenzen
+    niet van teken wisselt of de zoektocht niet convergeert; `inf` als de IRR boven de
+    bovengrens ligt (investering binnen dagen terugverdiend).
+    """
+    cf_t = np.ascontiguousarray(cf.T)
+    n = cf.shape[0]
+    lo, hi = np.full(n, np.log(IRR_BOUNDS[0])), np.full(n, np.log(IRR_BOUNDS[1]))
+    f_lo, _ = _npv_and_slope(cf_t, lo)
+    f_hi, _ = _npv_and_slope(cf_t, hi)
+    bracketed = np.sign(f_lo) != np.sign(f_hi)
+    # Startwaarde: maandrente ≈ 1 / terugverdientijd (exact voor een eeuwigdurende annuïteit)
+    inflow = np.maximum(cf[:, 1:], 0).mean(axis=1)
+    x = np.log1p(np.divide(inflow, -cf[:, 0], out=np.zeros(n), where=cf[:, 0] < 0))
+    x = np.clip(x, lo, hi)
+    dx_old = hi - lo
+    done = ~bracketed
+    for _ in range(max_iter):
+        f, df = _npv_and_slope(cf_t, x)
+        same = np.sign(f) == np.sign(f_lo)
+        lo, f_lo = np.where(same, x, lo), np.where(same, f, f_lo)
+        hi = np.where(same, hi, x)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            step = x - f / df
+        # Kleine stappen die de bracket nauwelijks verkleinen zouden anders eindeloos doorgaan
+        newton = np.isfinite(step) & (step >= lo) & (step <= hi) & (np.abs(step - x) <= 0.5 * dx_old)
+        dx = np.where(newton, np.abs(step - x), 0.5 * (hi - lo))
+        x_new = np.where(newton, step, 0.5 * (lo + hi))
+        converged = (dx < tol) | (f == 0)
+        x = np.where(done | (f == 0), x, x_new)
+        dx_old = dx
+        done |= converged
+        if done.all():
+            break
+    with np.errstate(over="ignore"):
+        annual = np.expm1(12.0 * x)
+    return np.where(bracketed, np.where(done, annual, np.nan), np.where(f_hi > 0, np.inf, np.nan))
+
+
+def project_cashflows(inputs: dict, num_stores=1, horizon_months=60, discount_rate=0.08, ramp_months=3,
+                      ramp_shape="linear", churn_month=0.0) -> dict:
+    """
+    Meerjarenprojectie voor één of veel stores: `inputs` zoals bij `compute_roi` (scalars
+    of arrays per store). Elke rij van de matrix is één store × `num_stores`.
+
+    Geeft de matrix, de cumulatieve kasstroom en per rij NPV, IRR (per jaar), de exacte
+    break-even-maand (nominaal en verdisconteerd), plus dezelfde cijfers voor de keten.
+    """
+    roi = compute_roi(**{k: inputs[k] for k in INPUT_KEYS}, num_stores=1)
+    cf = cashflow_matrix(roi["uplift_month_abs_total"], inputs["gross_margin"], inputs["capex"],
+                         inputs["opex_month"], horizon_months, ramp_months, ramp_shape, churn_month)
+    cf *= np.reshape(np.asarray(num_stores, dtype=np.float64), (-1, 1))
+    disc = discount_factors(horizon_months, discount_rate)
+    discounted = cf * disc
+    chain = cf.sum(axis=0, keepdims=True)
+    return {
+        "cashflow": cf,
+        "cumulative": np.cumsum(cf, axis=1),
+        "npv": discounted.sum(axis=1),
+        "irr": irr(cf),
+        "break_even_month": break_even_month(cf),
+        "discounted_break_even_month": break_even_month(discounted),
+        "chain_cashflow": chain[0],
+        "chain_npv": float(discounted.sum()),
+        "chain_irr": float(irr(chain)[0]),
+        "chain_break_even_month": float(break_even_month(chain)[0]),
+        "chain_discounted_break_even_month": float(break_even_month(chain * disc)[0]),
+    }
@@ -0,0 +1,232 @@
+"""
+Headless batch-run van ROI-scenario's, zonder Streamlit of Plotly.
+
+Scenario-bestanden:
+  - JSON: één object of een lijst, bijv.
+      {"name": "Prospect A", "preset": "Optics & Eyewear", "num_stores": 40,
+       "inputs": {"uplift_conv": 0.03}, "stores": "prospect_a.csv",
+       "grid": {"x": "uplift_conv", "y": "uplift_spv"}}
+  - CSV: één scenario per rij met kolommen name, preset, num_stores, stores,
+    grid_x, grid_y en willekeurige invoer-kolommen (visitors_day, conv_pct, ...)
+
+Gewone scenario's worden samen in één gevectoriseerde aanroep doorgerekend; scenario's
+met een store-tabel of raster gaan over een process pool over alle cores.
+
+Gebruik:  python roi_cli.py scenarios.json [meer.csv ...] -o results.csv [--workers N] [--details-dir out/]
+          python roi_cli.py --presets -o presets.csv
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from presets import DEFAULT_INPUTS, DEFAULT_NUM_STORES, PRESETS
+from roi_engine import INPUT_KEYS, compute_roi
+from roi_sensitivity import SWEEP_RANGES
+
+SUMMARY_KEYS = [
+    "turn_year_total", "turn_year_new_total", "uplift_year_abs_total",
+    "extra_profit_month_total", "payback_months", "roi_year_pct",
+]
+OUTPUT_COLUMNS = ["name", "kind", "preset", "num_stores", *INPUT_KEYS, *SUMMARY_KEYS,
+                  "grid_points", "grid_share_payback_12m"]
+
+
+# =========================
+# Scenario's inlezen
+# =========================
+def _scenario(raw: dict, base_dir: str, default_name: str) -> dict:
+    name = str(raw.get("name") or default_name)
+    where = default_name if name == default_name else f"{default_name} ({name})"  # voor foutmeldingen
+    preset = raw.get("preset") or None
+    if preset is not None and preset not in PRESETS:
+        raise ValueError(f"{where}: onbekende preset {preset!r} (kies uit {', '.join(PRESETS)})")
+    inputs = dict(DEFAULT_INPUTS)
+    if preset:
+        inputs.update({k: PRESETS[preset][k] for k in INPUT_KEYS})
+    overrides = dict(raw.get("inputs") or {})
+    overrides.update({k: raw[k] for k in INPUT_KEYS if raw.get(k) not in (None, "")})
+    unknown = set(overrides) - set(INPUT_KEYS)
+    if unknown:
+        raise ValueError(f"{where}: onbekende invoer {sorted(unknown)}")
+    inputs.update({k: float(v) for k, v in overrides.items()})
+
+    grid = raw.get("grid") or {}
+    grid_x, grid_y = raw.get("grid_x") or grid.get("x"), raw.get("grid_y") or grid.get("y")
+    # Hier al controleren: een fout in een worker-proces breekt anders de hele batch af
+    if bool(grid_x) != bool(grid_y):
+        raise ValueError(f"{where}: raster heeft zowel x als y nodig")
+    for key in (grid_x, grid_y):
+        if key and key not in SWEEP_RANGES:
+            raise ValueError(f"{where}: onbekende raster-as {key!r} (kies uit {', '.join(SWEEP_RANGES)})")
+    if grid_x and grid_x == grid_y:
+        raise ValueError(f"{where}: raster-assen x en y moeten verschillen ({grid_x!r})")
+    stores = raw.get("stores") or None
+    return {
+        "name": name,
+        "preset": preset or "",
+        "num_stores": int(float(raw.get("num_stores") or DEFAULT_NUM_STORES)),
+        "inputs": inputs,
+        "stores": os.path.join(base_dir, stores) if stores else None,
+        "grid": (grid_x, grid_y) if grid_x and grid_y else None,
+    }
+
+
+def load_scenarios(path: str) -> list:
+    base_dir = os.path.dirname(os.path.abspath(path))
+    stem = os.path.splitext(os.path.basename(path))[0]
+    if path.lower().endswith(".csv"):
+        with open(path, newline="", encoding="utf-8") as fh:
+            raws = list(csv.DictReader(fh))
+    else:
+        with open(path, encoding="utf-8") as fh:
+            data = json.load(fh)
+        raws = data if isinstance(data, list) else [data]
+    return [_scenario(raw, base_dir, f"{stem}#{i + 1}") for i, raw in enumerate(raws)]
+
+
+def preset_scenarios(num_stores: int = DEFAULT_NUM_STORES) -> list:
+    return [_scenario({"name": name, "preset": name, "num_stores": num_stores}, ".", name) for name in PRESETS]
+
+
+# =========================
+# Doorrekenen
+# =========================
+def _row(scenario: dict, kind: str, values: dict, num_stores=None) -> dict:
+    row = {"name": scenario["name"], "kind": kind, "preset": scenario["preset"],
+           "num_stores": scenario["num_stores"] if num_stores is None else num_stores}
+    row.update(scenario["inputs"])
+    row.update({k: float(values[k]) for k in SUMMARY_KEYS})
+    return row
+
+
+def run_plain(scenarios: list) -> list:
+    """Alle gewone scenario's in één gebroadcaste aanroep van de engine."""
+    if not scenarios:
+        return []
+    inputs = {k: np.array([s["inputs"][k] for s in scenarios], dtype=np.float64) for k in INPUT_KEYS}
+    n_stores = np.array([s["num_stores"] for s in scenarios], dtype=np.float64)
+    result = compute_roi(**inputs, num_stores=n_stores)
+    return [_row(s, "scenario", {k: result[k][i] for k in SUMMARY_KEYS}) for i, s in enumerate(scenarios)]
+
+
+def _safe_filename(name: str) -> str:
+    return "".join(c if c.isalnum() or c in "-_." else "_" for c in name)
+
+
+def run_heavy(scenario: dict, details_dir: str | None = None, details_format: str = "csv") -> dict:
+    """Store-tabel en/of raster; draait in een worker-proces. Details gaan direct naar schijf."""
+    import pandas as pd
+
+    if scenario["stores"]:
+        from portfolio import evaluate_portfolio, iter_store_table, portfolio_totals
+
+        results = evaluate_portfolio(iter_store_table(scenario["stores"]), scenario["inputs"])
+        totals = portfolio_totals(results)
+        row = _row(scenario, "portfolio", totals, num_stores=totals["n_stores"])
+        details = results
+    else:
+        from roi_sensitivity import sweep_grid
+
+        x_key, y_key = scenario["grid"]
+        grid = sweep_grid(scenario["inputs"], x_key, y_key, num_stores=scenario["num_stores"])
+        base = compute_roi(**scenario["inputs"], num_stores=scenario["num_stores"])
+        row = _row(scenario, "grid", base)
+        row["grid_points"] = int(grid["payback_months"].size)
+        row["grid_share_payback_12m"] = float(np.mean(grid["payback_months"] < 12))
+        xx, yy = np.meshgrid(grid["x"], grid["y"])
+        details = pd.DataFrame({x_key: xx.ravel(), y_key: yy.ravel(),
+                                "payback_months": grid["payback_months"].ravel(),
+                                "roi_year_pct": grid["roi_year_pct"].ravel()})
+
+    if details_dir:
+        os.makedirs(details_dir, exist_ok=True)
+        target = os.path.join(details_dir, f"{_safe_filename(scenario['name'])}.{details_format}")
+        if details_format == "parquet":
+            details.to_parquet(target, index=False)
+        else:
+            details.to_csv(target, index=False)
+    return row
+
+
+def run_all(scenarios: list, workers: int | None = None, details_dir: str | None = None,
+            details_format: str = "csv") -> list:
+    """Resultaten in de volgorde van `scenarios`."""
+    heavy_idx = [i for i, s in enumerate(scenarios) if s["stores"] or s["grid"]]
+    plain_idx = [i for i, s in enumerate(scenarios) if not (s["stores"] or s["grid"])]
+    rows = [None] * len(scenarios)
+    for i, row in zip(plain_idx, run_plain([scenarios[i] for i in plain_idx])):
+        rows[i] = row
+
+    workers = workers or os.cpu_count() or 1
+    heavy = [scenarios[i] for i in heavy_idx]
+    if workers == 1 or len(heavy) <= 1:
+        heavy_rows = [run_heavy(s, details_dir, details_format) for s in heavy]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(heavy))) as pool:
+            heavy_rows = list(pool.map(run_heavy, heavy, [details_dir] * len(heavy),
+                                       [details_format] * len(heavy)))
+    for i, row in zip(heavy_idx, heavy_rows):
+        rows[i] = row
+    return rows
+
+
+def write_results(rows: list, path: str):
+    if path.lower().endswith(".parquet"):
+        import pandas as pd
+
+        pd.DataFrame(rows, columns=OUTPUT_COLUMNS).to_parquet(path, index=False)
+        return
+    out = sys.stdout if path == "-" else open(path, "w", newline="", encoding="utf-8")
+    try:
+        writer = csv.DictWriter(out, fieldnames=OUTPUT_COLUMNS, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(rows)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("scenario_files", nargs="*", help="JSON/CSV scenario-bestanden")
+    parser.add_argument("-o", "--output", default="-", help="CSV of .parquet (standaard: stdout als CSV)")
+    parser.add_argument("--presets", action="store_true", help="alle presets als extra scenario's meenemen")
+    parser.add_argument("--num-stores", type=int, default=DEFAULT_NUM_STORES, help="aantal stores bij --presets")
+    parser.add_argument("--workers", type=int, default=None, help="aantal processen (standaard: alle cores)")
+    parser.add_argument("--details-dir", default=None, help="map voor per-store/raster-resultaten per scenario")
+    parser.add_argument("--details-format", choices=["csv", "parquet"], default="csv")
+    args = parser.parse_args(argv)
+
+    scenarios = preset_scenarios(args.num_stores) if args.presets else []
+    for path in args.scenario_files:
+        try:
+            scenarios.extend(load_scenarios(path))
+        except ValueError as exc:
+            parser.error(f"{path}: {exc}")
+    if not scenarios:
+        parser.error("geen scenario's: geef scenario-bestanden op of gebruik --presets")
+    if args.details_dir:
+        # Detailbestanden heten naar het scenario; dubbele namen zouden elkaar overschrijven
+        seen = {}
+        for s in scenarios:
+            if s["stores"] or s["grid"]:
+                filename = _safe_filename(s["name"])
+                if filename in seen:
+                    parser.error(f"--details-dir: scenario's {seen[filename]!r} en {s['name']!r} "
+                                 f"schrijven allebei naar {filename}.{args.details_format}; geef unieke namen")
+                seen[filename] = s["name"]
+
+    t0 = time.perf_counter()
+    rows = run_all(scenarios, args.workers, args.details_dir, args.details_format)
+    write_results(rows, args.output)
+    print(f"{len(rows)} scenario's doorgerekend in {time.perf_counter() - t0:.2f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
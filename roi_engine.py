@@ -0,0 +1,137 @@
+import functools
+
+import numpy as np
+
+from metric_graph import MetricGraph
+
+# Invoer van de simulator (per store), in de volgorde van de sliders op de pagina
+INPUT_KEYS = [
+    "visitors_day", "conv_pct", "atv_eur", "open_days",
+    "capex", "opex_month", "gross_margin",
+    "uplift_conv", "uplift_spv", "sat_share", "sat_boost",
+]
+
+WEEKS_PER_YEAR = 52
+
+
+def _as_float(x):
+    return np.asarray(x, dtype=np.float64)
+
+
+def _div(num, den, fill):
+    num, den = np.broadcast_arrays(np.asarray(num, dtype=np.float64), np.asarray(den, dtype=np.float64))
+    out = np.full(num.shape, fill, dtype=np.float64)
+    np.divide(num, den, out=out, where=den != 0)
+    return out
+
+
+# Afgeleide metrics als graaf: naam → (invoer, functie), in berekeningsvolgorde. De invoer
+# van elke metric zijn de parameternamen van de functie (INPUT_KEYS, "num_stores" of eerdere
+# metrics). `compute_roi` rekent alles in één keer; `metric_graph.MetricGraph` alleen wat
+# verouderd is na een gewijzigde invoer.
+def _nodes(**fns) -> dict:
+    return {name: (fn.__code__.co_varnames[:fn.__code__.co_argcount], fn) for name, fn in fns.items()}
+
+
+ROI_NODES = _nodes(
+    # Per store baseline
+    visitors_week_store=lambda visitors_day, open_days: visitors_day * open_days,
+    visitors_year_store=lambda visitors_week_store: visitors_week_store * WEEKS_PER_YEAR,
+    trans_year_store=lambda visitors_year_store, conv_pct: visitors_year_store * conv_pct,
+    turn_year_store=lambda trans_year_store, atv_eur: trans_year_store * atv_eur,
+    conv_new=lambda conv_pct, uplift_conv: conv_pct * (1.0 + uplift_conv),
+    atv_new=lambda atv_eur, uplift_spv: atv_eur * (1.0 + uplift_spv),
+
+    # Chain totals (baseline)
+    visitors_year_total=lambda visitors_year_store, num_stores: visitors_year_store * num_stores,
+    trans_year_total=lambda trans_year_store, num_stores: trans_year_store * num_stores,
+    turn_year_total=lambda turn_year_store, num_stores: turn_year_store * num_stores,
+
+    # Scenario totals with Saturday boost on conversion
+    visitors_year_sat_total=lambda visitors_year_total, sat_share: visitors_year_total * sat_share,
+    trans_year_sat_new_total=lambda visitors_year_sat_total, conv_new, sat_boost: (
+        visitors_year_sat_total * conv_new * (1.0 + sat_boost)),
+    trans_year_non_sat_new_total=lambda visitors_year_total, sat_share, conv_new: (
+        (visitors_year_total * (1 - sat_share)) * conv_new),
+    turn_year_new_total=lambda trans_year_sat_new_total, trans_year_non_sat_new_total, atv_new: (
+        (trans_year_sat_new_total + trans_year_non_sat_new_total) * atv_new),
+    uplift_year_abs_total=lambda turn_year_new_total, turn_year_total: (
+        np.maximum(0.0, turn_year_new_total - turn_year_total)),
+    uplift_month_abs_total=lambda uplift_year_abs_total: uplift_year_abs_total / 12.0,
+
+    # Costs & profit (chain-level)
+    capex_total=lambda capex, num_stores: capex * num_stores,
+    opex_month_total=lambda opex_month, num_stores: opex_month * num_stores,
+    extra_profit_month_total=lambda uplift_month_abs_total, gross_margin, opex_month_total: (
+        uplift_month_abs_total * gross_margin - opex_month_total),
+    payback_months=lambda capex_total, extra_profit_month_total: np.where(
+        extra_profit_month_total <= 0, np.inf, _div(capex_total, extra_profit_month_total, np.inf)),
+    roi_year_pct=lambda uplift_year_abs_total, gross_margin, opex_month_total, capex_total: np.maximum(
+        -1.0, (uplift_year_abs_total * gross_margin - opex_month_total * 12 - capex_total)
+        / np.maximum(1.0, capex_total + opex_month_total * 12)),
+
+    # Split for donut (conversion vs SPV): elk effect los t.o.v. de baseline
+    conv_only_turn_total=lambda visitors_year_total, sat_share, conv_pct, sat_boost, atv_eur: (
+        ((visitors_year_total * sat_share) * (conv_pct * (1 + sat_boost))
+         + (visitors_year_total * (1 - sat_share)) * conv_pct) * atv_eur),
+    conv_only_uplift_total=lambda conv_only_turn_total, turn_year_total: (
+        np.maximum(0.0, conv_only_turn_total - turn_year_total)),
+    spv_only_turn_total=lambda trans_year_total, atv_eur, uplift_spv: trans_year_total * (atv_eur * (1 + uplift_spv)),
+    spv_only_uplift_total=lambda spv_only_turn_total, turn_year_total: (
+        np.maximum(0.0, spv_only_turn_total - turn_year_total)),
+    split_total=lambda conv_only_uplift_total, spv_only_uplift_total: (
+        np.maximum(1e-9, conv_only_uplift_total + spv_only_uplift_total)),
+    share_conv=lambda conv_only_uplift_total, split_total: conv_only_uplift_total / split_total,
+    share_spv=lambda spv_only_uplift_total, split_total: spv_only_uplift_total / split_total,
+)
+
+# Uitkomsten van `compute_roi` (tussenstappen als `split_total` blijven in de graaf)
+OUTPUT_KEYS = [
+    "visitors_week_store", "visitors_year_store", "trans_year_store", "turn_year_store",
+    "conv_new", "atv_new", "visitors_year_total", "trans_year_total", "turn_year_total",
+    "turn_year_new_total", "uplift_year_abs_total", "uplift_month_abs_total",
+    "capex_total", "opex_month_total", "extra_profit_month_total", "payback_months", "roi_year_pct",
+    "conv_only_uplift_total", "spv_only_uplift_total", "share_conv", "share_spv",
+]
+
+
+def compute_roi(visitors_day, conv_pct, atv_eur, open_days, capex, opex_month, gross_margin,
+                uplift_conv, uplift_spv, sat_share, sat_boost, num_stores=1) -> dict:
+    """
+    Volledige ROI-berekening van de simulator in één gebroadcaste NumPy-pass over `ROI_NODES`.
+
+    Elke invoer mag een scalar of array zijn (bijv. stores × scenario's); alle
+    uitkomsten hebben de gebroadcaste vorm. Ketentotalen = per store × `num_stores`.
+    """
+    values = dict(zip(INPUT_KEYS, map(_as_float, (visitors_day, conv_pct, atv_eur, open_days, capex, opex_month,
+                                                  gross_margin, uplift_conv, uplift_spv, sat_share, sat_boost))))
+    values["num_stores"] = _as_float(num_stores)
+    for name, (deps, fn) in ROI_NODES.items():
+        values[name] = fn(*[values[d] for d in deps])
+    return {k: values[k] for k in OUTPUT_KEYS}
+
+
+def roi_metric_graph() -> MetricGraph:
+    """Incrementele variant van `compute_roi` (bijv. één per sessie): zelfde nodes en uitkomsten."""
+    return MetricGraph(ROI_NODES, [*INPUT_KEYS, "num_stores"], prepare=_as_float)
+
+
+def compute_roi_scalar(inputs: dict, num_stores=1) -> dict:
+    """Zelfde berekening voor één scenario (bijv. `st.session_state`), met Python-floats als uitkomst."""
+    result = compute_roi(**{k: inputs[k] for k in INPUT_KEYS}, num_stores=num_stores)
+    return {k: float(v) for k, v in result.items()}
+
+
+# Aantal onthouden invoer-combinaties voor de pagina (presets, heen-en-weer schuiven)
+KPI_CACHE_SIZE = 256
+
+
+def input_key(inputs: dict) -> tuple:
+    """Genormaliseerde, hashbare invoer-tuple: 0.07 en 7/100 geven dezelfde sleutel."""
+    return tuple(round(float(inputs[k]), 9) for k in INPUT_KEYS)
+
+
+@functools.lru_cache(maxsize=KPI_CACHE_SIZE)
+def compute_roi_cached(key: tuple, num_stores=1) -> dict:
+    """`compute_roi_scalar` op een `input_key`-tuple, met begrensde LRU-cache (niet muteren)."""
+    return compute_roi_scalar(dict(zip(INPUT_KEYS, key)), num_stores=num_stores)
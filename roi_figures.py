@@ -0,0 +1,81 @@
+import functools
+
+import plotly.graph_objects as go
+import plotly.io as pio
+
+# Begrensde LRU: identieke invoer (bijv. terug naar een preset) levert direct de bestaande figuur
+FIGURE_CACHE_SIZE = 64
+
+
+class FrozenFigure(go.Figure):
+    """
+    Figuur die na opbouw niet meer verandert. `to_dict()` — wat `st.plotly_chart`
+    bij elke rerun serialiseert — wordt één keer berekend en daarna hergebruikt, net als
+    de grootte van de JSON (`json_bytes`, voor de timing).
+    """
+
+    _frozen_dict = None
+    _frozen_bytes = None
+
+    def to_dict(self):
+        if self._frozen_dict is None:
+            self._frozen_dict = super().to_dict()
+        return self._frozen_dict
+
+    def json_bytes(self) -> int:
+        if self._frozen_bytes is None:
+            self._frozen_bytes = len(pio.to_json(self, validate=False).encode("utf-8"))
+        return self._frozen_bytes
+
+
+@functools.lru_cache(maxsize=FIGURE_CACHE_SIZE)
+def revenue_bar(turn_year_total, turn_year_new_total, baseline_eur, scenario_eur, height, colors):
+    """Baseline vs scenario omzet (keten). `colors` = (baseline, scenario)."""
+    fig_bar = FrozenFigure()
+    fig_bar.add_trace(go.Bar(
+        name="Baseline",
+        x=["Revenue/year (chain)"], y=[turn_year_total], marker_color=colors[0],
+        text=[baseline_eur], textposition="outside", cliponaxis=False,
+        customdata=[[baseline_eur]],
+        hovertemplate="Baseline: %{customdata[0]}<extra></extra>"
+    ))
+    fig_bar.add_trace(go.Bar(
+        name="New (scenario)",
+        x=["Revenue/year (chain)"], y=[turn_year_new_total], marker_color=colors[1],
+        text=[scenario_eur], textposition="outside", cliponaxis=False,
+        customdata=[[scenario_eur]],
+        hovertemplate="New (scenario): %{customdata[0]}<extra></extra>"
+    ))
+    fig_bar.update_layout(
+        barmode="group",
+        height=height,
+        margin=dict(l=20, r=20, t=10, b=10),
+        legend=dict(orientation="h"),
+        bargap=0.2,          # iets ruimte tussen de staven
+        bargroupgap=0.20     # ruimte tussen de twee bars in dezelfde groep
+    )
+    fig_bar.update_traces(
+        marker_line_width=0.5,
+        marker_line_color="rgba(0,0,0,0.8)"
+    )
+    return fig_bar
+
+
+@functools.lru_cache(maxsize=FIGURE_CACHE_SIZE)
+def uplift_donut(share_conv, share_spv, conv_uplift_eur, spv_uplift_eur, height, colors):
+    """Donut: aandeel conversie vs ATV in de uplift. `colors` = (conversie, ATV)."""
+    fig_pie = FrozenFigure(data=[go.Pie(
+        labels=["Conversion", "ATV"],
+        values=[share_conv, share_spv],
+        hole=.55,
+        marker=dict(colors=list(colors)),
+        textinfo="percent+label",
+        customdata=[[conv_uplift_eur], [spv_uplift_eur]],
+        hovertemplate="%{label}: %{percent} — uplift %{customdata[0]}<extra></extra>"
+    )])
+    fig_pie.update_layout(height=height, margin=dict(l=20, r=20, t=10, b=10), showlegend=True)
+    return fig_pie
+
+
+def cache_info() -> dict:
+    return {"revenue_bar": revenue_bar.cache_info(), "uplift_donut": uplift_donut.cache_info()}
@@ -0,0 +1,163 @@
+"""
+Omgekeerde vraag: welke uplift is minimaal nodig voor een doel-payback of -ROI?
+
+Het model is per store lineair in elk van de twee hefbomen:
+
+    omzet_nieuw = omzet × (1 + sat_share × sat_boost) × (1 + uplift_conv) × (1 + uplift_spv)
+
+dus `solve_uplift` lost per store (of preset, of keten met gelijke stores) in gesloten vorm
+op, gevectoriseerd over willekeurig veel invoer. Voor één gezamenlijke uplift over een
+portfolio met verschillende stores is de ketensom stuksgewijs lineair (uplift per store
+wordt op 0 afgekapt); `solve_portfolio_uplift` zoekt die met gevectoriseerde bisectie.
+"""
+import numpy as np
+
+from presets import PRESETS
+from roi_engine import INPUT_KEYS, WEEKS_PER_YEAR, compute_roi
+
+LEVERS = ("uplift_conv", "uplift_spv")
+TARGETS = ("payback_months", "roi_year_pct")
+MAX_UPLIFT = 10.0          # bovengrens van het zoekbereik bij bisectie (+1000%)
+BISECT_ITERATIONS = 60     # 2^-60 × MAX_UPLIFT: ruim onder float64-precisie
+# Marge boven de exacte grens, in ulps van (1 + uplift): de engine rekent in een andere volgorde,
+# zonder marge haalt de gevonden uplift het doel in ±de helft van de gevallen net niet (12 + 1e-12 mnd)
+ROUNDING_ULPS = 8
+
+
+def _div(num, den, fill):
+    num, den = np.broadcast_arrays(np.asarray(num, dtype=np.float64), np.asarray(den, dtype=np.float64))
+    return np.divide(num, den, out=np.full(num.shape, fill, dtype=np.float64), where=den != 0)
+
+
+def _check(lever: str, target: str):
+    if lever not in LEVERS:
+        raise ValueError(f"Onbekende hefboom {lever!r}; kies uit {', '.join(LEVERS)}")
+    if target not in TARGETS:
+        raise ValueError(f"Onbekend doel {target!r}; kies uit {', '.join(TARGETS)}")
+
+
+def meets_target(result: dict, target: str, value) -> np.ndarray:
+    """Haalt een (engine-)resultaat het doel? Payback ≤ `value` maanden, ROI-jaar ≥ `value`."""
+    if target == "payback_months":
+        return np.asarray(result["payback_months"]) <= value
+    return np.asarray(result["roi_year_pct"]) >= value
+
+
+def required_uplift_year(capex_total, opex_month_total, gross_margin, target: str, value) -> np.ndarray:
+    """
+    Minimale extra omzet per jaar voor het doel, rechtstreeks uit de formules van de engine:
+
+    - payback = capex / (uplift/12 × marge − opex) ≤ P  ⇔  uplift ≥ 12 × (capex/P + opex) / marge
+    - ROI = (uplift × marge − kosten) / max(1, kosten) ≥ R  ⇔  uplift ≥ (R × max(1, kosten) + kosten) / marge
+
+    `inf` als het doel met geen enkele uplift haalbaar is (marge ≤ 0, payback-doel ≤ 0).
+    """
+    capex_total, opex_month_total, gross_margin, value = np.broadcast_arrays(
+        *(np.asarray(x, dtype=np.float64) for x in (capex_total, opex_month_total, gross_margin, value)))
+    if target == "payback_months":
+        need_margin = 12.0 * (_div(capex_total, value, np.inf) + opex_month_total)
+        need_margin = np.where(value > 0, need_margin, np.inf)
+    else:
+        cost_year = capex_total + 12.0 * opex_month_total
+        need_margin = value * np.maximum(1.0, cost_year) + cost_year
+    return np.where(gross_margin > 0, _div(need_margin, gross_margin, np.inf), np.inf)
+
+
+def _linear_terms(x: dict, lever: str):
+    """Omzet per store per jaar en de vermenigvuldiger zonder `lever` (zie de module-docstring)."""
+    turn = x["visitors_day"] * x["open_days"] * WEEKS_PER_YEAR * x["conv_pct"] * x["atv_eur"]
+    other = x["uplift_spv"] if lever == "uplift_conv" else x["uplift_conv"]
+    return turn, (1.0 + x["sat_share"] * x["sat_boost"]) * (1.0 + other)
+
+
+def solve_uplift(inputs: dict, lever: str = "uplift_conv", target: str = "payback_months", value=12.0,
+                 num_stores=1) -> np.ndarray:
+    """
+    Minimale `lever` (bijv. 0.034 = +3,4%) waarmee het doel gehaald wordt, de andere invoer
+    (ook de andere hefboom) ongewijzigd. Gesloten vorm, gebroadcast over alle invoer: 10k
+    stores of presets in één aanroep. 0 als het doel al zonder deze hefboom gehaald wordt,
+    `inf` als het onhaalbaar is (bijv. geen omzet of marge). Het antwoord ligt een paar ulps
+    boven de exacte grens, zodat `compute_roi` met deze uplift het doel ook echt haalt.
+    """
+    _check(lever, target)
+    x = {k: np.asarray(inputs[k], dtype=np.float64) for k in INPUT_KEYS}
+    n = np.asarray(num_stores, dtype=np.float64)
+    turn, multiplier = _linear_terms(x, lever)
+    need = required_uplift_year(x["capex"] * n, x["opex_month"] * n, x["gross_margin"], target, value)
+    # uplift = omzet × (multiplier × (1 + u) − 1) ≥ need  ⇔  u ≥ (1 + need / omzet) / multiplier − 1
+    with np.errstate(invalid="ignore"):
+        u = _div(1.0 + _div(need, turn * n, np.inf), multiplier, np.inf) - 1.0
+        u = np.where(u > 0, u + ROUNDING_ULPS * np.finfo(np.float64).eps * (1.0 + u), 0.0)
+        return np.where(need <= 0, 0.0, u)
+
+
+def bisect_min(meets, lo, hi, iterations: int = BISECT_ITERATIONS) -> np.ndarray:
+    """
+    Kleinste waarde in [lo, hi] waarvoor `meets` (monotoon: eenmaal gehaald, blijft gehaald)
+    True geeft, elementsgewijs en voor alle elementen tegelijk. `inf` waar ook `hi` niet volstaat.
+    """
+    lo, hi = (np.array(a, dtype=np.float64) for a in np.broadcast_arrays(lo, hi))
+    at_lo, at_hi = meets(lo), meets(hi)
+    a, b = lo.copy(), hi.copy()
+    for _ in range(iterations):
+        mid = 0.5 * (a + b)
+        ok = meets(mid)
+        b = np.where(ok, mid, b)
+        a = np.where(ok, a, mid)
+    return np.where(at_lo, lo, np.where(at_hi, b, np.inf))
+
+
+def solve_uplift_bisect(inputs: dict, lever: str = "uplift_conv", target: str = "payback_months", value=12.0,
+                        num_stores=1, max_uplift: float = MAX_UPLIFT) -> np.ndarray:
+    """Zelfde vraag als `solve_uplift`, numeriek via de engine (controle, of voor afwijkende modellen)."""
+    _check(lever, target)
+    base = {k: np.asarray(inputs[k], dtype=np.float64) for k in INPUT_KEYS}
+    shape = np.broadcast_shapes(*(v.shape for v in base.values()), np.shape(num_stores), np.shape(value))
+
+    def meets(u):
+        return np.broadcast_to(meets_target(compute_roi(**{**base, lever: u}, num_stores=num_stores), target, value),
+                               shape)
+
+    return bisect_min(meets, np.zeros(shape), np.full(shape, max_uplift))
+
+
+def solve_presets(lever: str = "uplift_conv", target: str = "payback_months", value=12.0, num_stores=1) -> dict:
+    """Minimale uplift per preset (elk met zijn eigen invoer), in één aanroep."""
+    names = list(PRESETS)
+    columns = {k: np.array([PRESETS[name][k] for name in names], dtype=np.float64) for k in INPUT_KEYS}
+    return dict(zip(names, solve_uplift(columns, lever, target, value, num_stores).tolist()))
+
+
+def solve_stores(stores, scenario: dict, lever: str = "uplift_conv", target: str = "payback_months",
+                 value=12.0) -> np.ndarray:
+    """Minimale uplift per store van een store-tabel (kolommen overschrijven het scenario)."""
+    from portfolio import store_inputs
+
+    return solve_uplift(store_inputs(stores, scenario), lever, target, value)
+
+
+def solve_portfolio_uplift(stores, scenario: dict, lever: str = "uplift_conv", target: str = "payback_months",
+                           value=12.0, max_uplift: float = MAX_UPLIFT) -> float:
+    """
+    Eén gezamenlijke uplift voor de hele keten, met payback/ROI zoals `portfolio.portfolio_totals`
+    ze uit de sommen over alle stores berekent. Per bisectiestap één gevectoriseerde pass over de stores.
+    """
+    from portfolio import store_inputs
+
+    _check(lever, target)
+    shape = (len(stores),)
+    x = {k: np.broadcast_to(np.asarray(v, dtype=np.float64), shape) for k, v in store_inputs(stores, scenario).items()}
+    turn, multiplier = _linear_terms(x, lever)
+    margin_month = x["gross_margin"] / 12.0
+    capex, opex = x["capex"].sum(), x["opex_month"].sum()
+    cost_year = capex + opex * 12
+
+    def meets(u):
+        # Zelfde sommen als `portfolio_totals`: uplift per store afgekapt op 0, dan over de keten
+        uplift = np.maximum(0.0, turn * (multiplier * (1.0 + u[..., np.newaxis]) - 1.0))
+        profit = (uplift * margin_month).sum(axis=-1) - opex
+        if target == "payback_months":
+            return (profit > 0) & (_div(capex, profit, np.inf) <= value)
+        return np.maximum(-1.0, ((profit + opex) * 12 - cost_year) / max(1.0, cost_year)) >= value
+
+    return float(bisect_min(meets, 0.0, max_uplift))
@@ -0,0 +1,112 @@
+import functools
+
+import numpy as np
+
+from roi_engine import INPUT_KEYS, compute_roi
+
+MC_OUTPUTS = ["payback_months", "roi_year_pct", "extra_profit_month_total"]
+PERCENTILES = [5, 25, 50, 75, 95]
+
+DEFAULT_SAMPLES = 1_000_000
+BATCH_SIZE = 250_000
+
+
+def _draw(rng: np.random.Generator, spec, size: int) -> np.ndarray:
+    """
+    Trekt `size` samples voor één invoer.
+
+    `spec` is een vaste waarde of een dict, bijv.
+    {"dist": "triangular", "low": 0.0, "mode": 0.02, "high": 0.05},
+    {"dist": "normal", "mean": 0.05, "sd": 0.01, "min": 0.0} of
+    {"dist": "uniform", "low": 0.0, "high": 0.1}.
+    """
+    if not isinstance(spec, dict):
+        return np.full(size, float(spec))
+    dist = spec["dist"]
+    if dist == "triangular":
+        low, mode, high = spec["low"], spec["mode"], spec["high"]
+        if low == high:
+            x = np.full(size, float(mode))
+        else:
+            x = rng.triangular(low, mode, high, size)
+    elif dist == "normal":
+        x = rng.normal(spec["mean"], spec["sd"], size)
+    elif dist == "uniform":
+        x = rng.uniform(spec["low"], spec["high"], size)
+    else:
+        raise ValueError(f"Onbekende verdeling: {dist!r}")
+    if "min" in spec or "max" in spec:
+        x = np.clip(x, spec.get("min", -np.inf), spec.get("max", np.inf))
+    return x
+
+
+def simulate_roi(inputs: dict, distributions: dict, n_samples: int = DEFAULT_SAMPLES,
+                 seed: int | None = None, num_stores=1, batch_size: int = BATCH_SIZE) -> dict:
+    """
+    Monte Carlo over de ROI-engine: invoer uit `distributions` wordt gesampled, de rest
+    komt als puntschatting uit `inputs`. Rekent in batches zodat 1M+ samples binnen
+    het geheugen blijven; met `seed` is het resultaat reproduceerbaar.
+
+    Geeft per uitkomst in `MC_OUTPUTS` de samples terug (payback `inf` = geen terugverdiening).
+    """
+    unknown = set(distributions) - set(INPUT_KEYS)
+    if unknown:
+        raise ValueError(f"Onbekende invoer voor simulatie: {sorted(unknown)}")
+
+    rng = np.random.default_rng(seed)
+    samples = {k: np.empty(n_samples, dtype=np.float64) for k in MC_OUTPUTS}
+    for start in range(0, n_samples, batch_size):
+        size = min(batch_size, n_samples - start)
+        batch_inputs = {k: inputs[k] for k in INPUT_KEYS}
+        for key, spec in distributions.items():
+            batch_inputs[key] = _draw(rng, spec, size)
+        result = compute_roi(**batch_inputs, num_stores=num_stores)
+        for k in MC_OUTPUTS:
+            samples[k][start:start + size] = result[k]
+    return samples
+
+
+def summarize(samples: dict, percentiles=PERCENTILES) -> dict:
+    """Percentielen per uitkomst, plus het aandeel samples zonder terugverdiening."""
+    summary = {}
+    for key, values in samples.items():
+        pct = np.percentile(values, percentiles, method="nearest")
+        summary[key] = {f"p{p}": float(v) for p, v in zip(percentiles, pct)}
+        summary[key]["mean"] = float(np.mean(values[np.isfinite(values)])) if np.isfinite(values).any() else np.inf
+    payback = samples.get("payback_months")
+    if payback is not None:
+        summary["no_payback_share"] = float(np.mean(~np.isfinite(payback)))
+    return summary
+
+
+def histogram(values: np.ndarray, bins: int = 60, clip_pct: float = 99.0):
+    """Histogram van de eindige waarden, afgekapt op `clip_pct` zodat uitschieters de as niet oprekken."""
+    finite = values[np.isfinite(values)]
+    if finite.size == 0:
+        return np.zeros(0), np.zeros(0)
+    lo, hi = np.percentile(finite, [100 - clip_pct, clip_pct])
+    lo, hi = float(lo), float(hi)
+    if lo == hi:
+        lo, hi = lo - 0.5, hi + 0.5
+    counts, edges = np.histogram(np.clip(finite, lo, hi), bins=bins, range=(lo, hi))
+    return counts, edges
+
+
+def distribution_key(distributions: dict) -> tuple:
+    """Hashbare vorm van `distributions`, als cache-sleutel (volgorde bepaalt de trekkingen, dus behouden)."""
+    return tuple(
+        (k, tuple(sorted(spec.items())) if isinstance(spec, dict) else spec) for k, spec in distributions.items()
+    )
+
+
+@functools.lru_cache(maxsize=32)
+def simulate_summary_cached(key: tuple, distributions: tuple, n_samples: int, seed: int, num_stores=1):
+    """
+    Samenvatting + histogrammen (payback, ROI) voor de pagina, met begrensde LRU.
+    `key` is een `roi_engine.input_key`, `distributions` een `distribution_key`.
+    """
+    inputs = dict(zip(INPUT_KEYS, key))
+    dists = {k: dict(spec) if isinstance(spec, tuple) else spec for k, spec in distributions}
+    samples = simulate_roi(inputs, dists, n_samples=n_samples, seed=seed, num_stores=num_stores)
+    hists = {k: histogram(samples[k]) for k in ["payback_months", "roi_year_pct"]}
+    return summarize(samples), hists
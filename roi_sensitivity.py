@@ -0,0 +1,110 @@
+import functools
+
+import numpy as np
+
+from roi_engine import INPUT_KEYS, compute_roi
+
+# Sweep-bereik per invoer (min, max, stap), gelijk aan de sliders/velden op de pagina
+SWEEP_RANGES = {
+    "visitors_day": (0, 2000, 10),
+    "conv_pct": (0.10, 0.90, 0.001),
+    "atv_eur": (0.0, 300.0, 1.0),
+    "open_days": (1, 7, 1),
+    "capex": (0.0, 5000.0, 50.0),
+    "opex_month": (0.0, 200.0, 1.0),
+    "gross_margin": (0.30, 0.90, 0.001),
+    "uplift_conv": (0.0, 0.10, 0.001),
+    "uplift_spv": (0.0, 0.20, 0.001),
+    "sat_share": (0.0, 0.50, 0.001),
+    "sat_boost": (0.0, 0.10, 0.001),
+}
+
+INPUT_LABELS = {
+    "visitors_day": "Visitors per day",
+    "conv_pct": "Conversion rate",
+    "atv_eur": "ATV (€)",
+    "open_days": "Open days per week",
+    "capex": "One-off investment (€)",
+    "opex_month": "Monthly subscription (€)",
+    "gross_margin": "Gross margin",
+    "uplift_conv": "Conversion uplift",
+    "uplift_spv": "ATV uplift",
+    "sat_share": "Saturday share",
+    "sat_boost": "Saturday extra conversion",
+}
+
+TORNADO_SPREAD = 0.20  # ±20% per invoer
+
+
+def axis_values(key: str) -> np.ndarray:
+    lo, hi, step = SWEEP_RANGES[key]
+    return np.round(np.linspace(lo, hi, int(round((hi - lo) / step)) + 1), 6)
+
+
+def sweep_grid(inputs: dict, x_key: str, y_key: str, x_values=None, y_values=None,
+               num_stores=1, outputs=("payback_months", "roi_year_pct")) -> dict:
+    """
+    Rekent het volledige raster `y_values` × `x_values` in één gebroadcaste pass door.
+
+    Geeft {"x": ..., "y": ..., <output>: 2D-array (len(y), len(x))} terug; de overige
+    invoer blijft op de waarde uit `inputs`.
+    """
+    if x_key == y_key:
+        raise ValueError("x_key en y_key moeten verschillen")
+    x = axis_values(x_key) if x_values is None else np.asarray(x_values, dtype=np.float64)
+    y = axis_values(y_key) if y_values is None else np.asarray(y_values, dtype=np.float64)
+    grid_inputs = {k: inputs[k] for k in INPUT_KEYS}
+    grid_inputs[x_key] = x[np.newaxis, :]
+    grid_inputs[y_key] = y[:, np.newaxis]
+    result = compute_roi(**grid_inputs, num_stores=num_stores)
+    grid = {"x": x, "y": y}
+    for k in outputs:
+        grid[k] = np.broadcast_to(result[k], (len(y), len(x)))
+    return grid
+
+
+def tornado(inputs: dict, output: str = "extra_profit_month_total", num_stores=1,
+            spread: float = TORNADO_SPREAD, keys=INPUT_KEYS) -> list:
+    """
+    One-at-a-time gevoeligheid: elke invoer ±`spread` (binnen zijn sweep-bereik),
+    alle 2×N scenario's in één aanroep van de engine.
+
+    Geeft [(key, low_input, high_input, out_low, out_high), ...] gesorteerd op uitslag.
+    """
+    keys = list(keys)
+    n = len(keys)
+    batch = {k: np.full(2 * n, float(inputs[k])) for k in INPUT_KEYS}
+    lows, highs = [], []
+    for i, key in enumerate(keys):
+        lo, hi, _ = SWEEP_RANGES[key]
+        base = float(inputs[key])
+        low, high = max(lo, base * (1 - spread)), min(hi, base * (1 + spread))
+        if key == "open_days":
+            low, high = float(np.floor(low)), float(np.ceil(high))
+        batch[key][2 * i], batch[key][2 * i + 1] = low, high
+        lows.append(low)
+        highs.append(high)
+    values = compute_roi(**batch, num_stores=num_stores)[output]
+    bars = [(key, lows[i], highs[i], float(values[2 * i]), float(values[2 * i + 1])) for i, key in enumerate(keys)]
+
+    def swing(bar):
+        a, b = bar[3], bar[4]
+        return abs(b - a) if np.isfinite(a) and np.isfinite(b) else np.inf
+
+    return sorted(bars, key=swing, reverse=True)
+
+
+@functools.lru_cache(maxsize=16)
+def sweep_grid_cached(fixed_inputs: tuple, x_key: str, y_key: str, num_stores=1) -> dict:
+    """
+    `sweep_grid` met begrensde LRU, voor de pagina. `fixed_inputs` = ((key, waarde), ...)
+    zonder de geswepte invoer: die sliders bewegen raakt de cache dus niet (niet muteren).
+    """
+    inputs = dict(fixed_inputs, **{x_key: 0.0, y_key: 0.0})
+    return sweep_grid(inputs, x_key, y_key, num_stores=num_stores)
+
+
+@functools.lru_cache(maxsize=16)
+def tornado_cached(key: tuple, output: str = "extra_profit_month_total", num_stores=1) -> list:
+    """`tornado` op een `roi_engine.input_key`-tuple, met begrensde LRU."""
+    return tornado(dict(zip(INPUT_KEYS, key)), output=output, num_stores=num_stores)
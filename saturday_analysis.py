@@ -0,0 +1,121 @@
+import numpy as np
+import pandas as pd
+
+SATURDAY = 5            # pandas: maandag = 0
+WEEKDAYS = [0, 1, 2, 3, 4]
+METRICS = ["turnover", "count_in", "transactions"]
+
+
+def add_transactions(df: pd.DataFrame) -> pd.Series:
+    """Transacties = omzet / besteding per transactie (onafhankelijk van de schaal van conversion_rate)."""
+    spt = df["sales_per_transaction"].to_numpy(dtype=np.float64)
+    turnover = df["turnover"].to_numpy(dtype=np.float64)
+    out = np.zeros(len(df))
+    np.divide(turnover, spt, out=out, where=spt > 0)
+    return pd.Series(out, index=df.index, name="transactions")
+
+
+def _stats_from_weekday_totals(totals: np.ndarray) -> dict:
+    """`totals`: (..., 7, len(METRICS)) sommen per weekdag → zaterdag-aandeel en conversieverschil."""
+    turnover, count_in, trans = (totals[..., i] for i in range(len(METRICS)))
+    total_turnover = turnover.sum(axis=-1)
+    sat_share = np.divide(turnover[..., SATURDAY], total_turnover,
+                          out=np.zeros_like(total_turnover), where=total_turnover > 0)
+    sat_conv = np.divide(trans[..., SATURDAY], count_in[..., SATURDAY],
+                         out=np.zeros_like(total_turnover), where=count_in[..., SATURDAY] > 0)
+    wd_in, wd_trans = count_in[..., WEEKDAYS].sum(axis=-1), trans[..., WEEKDAYS].sum(axis=-1)
+    weekday_conv = np.divide(wd_trans, wd_in, out=np.zeros_like(total_turnover), where=wd_in > 0)
+    # Relatief, net als de slider: conversie op zaterdag = conversie × (1 + sat_boost)
+    sat_boost = np.divide(sat_conv, weekday_conv, out=np.ones_like(total_turnover), where=weekday_conv > 0) - 1.0
+    return {"sat_share": sat_share, "sat_conv": sat_conv, "weekday_conv": weekday_conv, "sat_boost": sat_boost}
+
+
+def saturday_profile(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Gemeten zaterdag-aandeel en zaterdag-vs-doordeweekse conversie per shop, over de
+    hele historie in één groupby (shop_id × weekdag) op het genormaliseerde frame.
+    """
+    weekday = df["date"].dt.weekday.rename("weekday")
+    sums = (df[["shop_id", "turnover", "count_in"]].assign(transactions=add_transactions(df))
+            .groupby([df["shop_id"], weekday])[METRICS].sum())
+    shops = sums.index.get_level_values(0).unique()
+    cube = (sums.reindex(pd.MultiIndex.from_product([shops, range(7)]), fill_value=0.0)
+            .to_numpy().reshape(len(shops), 7, len(METRICS)))
+    return pd.DataFrame(_stats_from_weekday_totals(cube), index=pd.Index(shops, name="shop_id"))
+
+
+class WeekdayIndex:
+    """
+    Voorberekende prefix-sommen per shop × weekdag, zodat de som over elk datumbereik
+    en elke selectie shops een O(1)-lookup per shop is in plaats van een scan over het frame.
+
+    Per weekdag staat een (n_shops, n_weeks + 1) prefix-array per metric; het bereik
+    [start, end] voor weekdag w is dan `P[:, k1] - P[:, k0]`.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        if df.empty:
+            raise ValueError("Geen data om te indexeren")
+        codes, shops = pd.factorize(df["shop_id"], sort=True)
+        days = df["date"].to_numpy().astype("datetime64[D]")
+        self.start = days.min()
+        self.shops = np.asarray(shops, dtype=np.int64)
+        self._shop_pos = {int(s): i for i, s in enumerate(self.shops)}
+        offsets = (days - self.start).astype(np.int64)
+        n_days = int(offsets.max()) + 1
+
+        # Dichte kalender (shop × dag); ontbrekende dagen tellen als 0
+        dense = np.zeros((len(METRICS), len(self.shops), n_days))
+        values = [df["turnover"].to_numpy(np.float64), df["count_in"].to_numpy(np.float64),
+                  add_transactions(df).to_numpy()]
+        for m, v in enumerate(values):
+            np.add.at(dense[m], (codes, offsets), v)
+
+        # Weekdag van dag-offset 0 (1970-01-01 was een donderdag = 3)
+        self._wd0 = int((self.start.astype(np.int64) + 3) % 7)
+        self._prefix = []
+        for w in range(7):
+            first = (w - self._wd0) % 7  # eerste offset met weekdag w
+            strided = dense[:, :, first::7]
+            prefix = np.zeros(strided.shape[:2] + (strided.shape[2] + 1,))
+            np.cumsum(strided, axis=2, out=prefix[:, :, 1:])
+            self._prefix.append((first, prefix))
+        self.n_days = n_days
+
+    @property
+    def end(self):
+        return self.start + np.timedelta64(self.n_days - 1, "D")
+
+    def _rows(self, shops):
+        if shops is None:
+            return slice(None)
+        return np.array([self._shop_pos[int(s)] for s in shops if int(s) in self._shop_pos], dtype=np.int64)
+
+    def weekday_totals(self, start=None, end=None, shops=None) -> np.ndarray:
+        """Sommen per (shop, weekdag, metric) over [start, end]; vorm (n_shops, 7, len(METRICS))."""
+        lo = 0 if start is None else max(0, int((np.datetime64(start, "D") - self.start).astype(np.int64)))
+        hi = self.n_days - 1 if end is None else min(self.n_days - 1,
+                                                     int((np.datetime64(end, "D") - self.start).astype(np.int64)))
+        rows = self._rows(shops)
+        n_rows = len(self.shops) if isinstance(rows, slice) else len(rows)
+        out = np.zeros((n_rows, 7, len(METRICS)))
+        if hi < lo:
+            return out
+        for w, (first, prefix) in enumerate(self._prefix):
+            k0 = max(0, -(-(lo - first) // 7))   # eerste index ≥ lo
+            k1 = max(0, (hi - first) // 7 + 1)   # één voorbij laatste index ≤ hi
+            if k1 > k0:
+                out[:, w, :] = (prefix[:, rows, k1] - prefix[:, rows, k0]).T
+        return out
+
+    def saturday_stats(self, start=None, end=None, shops=None) -> pd.DataFrame:
+        """Zelfde kolommen als `saturday_profile`, voor een selectie shops en datumbereik."""
+        rows = self._rows(shops)
+        index = self.shops[rows]
+        stats = _stats_from_weekday_totals(self.weekday_totals(start, end, shops))
+        return pd.DataFrame(stats, index=pd.Index(index, name="shop_id"))
+
+    def chain_stats(self, start=None, end=None, shops=None) -> dict:
+        """Zaterdag-aandeel en -boost voor de selectie als geheel (gewogen via de sommen)."""
+        totals = self.weekday_totals(start, end, shops).sum(axis=0)
+        return {k: float(v) for k, v in _stats_from_weekday_totals(totals).items()}
@@ -0,0 +1,56 @@
+"""
+Procesbrede, vooraf berekende KPI-sets voor alle sessies (kiosk-schermen op één server):
+elke preset en de standaardinvoer × alle standen van de twee what-if-sliders in hele
+procenten. Eén gebroadcaste `compute_roi`-pass per aantal stores, daarna alleen-lezen;
+sessies delen dus dezelfde objecten. Andere invoer valt terug op `compute_roi_cached`.
+"""
+import functools
+import types
+
+import numpy as np
+
+from presets import DEFAULT_INPUTS, PRESETS
+from roi_engine import INPUT_KEYS, compute_roi, compute_roi_cached, input_key
+
+# Slider-standen op de pagina (hele procenten): conversie-uplift 0–10%, ATV-uplift 0–20%
+COMMON_UPLIFT_CONV = np.arange(0, 11) / 100.0
+COMMON_UPLIFT_SPV = np.arange(0, 21) / 100.0
+SHARED_CACHE_SIZE = 8  # aantal verschillende `num_stores` tegelijk in het geheugen
+
+
+def base_scenarios() -> dict:
+    """Standaardinvoer plus elke preset, alleen de simulator-invoer."""
+    return {"Default": DEFAULT_INPUTS, **{name: {k: p[k] for k in INPUT_KEYS} for name, p in PRESETS.items()}}
+
+
+class SharedResults:
+    """Alleen-lezen tabel `input_key` → KPI-set (zelfde waarden als `compute_roi_cached`)."""
+
+    def __init__(self, num_stores: int = 1, bases: dict | None = None, uplift_conv=COMMON_UPLIFT_CONV,
+                 uplift_spv=COMMON_UPLIFT_SPV):
+        self.num_stores = num_stores
+        scenarios = [{**base, "uplift_conv": float(c), "uplift_spv": float(s)}
+                     for base in (bases or base_scenarios()).values() for c in uplift_conv for s in uplift_spv]
+        columns = {k: np.array([sc[k] for sc in scenarios], dtype=np.float64) for k in INPUT_KEYS}
+        result = compute_roi(**columns, num_stores=num_stores)
+        rows = zip(*(result[k].tolist() for k in result))
+        # MappingProxyType: een sessie kan de gedeelde KPI-set niet per ongeluk wijzigen
+        self._kpis = {input_key(sc): types.MappingProxyType(dict(zip(result, row)))
+                      for sc, row in zip(scenarios, rows)}
+
+    def __len__(self):
+        return len(self._kpis)
+
+    def __contains__(self, key):
+        return key in self._kpis
+
+    def get(self, key: tuple):
+        """KPI-set voor een `input_key`; buiten de tabel via de LRU van `roi_engine`."""
+        hit = self._kpis.get(key)
+        return hit if hit is not None else compute_roi_cached(key, self.num_stores)
+
+
+@functools.lru_cache(maxsize=SHARED_CACHE_SIZE)
+def shared_results(num_stores: int = 1) -> SharedResults:
+    """Eén tabel per aantal stores per proces (±900 unieke scenario's, ±10 ms)."""
+    return SharedResults(num_stores)
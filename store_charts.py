@@ -0,0 +1,145 @@
+"""
+Grafieken per store voor grote portfolio's. De server aggregeert en dunt uit, zodat de
+figuur-JSON naar de browser klein blijft, ook bij 100k stores: top-N plus één "Other"-staaf,
+histogrammen met vaste bins en een WebGL-scatter met een puntenbudget.
+
+`figure_bytes` meet precies wat `st.plotly_chart` verstuurt; de builders houden elke
+figuur onder `MAX_FIGURE_BYTES`.
+"""
+import numpy as np
+import plotly.graph_objects as go
+import plotly.io as pio
+
+from formatting import fmt_eur_array
+from roi_figures import FrozenFigure  # `to_dict()` en de bytes-meting één keer per figuur
+
+MAX_BARS = 25
+MAX_POINTS = 5_000
+MAX_FIGURE_BYTES = 400_000  # ±400 kB per figuur; een kiosk-browser blijft daaronder vlot
+MIN_POINTS = 250
+
+
+def figure_bytes(fig) -> int:
+    """Grootte van de figuur-JSON zoals `st.plotly_chart` die naar de browser stuurt."""
+    if isinstance(fig, FrozenFigure):
+        return fig.json_bytes()  # per figuur-object één keer gemeten
+    return len(pio.to_json(fig, validate=False).encode("utf-8"))
+
+
+def top_n_indices(key: np.ndarray, n: int) -> np.ndarray:
+    """Posities van de `n` grootste waarden van `key`, aflopend gesorteerd (O(n) selectie)."""
+    key = np.asarray(key, dtype=np.float64)
+    n = min(n, key.size)
+    if n <= 0:
+        return np.zeros(0, dtype=np.int64)
+    top = np.argpartition(-key, n - 1)[:n] if n < key.size else np.arange(key.size)
+    return top[np.argsort(-key[top], kind="stable")]
+
+
+def decimate(order_by: np.ndarray, max_points: int) -> np.ndarray:
+    """
+    Posities van hoogstens `max_points` punten: alles als het past, anders de uitersten
+    (5% aan elke kant) plus een gelijkmatige steekproef over de rangorde van `order_by`.
+    Deterministisch, zodat de figuur niet verspringt tussen reruns.
+    """
+    n = len(order_by)
+    if n <= max_points:
+        return np.arange(n)
+    order = np.argsort(order_by, kind="stable")
+    tail = max_points // 20
+    ranks = np.concatenate([np.arange(tail), np.arange(n - tail, n),
+                            np.linspace(tail, n - tail - 1, max_points - 2 * tail).round().astype(np.int64)])
+    return np.sort(order[np.unique(ranks)])
+
+
+def histogram_bar(counts, edges, color: str, title: str, height: int, hovertemplate: str,
+                  bargap: float = 0.0) -> go.Figure:
+    """Staafdiagram van een al berekend histogram: de payload is O(bins), niet O(waarden)."""
+    fig = FrozenFigure(go.Bar(x=(edges[:-1] + edges[1:]) / 2, y=counts, width=np.diff(edges), marker_color=color,
+                              hovertemplate=hovertemplate))
+    fig.update_layout(height=height, margin=dict(l=20, r=20, t=30, b=10), title=title, bargap=bargap)
+    return fig
+
+
+def binned_histogram(values, bins: int, value_range: tuple, color: str, title: str, height: int,
+                     hovertemplate: str, bargap: float = 0.0) -> go.Figure:
+    """Histogram op de server; waarden buiten `value_range` (ook `inf`) vallen in de buitenste bin."""
+    clipped = np.clip(np.asarray(values, dtype=np.float64), value_range[0], value_range[1])
+    counts, edges = np.histogram(clipped, bins=bins, range=value_range)
+    return histogram_bar(counts, edges, color, title, height, hovertemplate, bargap)
+
+
+def top_n_bar(labels, baseline, scenario, n: int = MAX_BARS, colors=("#F59E0B", "#762181"), height: int = 420,
+              names=("Baseline", "New (scenario)"), title: str = "") -> go.Figure:
+    """
+    Baseline vs scenario per store voor de top-`n` op uplift, plus één staaf met het
+    gemiddelde van alle overige stores. De x-as is positioneel: dubbele namen blijven apart.
+    """
+    labels = np.asarray(labels)
+    baseline = np.asarray(baseline, dtype=np.float64)
+    scenario = np.asarray(scenario, dtype=np.float64)
+    top = top_n_indices(scenario - baseline, min(n, MAX_BARS))
+    ticks = [str(label) for label in labels[top]]
+    ys = [baseline[top], scenario[top]]
+    rest = np.ones(len(labels), dtype=bool)
+    rest[top] = False
+    n_rest = int(rest.sum())
+    if n_rest:
+        ticks.append(f"Other ({n_rest:,} stores, avg)".replace(",", "."))
+        ys = [np.append(y, y_all[rest].mean()) for y, y_all in zip(ys, (baseline, scenario))]
+    fig = FrozenFigure()
+    for name, y, color in zip(names, ys, colors):
+        fig.add_trace(go.Bar(name=name, x=np.arange(len(ticks)), y=y, marker_color=color,
+                             customdata=np.stack([ticks, fmt_eur_array(y)], axis=-1),
+                             hovertemplate="%{customdata[0]}<br>" + name + ": %{customdata[1]}<extra></extra>"))
+    fig.update_layout(barmode="group", height=height, margin=dict(l=20, r=20, t=30, b=10), title=title,
+                      legend=dict(orientation="h"),
+                      xaxis=dict(tickmode="array", tickvals=np.arange(len(ticks)), ticktext=ticks, tickangle=-45))
+    return fig
+
+
+def store_scatter(x, y, labels, max_points: int = MAX_POINTS, max_bytes: int = MAX_FIGURE_BYTES,
+                  color: str = "#762181", height: int = 420, title: str = "", x_title: str = "",
+                  y_title: str = "", hovertemplate: str = "%{customdata}<br>%{x:,.0f} · %{y:.1f}<extra></extra>"):
+    """
+    WebGL-scatter (Scattergl) van één punt per store, uitgedund tot `max_points` en daarna
+    gehalveerd tot de figuur onder `max_bytes` blijft. Geeft (figuur, getoond, bytes).
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    labels = np.asarray(labels)
+    budget = max_points
+    while True:
+        keep = decimate(y, budget)
+        sampled = f" — {len(keep):,} of {len(x):,} stores shown".replace(",", ".") if len(keep) < len(x) else ""
+        fig = FrozenFigure(go.Scattergl(x=x[keep], y=y[keep], mode="markers", customdata=labels[keep].astype(str),
+                                     marker=dict(color=color, size=5, opacity=0.6), hovertemplate=hovertemplate))
+        fig.update_layout(height=height, margin=dict(l=20, r=20, t=30, b=10), title=title + sampled,
+                          xaxis_title=x_title, yaxis_title=y_title)
+        nbytes = figure_bytes(fig)
+        if nbytes <= max_bytes or budget <= MIN_POINTS:
+            return fig, len(keep), nbytes
+        budget //= 2
+
+
+def hourly_profile_chart(profile, window: tuple, colors=("#762181", "#F59E0B", "#9CA3AF"), height: int = 320,
+                         title: str = "") -> go.Figure:
+    """
+    Uurprofiel uit `HourlyCube.hourly_profile`: aandeel zaterdagbezoekers per uur (staven) en
+    conversie zaterdag vs doordeweeks (lijnen, rechteras); het gekozen venster is gemarkeerd.
+    """
+    hours = np.asarray(profile.index)
+    fig = FrozenFigure()
+    fig.add_trace(go.Bar(name="Saturday visitors", x=hours, y=profile["sat_visitor_share"] * 100,
+                         marker_color=colors[0], opacity=0.8,
+                         hovertemplate="%{x}:00 · %{y:.1f}% of Saturday visitors<extra></extra>"))
+    for column, name, color in [("sat_conv", "Conversion Saturday", colors[1]),
+                                ("weekday_conv", "Conversion weekdays", colors[2])]:
+        fig.add_trace(go.Scatter(name=name, x=hours, y=profile[column] * 100, yaxis="y2", mode="lines+markers",
+                                 line=dict(color=color), hovertemplate="%{x}:00 · %{y:.1f}%<extra>" + name + "</extra>"))
+    fig.add_vrect(x0=window[0] - 0.5, x1=window[1] - 0.5, fillcolor=colors[1], opacity=0.12, line_width=0)
+    fig.update_layout(height=height, margin=dict(l=20, r=20, t=30, b=10), title=title, legend=dict(orientation="h"),
+                      xaxis=dict(title="Hour", dtick=2, range=[-0.5, 23.5]),
+                      yaxis=dict(title="Share of visitors (%)"),
+                      yaxis2=dict(title="Conversion (%)", overlaying="y", side="right", showgrid=False))
+    return fig
@@ -0,0 +1,252 @@
+"""
+Lichte timing per rerun van de pagina: opeenvolgende secties (`stage`), geneste spans
+(`span`, `@timed` voor het datapad), de grootte van verstuurde figuren (`note_bytes`) en een
+optionele profiler voor één rerun.
+
+Staat de timing uit (geen debug-paneel, geen logbestand), dan is elke aanroep één
+attribuut-lookup op een thread-local: ruim onder een microseconde.
+
+Uitvoer, naast het debug-paneel op de pagina (`?debug=1`):
+  - PFM_TIMING_LOG=pad.jsonl   één JSON-regel per rerun, roteert naar `.1` boven 5 MB
+  - PFM_TIMING_PROM=pad.prom   Prometheus text format (node_exporter textfile collector)
+"""
+import contextlib
+import functools
+import io
+import json
+import logging
+import os
+import threading
+import time
+
+ENV_LOG = "PFM_TIMING_LOG"
+ENV_PROM = "PFM_TIMING_PROM"
+LOG_MAX_BYTES = 5 * 1024 * 1024
+PROFILERS = ("cProfile", "pyinstrument")
+
+_log = logging.getLogger(__name__)
+
+
+class _Local(threading.local):
+    recorder = None          # Streamlit draait elke sessie in een eigen scriptthread
+
+
+_local = _Local()
+_NOOP = contextlib.nullcontext()
+_totals_lock = threading.Lock()
+_totals = {}                 # span → [som in seconden, aantal], over alle sessies in dit proces
+_reruns = [0.0, 0]
+_figure_bytes = {}           # figuur → bytes bij de laatste render
+
+
+class Recorder:
+    """Verzamelt de spans van één rerun (tijden in seconden, relatief aan de start)."""
+
+    def __init__(self, started: float | None = None):
+        self.started = time.perf_counter() if started is None else started
+        self.spans = []      # (naam, start, duur, diepte)
+        self.payload = {}    # figuur → geserialiseerde bytes in deze rerun
+        self._stage = None   # (naam, start) van de lopende sectie
+        self._depth = 0
+
+    def add(self, name: str, start: float, end: float, depth: int | None = None):
+        self.spans.append((name, start - self.started, end - start, self._depth if depth is None else depth))
+
+    def stage(self, name: str | None):
+        """Sluit de lopende sectie af en begint `name` (None: alleen afsluiten)."""
+        now = time.perf_counter()
+        if self._stage is not None:
+            self.add(self._stage[0], self._stage[1], now, depth=0)
+        self._stage = (name, now) if name is not None else None
+
+    @contextlib.contextmanager
+    def span(self, name: str):
+        self._depth += 1
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            self.add(name, t0, time.perf_counter(), depth=self._depth + 1)
+
+    def summary(self) -> dict:
+        """Totaal per naam in ms (herhaalde spans opgeteld), in volgorde van eerste start."""
+        out = {}
+        for name, _, duration, _ in sorted(self.spans, key=lambda span: (span[1], span[3])):
+            out[name] = out.get(name, 0.0) + duration * 1000.0
+        return out
+
+
+def sinks_configured() -> bool:
+    return bool(os.environ.get(ENV_LOG) or os.environ.get(ENV_PROM))
+
+
+def start_rerun(enabled: bool, started: float | None = None, first_stage: str | None = None) -> Recorder | None:
+    """
+    Begint de timing van een rerun op deze thread; `None` (en geen overhead) als uit.
+    `first_stage` loopt vanaf `started`, bv. de imports bovenaan het script.
+    """
+    recorder = Recorder(started) if enabled else None
+    if recorder is not None and first_stage is not None:
+        recorder._stage = (first_stage, recorder.started)
+    _local.recorder = recorder
+    return recorder
+
+
+def current() -> Recorder | None:
+    return _local.recorder
+
+
+def stage(name: str | None):
+    recorder = _local.recorder
+    if recorder is not None:
+        recorder.stage(name)
+
+
+def span(name: str):
+    recorder = _local.recorder
+    return _NOOP if recorder is None else recorder.span(name)
+
+
+def note_bytes(name: str, nbytes: int):
+    recorder = _local.recorder
+    if recorder is not None:
+        recorder.payload[name] = recorder.payload.get(name, 0) + nbytes
+
+
+def timed(name: str):
+    """Decorator: de hele aanroep als span, als er op deze thread een rerun getimed wordt."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            recorder = _local.recorder
+            if recorder is None:
+                return fn(*args, **kwargs)
+            with recorder.span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def finish_rerun() -> dict | None:
+    """Sluit de rerun af, werkt de procestotalen bij en schrijft naar de geconfigureerde bestanden."""
+    recorder = _local.recorder
+    if recorder is None:
+        return None
+    recorder.stage(None)
+    _local.recorder = None
+    total = time.perf_counter() - recorder.started
+    summary = recorder.summary()
+    with _totals_lock:
+        for name, ms in summary.items():
+            agg = _totals.setdefault(name, [0.0, 0])
+            agg[0] += ms / 1000.0
+            agg[1] += 1
+        _reruns[0] += total
+        _reruns[1] += 1
+        _figure_bytes.update(recorder.payload)
+    record = {"ts": time.time(), "total_ms": round(total * 1000.0, 3),
+              "spans": {k: round(v, 3) for k, v in summary.items()}}
+    if recorder.payload:
+        record["figure_bytes"] = dict(recorder.payload)
+    log_path, prom_path = os.environ.get(ENV_LOG), os.environ.get(ENV_PROM)
+    # Een kapotte uitvoer (schijf vol, rechten) mag de pagina nooit laten crashen
+    for path, write, arg in ((log_path, append_jsonl, record), (prom_path, write_prometheus, total)):
+        if path:
+            try:
+                write(path, arg)
+            except Exception:
+                _log.exception("timing: schrijven naar %s mislukt", path)
+    return record
+
+
+def append_jsonl(path: str, record: dict, max_bytes: int = LOG_MAX_BYTES):
+    try:
+        if os.path.getsize(path) > max_bytes:
+            os.replace(path, path + ".1")
+    except OSError:
+        pass  # bestand bestaat nog niet
+    with open(path, "a", encoding="utf-8") as fh:
+        fh.write(json.dumps(record) + "\n")
+
+
+def prometheus_text(last_rerun_s: float) -> str:
+    with _totals_lock:
+        totals = {k: list(v) for k, v in _totals.items()}
+        rerun_sum, rerun_count = _reruns
+        figure_bytes = dict(_figure_bytes)
+    lines = [
+        "# HELP pfm_rerun_seconds Duration of page reruns.",
+        "# TYPE pfm_rerun_seconds summary",
+        f"pfm_rerun_seconds_sum {rerun_sum:.6f}",
+        f"pfm_rerun_seconds_count {rerun_count}",
+        "# HELP pfm_rerun_last_seconds Duration of the most recent rerun.",
+        "# TYPE pfm_rerun_last_seconds gauge",
+        f"pfm_rerun_last_seconds {last_rerun_s:.6f}",
+        "# HELP pfm_span_seconds Time spent per stage or span of a rerun.",
+        "# TYPE pfm_span_seconds summary",
+    ]
+    for name, (seconds, count) in totals.items():
+        lines.append(f'pfm_span_seconds_sum{{span="{_label(name)}"}} {seconds:.6f}')
+        lines.append(f'pfm_span_seconds_count{{span="{_label(name)}"}} {count}')
+    if figure_bytes:
+        lines += ["# HELP pfm_figure_bytes Serialized size of a figure at its most recent render.",
+                  "# TYPE pfm_figure_bytes gauge"]
+        lines += [f'pfm_figure_bytes{{figure="{_label(name)}"}} {n}' for name, n in figure_bytes.items()]
+    return "\n".join(lines) + "\n"
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+def write_prometheus(path: str, last_rerun_s: float):
+    # Via een tijdelijk bestand + rename: de collector leest nooit een half bestand. Eén
+    # tijdelijk bestand per thread: sessies in hetzelfde proces schrijven tegelijk
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        fh.write(prometheus_text(last_rerun_s))
+    os.replace(tmp, path)
+
+
+# =========================
+# Profiler voor één rerun
+# =========================
+def available_profilers() -> list:
+    import importlib.util
+
+    return [p for p in PROFILERS if p == "cProfile" or importlib.util.find_spec(p) is not None]
+
+
+class RerunProfiler:
+    """cProfile of pyinstrument rond één rerun; `stop()` geeft een tekstrapport."""
+
+    def __init__(self, kind: str = "cProfile"):
+        if kind not in PROFILERS:
+            raise ValueError(f"Onbekende profiler: {kind!r} (kies uit {', '.join(PROFILERS)})")
+        self.kind = kind
+        if kind == "pyinstrument":
+            import pyinstrument
+
+            self._profiler = pyinstrument.Profiler()
+        else:
+            import cProfile
+
+            self._profiler = cProfile.Profile()
+
+    def start(self):
+        if self.kind == "pyinstrument":
+            self._profiler.start()
+        else:
+            self._profiler.enable()
+
+    def stop(self, limit: int = 40) -> str:
+        if self.kind == "pyinstrument":
+            self._profiler.stop()
+            return self._profiler.output_text(unicode=True, color=False)
+        import pstats
+
+        self._profiler.disable()
+        out = io.StringIO()
+        pstats.Stats(self._profiler, stream=out).sort_stats("cumulative").print_stats(limit)
+        return out.getvalue()
@@ -0,0 +1,296 @@
+"""
+Backfill van gearchiveerde Vemcount-reports (JSON, ook `.json.gz`) naar een Parquet-dataset,
+gepartitioneerd als `shop_id=<id>/year=<jaar>/data.parquet`.
+
+- Bestanden worden over een process pool genormaliseerd; elke worker schrijft per partitie
+  een fragment (`part-<bron>.parquet`), daarna voegt een compactie-stap per partitie de
+  fragmenten samen. Dubbele shop/datum-rijen (overlappende dumps) vallen daar weg: de rij
+  uit het jongste bronbestand (mtime) wint.
+- De data staat per partitie gesorteerd op datum, met min/max-statistieken per row group;
+  `read_backfill` leest dus alleen de partitions en row groups die een query raakt.
+- Een manifest (`_manifest.jsonl`) houdt bij welke bestanden (pad, grootte, mtime) verwerkt
+  zijn; een afgebroken run gaat bij de volgende aanroep verder waar hij was.
+
+Gebruik:  python vemcount_backfill.py archief/ -o dataset/ [--workers N] [--pattern "*.json*"] [--force]
+"""
+import argparse
+import datetime as dt
+import fnmatch
+import gzip
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from data_transformer import COLUMNS, KPI_FIELDS, empty_frame, iter_normalize_vemcount_chunks
+
+MANIFEST = "_manifest.jsonl"
+DATA_FILE = "data.parquet"
+ROW_GROUP_SIZE = 4_096      # ±een half jaar uurdata per row group: pruning op datum binnen een partitie
+DEFAULT_PATTERN = "*.json*"
+PROGRESS_EVERY = 5.0        # seconden tussen voortgangsregels
+
+
+# =========================
+# Manifest
+# =========================
+def _file_id(path: str) -> dict:
+    st = os.stat(path)
+    return {"path": os.path.abspath(path), "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def load_manifest(root: str) -> dict:
+    """Verwerkte bestanden: pad → manifest-regel. Een half geschreven laatste regel telt niet mee."""
+    done = {}
+    try:
+        with open(os.path.join(root, MANIFEST)) as fh:
+            for line in fh:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                done[entry["path"]] = entry
+    except FileNotFoundError:
+        pass
+    return done
+
+
+def _is_done(entry: dict | None, file_id: dict) -> bool:
+    return entry is not None and entry["size"] == file_id["size"] and entry["mtime_ns"] == file_id["mtime_ns"]
+
+
+def find_files(sources, pattern: str = DEFAULT_PATTERN) -> list:
+    """Bestanden en (recursief) mappen → gesorteerde lijst bestanden die op `pattern` passen."""
+    files = []
+    for source in sources:
+        if os.path.isdir(source):
+            for dirpath, _, names in os.walk(source):
+                files.extend(os.path.join(dirpath, n) for n in names if fnmatch.fnmatch(n, pattern))
+        else:
+            files.append(source)
+    return sorted(set(files))
+
+
+# =========================
+# Workers
+# =========================
+def _partition_dir(root: str, shop_id: int, year: int) -> str:
+    return os.path.join(root, f"shop_id={shop_id}", f"year={year}")
+
+
+def _write_parquet(table, path: str):
+    import pyarrow.parquet as pq
+
+    tmp = os.path.join(os.path.dirname(path), "." + os.path.basename(path) + ".tmp")  # lezers slaan "."-bestanden over
+    pq.write_table(table, tmp, row_group_size=ROW_GROUP_SIZE, write_statistics=True)
+    os.replace(tmp, path)
+
+
+def normalize_file(path: str, root: str, file_id: dict) -> dict:
+    """
+    Worker: normaliseert één bestand en schrijft per (shop, jaar) een fragment. Een fragment
+    heet naar het bronbestand, dus een herhaalde run overschrijft in plaats van te verdubbelen.
+    """
+    import pyarrow as pa
+
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rb") as fh:
+        chunks = list(iter_normalize_vemcount_chunks(fh))
+    df = pd.concat(chunks, ignore_index=True) if chunks else empty_frame()
+    df = df[df["date"].notna()]
+    dates = df["date"].to_numpy()
+    shops = df["shop_id"].to_numpy()
+    years = dates.astype("datetime64[Y]").astype(np.int64) + 1970
+    # Eén Arrow-tabel, gesorteerd op (shop, jaar); per partitie alleen een slice (geen pandas per groep)
+    order = np.lexsort((dates, years, shops))
+    table = pa.table({"date": dates[order], **{k: df[k].to_numpy()[order] for k in KPI_FIELDS},
+                      "source_mtime": np.full(len(df), file_id["mtime_ns"], dtype=np.int64)})
+    shops, years = shops[order], years[order]
+    bounds = np.flatnonzero((shops[1:] != shops[:-1]) | (years[1:] != years[:-1])) + 1
+    source = hashlib.sha1(file_id["path"].encode("utf-8")).hexdigest()[:16]
+    partitions = []
+    for lo, hi in zip(np.r_[0, bounds], np.r_[bounds, len(df)]):
+        if hi <= lo:
+            continue
+        target = _partition_dir(root, int(shops[lo]), int(years[lo]))
+        os.makedirs(target, exist_ok=True)
+        _write_parquet(table.slice(lo, hi - lo), os.path.join(target, f"part-{source}.parquet"))
+        partitions.append(target)
+    return {**file_id, "rows": len(df), "partitions": partitions}
+
+
+def compact_partition(target: str) -> tuple:
+    """
+    Voegt `data.parquet` en alle fragmenten van één partitie samen: per datum blijft de rij uit
+    het jongste bronbestand over. Idempotent, dus veilig te herhalen na een onderbreking.
+    Geeft (rijen vóór, rijen na) terug.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    names = sorted(n for n in os.listdir(target) if n.startswith("part-") and n.endswith(".parquet"))
+    if not names:
+        return 0, 0
+    paths = [os.path.join(target, n) for n in names]
+    if os.path.exists(os.path.join(target, DATA_FILE)):
+        paths.insert(0, os.path.join(target, DATA_FILE))
+    table = pa.concat_tables([pq.read_table(p) for p in paths])
+    dates = table["date"].to_numpy()
+    # Stabiel (lexsort): per datum staat de jongste bron achteraan, bij gelijke mtime het laatst gelezen fragment
+    order = np.lexsort((table["source_mtime"].to_numpy(), dates))
+    dates = dates[order]
+    last = np.r_[dates[1:] != dates[:-1], True]
+    _write_parquet(table.take(order[last]), os.path.join(target, DATA_FILE))
+    for p in paths:
+        if os.path.basename(p) != DATA_FILE:
+            os.remove(p)
+    return table.num_rows, int(last.sum())
+
+
+# =========================
+# Pipeline
+# =========================
+def _pending_partitions(root: str) -> list:
+    """Partities met fragmenten (ook die van een eerder afgebroken run)."""
+    out = []
+    for shop_dir in os.scandir(root):
+        if shop_dir.is_dir() and shop_dir.name.startswith("shop_id="):
+            for year_dir in os.scandir(shop_dir.path):
+                if year_dir.is_dir() and any(n.startswith("part-") for n in os.listdir(year_dir.path)):
+                    out.append(year_dir.path)
+    return sorted(out)
+
+
+def backfill(sources, root: str, workers: int | None = None, pattern: str = DEFAULT_PATTERN,
+             force: bool = False, log=None) -> dict:
+    """
+    Normaliseert alle nog niet verwerkte bestanden parallel, compacteert de geraakte partities
+    en geeft de doorvoer terug (o.a. `files_per_s`, `rows_per_s`, `duplicates_dropped`).
+    """
+    log = log or (lambda msg: print(msg, file=sys.stderr))
+    os.makedirs(root, exist_ok=True)
+    done = {} if force else load_manifest(root)
+    files = find_files(sources, pattern)
+    todo = []
+    for path in files:
+        file_id = _file_id(path)
+        if not _is_done(done.get(file_id["path"]), file_id):
+            todo.append((path, file_id))
+    skipped = len(files) - len(todo)
+    if skipped:
+        log(f"{skipped} bestand(en) al verwerkt volgens {MANIFEST}; {len(todo)} te gaan")
+
+    t0 = time.perf_counter()
+    rows, n_done, failed = 0, 0, []
+    last_report = t0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(normalize_file, path, root, file_id): path for path, file_id in todo}
+        with open(os.path.join(root, MANIFEST), "a") as manifest:
+            for future in as_completed(futures):
+                try:
+                    entry = future.result()
+                except Exception as exc:  # één kapot bestand stopt de backfill niet
+                    failed.append(futures[future])
+                    log(f"FOUT {futures[future]}: {type(exc).__name__}: {exc}")
+                    continue
+                # Pas in het manifest als alle fragmenten van het bestand op schijf staan
+                entry["ts"] = dt.datetime.now().isoformat(timespec="seconds")
+                del entry["partitions"]
+                manifest.write(json.dumps(entry) + "\n")
+                manifest.flush()
+                rows += entry["rows"]
+                n_done += 1
+                now = time.perf_counter()
+                if now - last_report >= PROGRESS_EVERY:
+                    elapsed = now - t0
+                    log(f"{n_done}/{len(todo)} bestanden · {n_done / elapsed:.1f} files/s · {rows / elapsed:,.0f} rows/s")
+                    last_report = now
+        t_norm = time.perf_counter()
+
+        partitions = _pending_partitions(root)
+        rows_in = rows_out = 0
+        for before, after in pool.map(compact_partition, partitions, chunksize=max(1, len(partitions) // 64)):
+            rows_in += before
+            rows_out += after
+    seconds = time.perf_counter() - t0
+    stats = {
+        "files": n_done, "skipped": skipped, "failed": len(failed), "rows": rows,
+        "partitions": len(partitions), "duplicates_dropped": rows_in - rows_out,
+        "seconds": seconds, "normalize_seconds": t_norm - t0,
+        "files_per_s": n_done / seconds if seconds else 0.0, "rows_per_s": rows / seconds if seconds else 0.0,
+    }
+    log(f"{n_done} bestanden, {rows:,} rijen in {seconds:.1f}s ({stats['files_per_s']:.1f} files/s, "
+        f"{stats['rows_per_s']:,.0f} rows/s); {len(partitions)} partities gecompacteerd, "
+        f"{stats['duplicates_dropped']:,} dubbele rijen verwijderd" + (f"; {len(failed)} mislukt" if failed else ""))
+    return stats
+
+
+# =========================
+# Lezen
+# =========================
+def _dataset(root: str):
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    partitioning = ds.partitioning(pa.schema([("shop_id", pa.int64()), ("year", pa.int32())]), flavor="hive")
+    # Alleen de gecompacteerde bestanden; fragmenten van een lopende run niet
+    return ds.dataset(root, format="parquet", partitioning=partitioning, ignore_prefixes=[".", "_", "part-"])
+
+
+def backfill_years(root: str) -> list:
+    """Jaren waarvoor de dataset partities heeft (uit de mapnamen, zonder bestanden te openen)."""
+    years = set()
+    for shop_dir in os.scandir(root):
+        if shop_dir.is_dir() and shop_dir.name.startswith("shop_id="):
+            years.update(int(d.name.split("=", 1)[1]) for d in os.scandir(shop_dir.path)
+                         if d.is_dir() and d.name.startswith("year="))
+    return sorted(years)
+
+
+def read_backfill(root: str, shop_ids=None, start=None, end=None) -> pd.DataFrame:
+    """
+    Genormaliseerde rijen (schema van `normalize_vemcount_response`) voor een selectie shops
+    en datumbereik. Filters op `shop_id` en `year` slaan hele partities over; het datumfilter
+    gebruikt de row-group-statistieken.
+    """
+    import pyarrow.dataset as ds
+
+    expr = None
+
+    def both(a, b):
+        return b if a is None else a & b
+
+    if shop_ids is not None:
+        expr = both(expr, ds.field("shop_id").isin([int(s) for s in shop_ids]))
+    if start is not None:
+        start = pd.Timestamp(start)
+        expr = both(expr, (ds.field("year") >= start.year) & (ds.field("date") >= start))
+    if end is not None:
+        end = pd.Timestamp(end) + pd.Timedelta(days=1)  # einddatum inclusief, ook bij uurdata
+        expr = both(expr, (ds.field("year") <= end.year) & (ds.field("date") < end))
+    table = _dataset(root).to_table(columns=COLUMNS, filter=expr)
+    if table.num_rows == 0:
+        return empty_frame()
+    return table.to_pandas().sort_values(["shop_id", "date"], ignore_index=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("sources", nargs="+", help="JSON-bestanden of mappen (recursief)")
+    parser.add_argument("-o", "--output", required=True, help="map van de Parquet-dataset")
+    parser.add_argument("--workers", type=int, default=None, help="aantal processen (standaard: alle cores)")
+    parser.add_argument("--pattern", default=DEFAULT_PATTERN, help="bestandspatroon binnen mappen")
+    parser.add_argument("--force", action="store_true", help="manifest negeren en alles opnieuw verwerken")
+    args = parser.parse_args(argv)
+    stats = backfill(args.sources, args.output, args.workers, args.pattern, args.force)
+    if stats["failed"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
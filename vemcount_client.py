@@ -0,0 +1,149 @@
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+
+from data_transformer import KPI_FIELDS, empty_frame, normalize_vemcount_response
+from timing import timed
+
+API_URL = os.environ.get("API_URL", "")
+
+BATCH_SIZE = 50        # shops per request (`data=...&data=...`)
+MAX_CONCURRENCY = 8    # gelijktijdige requests
+MAX_RETRIES = 4
+BACKOFF_BASE = 0.5     # seconden; verdubbelt per poging
+TIMEOUT = 60
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class VemcountFetchError(RuntimeError):
+    pass
+
+
+def build_params(shop_ids, data_outputs=KPI_FIELDS, period="last_year", step="day",
+                 date_from=None, date_to=None) -> list:
+    """Query-parameters zoals de FastAPI-wrapper ze verwacht (arrays als herhaalde keys)."""
+    params = [("data", int(shop_id)) for shop_id in shop_ids]
+    params += [("data_output", output) for output in data_outputs]
+    params += [("source", "shops"), ("period", period), ("step", step)]
+    if date_from is not None:
+        params += [("form_date_from", str(date_from)), ("form_date_to", str(date_to or date_from))]
+    return params
+
+
+def _batches(items, size):
+    items = list(items)
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+class VemcountClient:
+    """
+    Haalt KPI's voor veel shops op: shops gebundeld per request, batches parallel met retry +
+    backoff. De worker-threads (elk met een eigen keep-alive-sessie) leven zo lang als de client,
+    zodat verbindingen ook tussen aanroepen van `fetch_range` hergebruikt worden; `close()` of
+    `with VemcountClient(...) as client:` ruimt ze op.
+    """
+
+    def __init__(self, api_url: str = API_URL, batch_size: int = BATCH_SIZE,
+                 max_concurrency: int = MAX_CONCURRENCY, max_retries: int = MAX_RETRIES,
+                 backoff_base: float = BACKOFF_BASE, timeout: float = TIMEOUT, method: str = "POST"):
+        if not api_url:
+            raise ValueError("API_URL ontbreekt (zet st.secrets['API_URL'] of de env-variabele API_URL)")
+        self.api_url = api_url
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.timeout = timeout
+        self.method = method
+        self._local = threading.local()
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        self._sessions = []
+
+    def _session(self) -> requests.Session:
+        # requests.Session is niet gegarandeerd thread-safe: één per worker-thread, elk met keep-alive
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_concurrency)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            self._local.session = session
+            with self._pool_lock:
+                self._sessions.append(session)
+        return session
+
+    def _executor(self) -> ThreadPoolExecutor:
+        # Pas bij de eerste batch aangemaakt; threads starten per submit, tot `max_concurrency`
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="vemcount")
+            return self._pool
+
+    def close(self):
+        """Stopt de worker-threads en sluit hun sessies; een volgende aanroep start ze opnieuw."""
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+            sessions, self._sessions = self._sessions, []
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+        for session in sessions:
+            session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _request(self, params) -> dict:
+        last_error = None
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                # Exponentiële backoff met jitter, zodat parallelle batches niet tegelijk terugkomen
+                time.sleep(self.backoff_base * 2 ** (attempt - 1) * (0.5 + random.random()))
+            try:
+                resp = self._session().request(self.method, self.api_url, params=params, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                last_error = e
+                continue
+            if resp.status_code in RETRY_STATUS:
+                last_error = VemcountFetchError(f"HTTP {resp.status_code} van {self.api_url}")
+                continue
+            resp.raise_for_status()
+            return resp.json()
+        raise VemcountFetchError(f"Request mislukt na {self.max_retries + 1} pogingen: {last_error}")
+
+    def iter_batches(self, shop_ids, **kwargs):
+        """Levert per afgeronde batch de genormaliseerde DataFrame (volgorde van binnenkomst)."""
+        batches = _batches(shop_ids, self.batch_size)
+        if not batches:
+            return
+        pool = self._executor()
+        futures = [pool.submit(self._request, build_params(batch, **kwargs)) for batch in batches]
+        try:
+            for future in as_completed(futures):
+                yield normalize_vemcount_response(future.result())
+        finally:
+            for future in futures:  # afgebroken (fout of vroeg gestopt): geen batches meer voor niets ophalen
+                future.cancel()
+
+    def get_kpi_data_for_stores(self, shop_ids, **kwargs) -> pd.DataFrame:
+        """Alle shops in één genormaliseerd frame, gesorteerd op shop_id en datum."""
+        frames = list(self.iter_batches(shop_ids, **kwargs))
+        if not frames:
+            return empty_frame()
+        return pd.concat(frames, ignore_index=True).sort_values(["shop_id", "date"], ignore_index=True)
+
+    @timed("vemcount_fetch")
+    def fetch_range(self, shop_ids, date_from, date_to, step="day") -> pd.DataFrame:
+        """Signatuur van `report_cache.get_kpi_data_cached(fetch=...)`; `step="hour"` voor uurwaarden."""
+        return self.get_kpi_data_for_stores(shop_ids, period="date", date_from=date_from, date_to=date_to,
+                                            step=step)